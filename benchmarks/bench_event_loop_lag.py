@@ -0,0 +1,62 @@
+"""
+Measures how late a timer that should fire every millisecond is while a large payload is being
+checked, with the blocking `is_instance` and with `is_instance_async`.
+
+Run from the repository root with `python -m benchmarks.bench_event_loop_lag`.
+"""
+
+import asyncio
+import time
+import typing
+
+from datatypes import is_instance, is_instance_async
+
+
+PAYLOAD = [{'id': i, 'tags': ['a', 'b']} for i in range(300000)]
+ANNOTATION = typing.List[typing.Dict[str, typing.Union[int, typing.List[str]]]]
+
+INTERVAL = 0.001
+
+
+async def measure_lag(check):
+    lags = []
+    done = False
+
+    async def ticker():
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(INTERVAL)
+            lags.append(time.perf_counter() - start - INTERVAL)
+
+    task = asyncio.ensure_future(ticker())
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    assert await check()
+    duration = time.perf_counter() - start
+
+    done = True
+    await task
+
+    lags.sort()
+    return duration, lags[-1], lags[len(lags) * 99 // 100]
+
+
+async def blocking():
+    return is_instance(PAYLOAD, ANNOTATION)
+
+
+async def cooperative():
+    return await is_instance_async(PAYLOAD, ANNOTATION)
+
+
+def main():
+    loop = asyncio.get_event_loop()
+    for name, check in [('is_instance', blocking), ('is_instance_async', cooperative)]:
+        duration, max_lag, p99_lag = loop.run_until_complete(measure_lag(check))
+        print('{:<18} total {:8.2f} ms, max lag {:8.2f} ms, p99 lag {:8.2f} ms'.format(
+            name, duration * 1e3, max_lag * 1e3, p99_lag * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Compares `is_subtype` queries that have to be computed with queries that are served from the cache.
+
+Run from the repository root with `python -m benchmarks.bench_is_subtype`.
+"""
+
+import timeit
+import typing
+
+from datatypes import is_subtype
+
+
+QUERIES = [
+    (bool, int),
+    (typing.List[bool], typing.Sequence[int]),
+    (typing.Dict[str, typing.List[int]], typing.Mapping[str, typing.Sequence[int]]),
+    (typing.Tuple[int, bool, str], typing.Tuple[int, int, str]),
+    (typing.Union[int, bool, None], typing.Optional[int]),
+    (typing.Callable[[int, typing.Any], typing.List[bool]], typing.Callable[[bool, str], typing.Sequence[int]]),
+]
+
+REPEAT = 10000
+
+
+def run_queries():
+    for sub_type, super_type in QUERIES:
+        is_subtype(sub_type, super_type)
+
+
+def uncached():
+    is_subtype.cache_clear()
+    run_queries()
+
+
+def main():
+    uncached_time = timeit.timeit(uncached, number=REPEAT)
+
+    is_subtype.cache_clear()
+    cached_time = timeit.timeit(run_queries, number=REPEAT)
+    info = is_subtype.cache_info()
+
+    num_queries = REPEAT * len(QUERIES)
+    print('uncached: {:8.2f} µs/query'.format(uncached_time / num_queries * 1e6))
+    print('cached:   {:8.2f} µs/query'.format(cached_time / num_queries * 1e6))
+    print('speedup:  {:8.1f}x'.format(uncached_time / cached_time))
+    print('cache:    {} hits, {} misses'.format(info.hits, info.misses))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compares `is_instance` on nested containers with hand-written nested closures. Annotations that
+don't refer to themselves are checked by nested checkers as well, so there should be no
+difference. Recursive annotations are checked by a traversal, which is slower per element, but
+doesn't use the call stack (so objects can be nested arbitrarily deeply) and checks shared
+containers only once, which narrows the gap in the last case.
+
+Run from the repository root with `python -m benchmarks.bench_nested`.
+"""
+
+import timeit
+import typing
+
+from datatypes import is_instance
+from datatypes.type_checks import _get_checker
+
+
+def closure_checker(type_):
+    """
+    Returns a checker for `Dict[str, X]` or `List[X]` that checks the elements with the
+    (non-nested) checker of `X`.
+    """
+    if typing.get_origin(type_) is dict:
+        key_type, value_type = typing.get_args(type_)
+        check_key, check_value = _get_checker(key_type), _get_checker(value_type)
+        return lambda obj: isinstance(obj, dict) and all(check_key(k) and check_value(v) for k, v in obj.items())
+
+    item_type, = typing.get_args(type_)
+    check_item = _get_checker(item_type)
+    return lambda obj: isinstance(obj, list) and all(map(check_item, obj))
+
+
+Nested = typing.List[typing.Union[int, 'Nested']]
+
+
+def check_nested(obj):
+    return isinstance(obj, list) and all(isinstance(element, int) or check_nested(element) for element in obj)
+
+
+SHARED = list(range(20))
+
+CASES = [
+    ({str(i): list(range(20)) for i in range(10000)}, typing.Dict[str, typing.List[int]]),
+    ({str(i): list(range(4)) for i in range(10000)}, typing.Dict[str, typing.List[int]]),
+    ([{str(j): j for j in range(10)} for i in range(10000)], typing.List[typing.Dict[str, int]]),
+    ({str(i): SHARED for i in range(10000)}, typing.Dict[str, typing.List[int]]),
+    ([[i, list(range(20))] for i in range(10000)], Nested),
+    ([[i, SHARED] for i in range(10000)], Nested),
+]
+
+
+def main():
+    for value, type_ in CASES:
+        check = check_nested if type_ is Nested else closure_checker(type_)
+        assert check(value) and is_instance(value, type_, namespace=globals())
+
+        old_time = min(timeit.repeat(lambda: check(value), number=5, repeat=5)) / 5
+        new_time = min(timeit.repeat(lambda: is_instance(value, type_, namespace=globals()), number=5, repeat=5)) / 5
+
+        print(type_)
+        print('  closures: {:8.2f} ms, is_instance: {:8.2f} ms, ratio {:5.2f}x'.format(
+            old_time * 1e3, new_time * 1e3, new_time / old_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Compares serial and parallel checks of lists of various sizes, to find the size at which
+splitting a collection into chunks starts to pay off on the current machine.
+
+Run from the repository root with `python -m benchmarks.bench_parallel`.
+"""
+
+import os
+import timeit
+import typing
+
+from datatypes import is_instance, Parallel
+
+
+SIZES = [10 ** 4, 10 ** 5, 10 ** 6, 4 * 10 ** 6]
+ANNOTATIONS = [
+    typing.List[int],
+    typing.List[typing.Tuple[int, str]],
+]
+
+
+def make_value(type_, size):
+    if type_ is typing.List[int]:
+        return list(range(size))
+
+    return [(i, str(i)) for i in range(size)]
+
+
+def main():
+    parallel = Parallel(threshold=1)
+    print('{} CPUs, {} pool'.format(os.cpu_count(), 'process' if parallel.use_processes else 'thread'))
+
+    # start the workers before measuring
+    is_instance(list(range(1000)), typing.List[int], parallel=parallel)
+
+    for type_ in ANNOTATIONS:
+        print(type_)
+        for size in SIZES:
+            value = make_value(type_, size)
+            serial_time = min(timeit.repeat(lambda: is_instance(value, type_), number=1, repeat=3))
+            parallel_time = min(timeit.repeat(lambda: is_instance(value, type_, parallel=parallel), number=1, repeat=3))
+
+            print('  {:>9} elements: serial {:8.2f} ms, parallel {:8.2f} ms, speedup {:5.2f}x'.format(
+                size, serial_time * 1e3, parallel_time * 1e3, serial_time / parallel_time))
+
+
+if __name__ == '__main__':
+    main()
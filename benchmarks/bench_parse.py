@@ -0,0 +1,57 @@
+"""
+Compares parsing large collections the way `parse` used to (converting the element type to a
+datatype again for every element) with compiled parsers, which resolve the whole annotation once.
+
+Run from the repository root with `python -m benchmarks.bench_parse`.
+"""
+
+import timeit
+import typing
+
+from datatypes import compile_parser, parse, Type, class_to_datatype
+
+
+SIZE = 10 ** 5
+
+CASES = [
+    ([str(i) for i in range(SIZE)], typing.List[int]),
+    ([str(i) for i in range(SIZE)], typing.Tuple[float, ...]),
+    ({str(i): str(i) for i in range(SIZE)}, typing.Dict[str, int]),
+    ([str(i) for i in range(SIZE)], typing.Set[int]),
+]
+
+
+def resolve_every_time(value, type_):
+    type_ = class_to_datatype(type_)
+
+    if isinstance(type_, type) and issubclass(type_, Type):
+        return type_.parse(value)
+
+    return type_(value)
+
+
+def per_element(value, type_):
+    if isinstance(value, dict):
+        key_type, value_type = map(class_to_datatype, type_.__args__)
+        return {resolve_every_time(k, key_type): resolve_every_time(v, value_type) for k, v in value.items()}
+
+    item_type = class_to_datatype(type_.__args__[0])
+    return class_to_datatype(type_).python_type(resolve_every_time(v, item_type) for v in value)
+
+
+def main():
+    for value, type_ in CASES:
+        assert per_element(value, type_) == parse(value, type_)
+
+        parse_value = compile_parser(type_)
+
+        old_time = min(timeit.repeat(lambda: per_element(value, type_), number=1, repeat=5))
+        new_time = min(timeit.repeat(lambda: parse_value(value), number=1, repeat=5))
+
+        print(type_)
+        print('  per element: {:8.2f} ms ({:9.0f}/s), compiled: {:8.2f} ms ({:9.0f}/s), speedup {:5.1f}x'.format(
+            old_time * 1e3, SIZE / old_time, new_time * 1e3, SIZE / new_time, old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Compares protocol instance checks that rebuild the protocol's table of abstract members on every
+call (which is what `is_instance` used to do) with the cached checks.
+
+Run from the repository root with `python -m benchmarks.bench_protocol_checks`.
+"""
+
+import timeit
+import typing
+
+from datatypes import is_instance
+from datatypes.type_checks import _ProtocolPlan
+
+
+class Plugin:
+    def __int__(self):
+        return 0
+
+    def __float__(self):
+        return 0.0
+
+
+VALUES = [Plugin(), 1.5, 3, 'x', b'x']
+PROTOCOLS = [typing.SupportsInt, typing.SupportsFloat, typing.SupportsAbs]
+
+REPEAT = 10000
+
+
+def uncached():
+    for proto in PROTOCOLS:
+        for value in VALUES:
+            _ProtocolPlan(proto).check(value)
+
+
+def cached():
+    for proto in PROTOCOLS:
+        for value in VALUES:
+            is_instance(value, proto)
+
+
+def main():
+    uncached_time = timeit.timeit(uncached, number=REPEAT)
+    cached_time = timeit.timeit(cached, number=REPEAT)
+
+    num_checks = REPEAT * len(VALUES) * len(PROTOCOLS)
+    print('uncached: {:8.2f} µs/check'.format(uncached_time / num_checks * 1e6))
+    print('cached:   {:8.2f} µs/check'.format(cached_time / num_checks * 1e6))
+    print('speedup:  {:8.1f}x'.format(uncached_time / cached_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Compares checks of large homogeneous collections that call `isinstance` on every element (which
+is what `is_instance` used to do) with checks that judge each distinct class of element once.
+
+Run from the repository root with `python -m benchmarks.bench_type_scan`.
+"""
+
+import itertools
+import numbers
+import timeit
+import typing
+
+from datatypes import is_instance
+from datatypes.type_checks import _isinstance_target
+
+
+SIZE = 10 ** 6
+
+CASES = [
+    (list(range(SIZE)), typing.List[int]),
+    (list(range(SIZE)), typing.List[numbers.Integral]),
+    (list(range(SIZE)), typing.List[typing.Union[str, bytes, float, int]]),
+    (list(range(SIZE)), typing.List[typing.Hashable]),
+    (dict.fromkeys(map(str, range(SIZE)), 1.5), typing.Dict[str, typing.Union[int, float]]),
+]
+
+
+def per_element(value, type_):
+    if isinstance(value, dict):
+        key_target, value_target = map(_isinstance_target, type_.__args__)
+        return (all(map(isinstance, value.keys(), itertools.repeat(key_target)))
+                and all(map(isinstance, value.values(), itertools.repeat(value_target))))
+
+    target = _isinstance_target(type_.__args__[0])
+    return all(map(isinstance, value, itertools.repeat(target)))
+
+
+def main():
+    for value, type_ in CASES:
+        assert is_instance(value, type_)
+
+        old_time = min(timeit.repeat(lambda: per_element(value, type_), number=1, repeat=5))
+        new_time = min(timeit.repeat(lambda: is_instance(value, type_), number=1, repeat=5))
+
+        print(type_)
+        print('  per element: {:8.2f} ms, by class: {:8.2f} ms, speedup {:5.1f}x'.format(
+            old_time * 1e3, new_time * 1e3, old_time / new_time))
+
+
+if __name__ == '__main__':
+    main()
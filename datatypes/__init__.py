@@ -1,9 +1,17 @@
 
 __version__ = '1.0'
 
+from .containers import *
 from .converter import *
 from .types import *
 from .type_checks import *
 from .type_compat import *
 from .introspection import *
 from .parse import *
+from .sampling import *
+from .parallel import *
+from .memo import *
+from .constraints import *
+from .streams import *
+from .async_checks import *
+from .diagnostics import *
@@ -0,0 +1,94 @@
+
+import asyncio
+import collections.abc
+import functools
+import itertools
+import time
+
+from .type_checks import is_instance, _get_checker, _chunk_plan
+
+
+__all__ = ['is_instance_async']
+
+
+# if slices are limited in time, the first slice is small, since it's unknown how long checking an element takes
+_FIRST_SLICE_SIZE = 64
+
+
+async def _check_in_slices(check_chunk, args, elements, slice_budget, slice_time):
+    iterator = iter(elements)
+    chunk_size = slice_budget if slice_time is None else min(slice_budget, _FIRST_SLICE_SIZE)
+
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return True
+
+        start = time.perf_counter()
+        if not check_chunk(*args, chunk):
+            return False
+        elapsed = time.perf_counter() - start
+
+        # the size of the next slice is adjusted so that checking it takes about `slice_time`
+        if slice_time is not None:
+            chunk_size = min(slice_budget, max(int(len(chunk) * slice_time / max(elapsed, 1e-9)), 1))
+
+        await asyncio.sleep(0)
+
+
+async def is_instance_async(obj, type_, slice_budget=10000, slice_time=0.002, executor=None,
+                            offload_threshold=1000000):
+    """
+    The asynchronous counterpart of `is_instance`, for use in asyncio code. Runs the same checks
+    as `is_instance`, but doesn't block the event loop for long: large collections are checked in
+    slices of at most `slice_budget` elements, and control is given back to the event loop after
+    each slice. If `slice_time` (in seconds) isn't None, the slices are made smaller when checking
+    a slice takes longer than that.
+
+    If an `executor` is passed, collections with at least `offload_threshold` elements are
+    checked in the executor instead, so that the event loop isn't blocked at all. For process
+    pools, the object and the annotation must be picklable.
+
+    Like with `Parallel`, only the outermost collection is split, so a single huge element still
+    blocks the event loop while it's checked.
+
+    Example:
+    ::
+        async def handle(request):
+            payload = await request.json()
+            if not await is_instance_async(payload, typing.List[Event]):
+                raise BadRequest
+    """
+    if slice_budget < 1:
+        raise ValueError('slice_budget must be positive')
+
+    if slice_time is not None and slice_time <= 0:
+        raise ValueError('slice_time must be positive')
+
+    plan = _chunk_plan(type_)
+    if plan is None:
+        return _get_checker(type_)(obj)
+
+    result = plan(obj)
+    if result is True or result is False:
+        return result
+
+    check_chunk, args, elements = result
+    try:
+        size = len(elements)
+    except TypeError:
+        size = None
+
+    if size is not None and size <= slice_budget:
+        return _get_checker(type_)(obj)
+
+    if executor is not None and size is not None and size >= offload_threshold:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(is_instance, obj, type_))
+
+    # other tasks may change the collection while this one waits, which breaks iterating over
+    # dicts and sets, so these are copied first
+    if size is not None and not isinstance(elements, collections.abc.Sequence):
+        elements = list(elements)
+
+    return await _check_in_slices(check_chunk, args, elements, slice_budget, slice_time)
@@ -0,0 +1,94 @@
+__all__ = ['AnnotationCache', 'IdentityCache']
+
+
+class AnnotationCache:
+    """
+    A bounded cache of values that are computed from type annotations, like checkers or parsers.
+
+    Hashing typing annotations is slow, so annotations are looked up by identity first. Each entry
+    keeps a reference to its annotation, so ids can't be reused while it's cached. Annotations
+    that are written inline (like `list[int]` or `int | None`) are new objects every time, so
+    they're looked up by equality as well. Equal annotations that are found that way aren't added
+    to the identity cache, so that inline annotations don't evict the others. When the cache is
+    full, it's cleared.
+
+    :param maxsize: The maximum number of annotations to keep
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+
+        # maps the ids of annotations to `(annotation, value)` tuples
+        self._by_id = {}
+        # maps (hashable) annotations to values
+        self._by_annotation = {}
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def clear(self):
+        self._by_id.clear()
+        self._by_annotation.clear()
+
+    def get(self, type_):
+        """
+        Returns the value that's cached for `type_` (or an annotation equal to it), or None.
+        """
+        try:
+            return self._by_id[id(type_)][1]
+        except KeyError:
+            pass
+
+        try:
+            return self._by_annotation.get(type_)
+        except (TypeError, RecursionError):
+            # unhashable (or very deeply nested) annotations can only be cached by identity
+            return None
+
+    def set(self, type_, value):
+        if len(self._by_id) >= self.maxsize:
+            self._by_id.clear()
+        self._by_id[id(type_)] = (type_, value)
+
+        if len(self._by_annotation) >= self.maxsize:
+            self._by_annotation.clear()
+        try:
+            self._by_annotation[type_] = value
+        except (TypeError, RecursionError):
+            pass
+
+
+class IdentityCache:
+    """
+    A bounded cache of values that are computed from several objects, like a pair of annotations.
+    The objects are compared by identity, and each entry keeps references to them, so their ids
+    can't be reused while it's cached. When the cache is full, it's cleared.
+
+    :param maxsize: The maximum number of entries to keep
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+
+        # maps tuples of ids to `(objects, value)` tuples
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get(self, objs, default=None):
+        """
+        Returns the value that's cached for the tuple of objects `objs`, or `default`.
+        """
+        try:
+            return self._entries[tuple(map(id, objs))][1]
+        except KeyError:
+            return default
+
+    def set(self, objs, value):
+        if len(self._entries) >= self.maxsize:
+            self._entries.clear()
+        self._entries[tuple(map(id, objs))] = (objs, value)
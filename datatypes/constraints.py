@@ -0,0 +1,251 @@
+import operator
+import re
+
+
+__all__ = ['Constraint', 'Gt', 'Ge', 'Lt', 'Le', 'MinLen', 'MaxLen', 'Pattern', 'Predicate']
+
+
+class Constraint:
+    """
+    Base class of constraints that can be attached to an annotation with `typing.Annotated`.
+    They're checked by `is_instance` and `parse` after (or, if they only concern the size of a
+    collection, before) the elements of a value.
+
+    Example:
+    ::
+        >>> is_instance([3, 5], Annotated[List[Annotated[int, Ge(0)]], MaxLen(8)])
+        True
+        >>> parse('-1', Annotated[int, Ge(0)])
+        Traceback (most recent call last):
+          ...
+        ValueError: -1 doesn't satisfy Ge(0)
+    """
+
+    __slots__ = ()
+
+    # whether the constraint only looks at the size of a value, so that it can be checked before
+    # the elements of a collection
+    concerns_size = False
+
+    def predicate(self):
+        """
+        Returns a function that takes a value (which is known to be an instance of the annotated
+        type) and returns whether it satisfies the constraint.
+        """
+        raise NotImplementedError
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+
+        return self._args() == other._args()
+
+    def __hash__(self):
+        return hash((type(self), self._args()))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(map(repr, self._args())))
+
+    def _args(self):
+        return tuple(getattr(self, name) for cls in reversed(type(self).__mro__)
+                     for name in vars(cls).get('__slots__', ()))
+
+
+class _Bound(Constraint):
+    __slots__ = ('bound',)
+
+    # the comparison and whether it's a lower bound
+    _operator = None
+    _is_lower = False
+
+    def __init__(self, bound):
+        self.bound = bound
+
+    def predicate(self):
+        compare = self._operator
+        bound = self.bound
+        return lambda value: compare(value, bound)
+
+
+class Gt(_Bound):
+    """
+    The value must be greater than `bound`.
+    """
+    __slots__ = ()
+    _operator = operator.gt
+    _is_lower = True
+
+
+class Ge(_Bound):
+    """
+    The value must be greater than or equal to `bound`.
+    """
+    __slots__ = ()
+    _operator = operator.ge
+    _is_lower = True
+
+
+class Lt(_Bound):
+    """
+    The value must be less than `bound`.
+    """
+    __slots__ = ()
+    _operator = operator.lt
+
+
+class Le(_Bound):
+    """
+    The value must be less than or equal to `bound`.
+    """
+    __slots__ = ()
+    _operator = operator.le
+
+
+class MinLen(Constraint):
+    """
+    The value must have at least `length` elements. `MinLen(1)` means that it mustn't be empty.
+    """
+    __slots__ = ('length',)
+    concerns_size = True
+
+    def __init__(self, length):
+        self.length = length
+
+    def predicate(self):
+        length = self.length
+        return lambda value: len(value) >= length
+
+
+class MaxLen(Constraint):
+    """
+    The value must have at most `length` elements.
+    """
+    __slots__ = ('length',)
+    concerns_size = True
+
+    def __init__(self, length):
+        self.length = length
+
+    def predicate(self):
+        length = self.length
+        return lambda value: len(value) <= length
+
+
+class Pattern(Constraint):
+    """
+    The value (a `str` or `bytes`) must contain a match of the regular expression `pattern`. Use
+    `^` and `$` to match the whole value.
+    """
+    __slots__ = ('pattern',)
+
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    def predicate(self):
+        search = re.compile(self.pattern).search
+        return lambda value: search(value) is not None
+
+
+class Predicate(Constraint):
+    """
+    `func(value)` must return a true value.
+    """
+    __slots__ = ('func',)
+
+    def __init__(self, func):
+        self.func = func
+
+    def predicate(self):
+        func = self.func
+        return lambda value: bool(func(value))
+
+
+def _range_predicate(lower, upper):
+    # a single chained comparison is faster than calling two predicates
+    lower_op = lower._operator
+    upper_op = upper._operator
+    low = lower.bound
+    high = upper.bound
+
+    if lower_op is operator.ge and upper_op is operator.le:
+        return lambda value: low <= value <= high
+    if lower_op is operator.ge:
+        return lambda value: low <= value < high
+    if upper_op is operator.le:
+        return lambda value: low < value <= high
+    return lambda value: low < value < high
+
+
+def _rejecting_type_errors(check):
+    # values that a constraint can't be applied to (like `None` with `Ge(0)`) don't satisfy it
+    def safe_check(value):
+        try:
+            return check(value)
+        except TypeError:
+            return False
+
+    return safe_check
+
+
+def all_of(checks):
+    """
+    Returns a function that returns whether all of the functions in `checks` (which may contain
+    None) return True for a value. They're called in order until one of them returns False.
+    """
+    checks = [check for check in checks if check is not None]
+
+    if not checks:
+        return None
+
+    if len(checks) == 1:
+        return checks[0]
+
+    if len(checks) == 2:
+        first, second = checks
+        return lambda value: first(value) and second(value)
+
+    if len(checks) == 3:
+        first, second, third = checks
+        return lambda value: first(value) and second(value) and third(value)
+
+    return lambda value: all(check(value) for check in checks)
+
+
+def compile_constraints(metadata):
+    """
+    Returns a `(check_size, check_value)` tuple of functions that check the `Constraint`s in
+    `metadata` that concern the size of a value and all others, respectively. Both are None if
+    there are no such constraints. Objects in `metadata` that aren't constraints are ignored.
+    """
+    constraints = [obj for obj in metadata if isinstance(obj, Constraint)]
+
+    size_constraints = [c for c in constraints if c.concerns_size]
+    value_constraints = [c for c in constraints if not c.concerns_size]
+
+    # a single lower and upper bound are fused into one comparison
+    lower = [c for c in value_constraints if isinstance(c, _Bound) and c._is_lower]
+    upper = [c for c in value_constraints if isinstance(c, _Bound) and not c._is_lower]
+    range_predicate = None
+    if len(lower) == 1 and len(upper) == 1:
+        range_predicate = _range_predicate(lower[0], upper[0])
+        value_constraints = [c for c in value_constraints if c is not lower[0] and c is not upper[0]]
+
+    check_size = all_of(c.predicate() for c in size_constraints)
+    check_value = all_of([range_predicate] + [c.predicate() for c in value_constraints])
+
+    if check_size is not None:
+        check_size = _rejecting_type_errors(check_size)
+    if check_value is not None:
+        check_value = _rejecting_type_errors(check_value)
+    return check_size, check_value
+
+
+def find_violation(value, metadata):
+    """
+    Returns the first `Constraint` in `metadata` that `value` doesn't satisfy, or None.
+    """
+    for constraint in metadata:
+        if isinstance(constraint, Constraint) and not _rejecting_type_errors(constraint.predicate())(value):
+            return constraint
+
+    return None
@@ -0,0 +1,256 @@
+
+import collections.abc
+import typing
+
+from .type_checks import compile_checker, register_element_type, register_item_types, _set_element_type, _set_item_types
+
+
+__all__ = ['TypedList', 'TypedDict', 'FrozenTypedList']
+
+
+def _type_name(type_):
+    if getattr(type_, '__module__', None) == 'typing':
+        return str(type_).replace('typing.', '')
+
+    return getattr(type_, '__qualname__', repr(type_))
+
+
+def _rebuild(base, subtypes, *args):
+    return base[subtypes](*args)
+
+
+class TypedContainerMeta(type):
+    """
+    Metaclass for containers that validate their contents. Subscripting a typed container class
+    with type annotations (`TypedList[int]`) creates a subclass that only accepts instances of
+    those annotations. Because every modification is validated, `is_instance` can check these
+    containers without looking at their contents.
+    """
+
+    def __new__(mcs, name, bases, attrs, subtype_names=None):
+        return super().__new__(mcs, name, bases, attrs)
+
+    def __init__(cls, name, bases, attrs, subtype_names=None):
+        super().__init__(name, bases, attrs)
+
+        if subtype_names is not None:
+            cls._subtype_names = subtype_names
+            cls._class_for_subtype = {}
+            cls._subtypes = None
+
+            for subtype_name in subtype_names:
+                setattr(cls, subtype_name, typing.Any)
+
+    def __getitem__(cls, subtypes):
+        if cls._subtypes is not None:
+            raise TypeError("{} is already specialized".format(cls.__name__))
+
+        if not isinstance(subtypes, tuple):
+            subtypes = (subtypes,)
+
+        if len(subtypes) != len(cls._subtype_names):
+            raise TypeError('{} expects {} type arguments, not {}'.format(cls.__name__, len(cls._subtype_names),
+                                                                         len(subtypes)))
+
+        try:
+            return cls._class_for_subtype[subtypes]
+        except KeyError:
+            pass
+
+        name = '{}[{}]'.format(cls.__name__, ', '.join(_type_name(subtype) for subtype in subtypes))
+        attrs = {
+            '__module__': cls.__module__,
+            '__qualname__': name,
+            '_subtypes': subtypes,
+        }
+        subcls = type(cls)(name, (cls,), attrs)
+        for subtype, subtype_name in zip(subtypes, cls._subtype_names):
+            setattr(subcls, subtype_name, subtype)
+        subcls._register()
+
+        cls._class_for_subtype[subtypes] = subcls
+        return subcls
+
+    def _validate(cls, value, type_):
+        if not compile_checker(type_)(value):
+            raise TypeError('{} expected an instance of {}, got {!r}'.format(cls.__name__, _type_name(type_), value))
+
+        return value
+
+    def _validate_all(cls, values, type_):
+        check = compile_checker(type_)
+        for value in values:
+            if not check(value):
+                raise TypeError('{} expected an instance of {}, got {!r}'.format(cls.__name__, _type_name(type_), value))
+
+        return values
+
+
+class TypedList(list, metaclass=TypedContainerMeta, subtype_names=['item_type']):
+    """
+    A list that only accepts items of type `item_type`.
+
+    Example:
+    ::
+        >>> numbers = TypedList[int]([1, 2])
+        >>> numbers.append('3')
+        Traceback (most recent call last):
+          ...
+        TypeError: TypedList[int] expected an instance of int, got '3'
+    """
+
+    def __init__(self, iterable=()):
+        cls = type(self)
+        super().__init__(cls._validate_all(list(iterable), cls.item_type))
+
+    @classmethod
+    def _register(cls):
+        _set_element_type(cls, cls.item_type)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, super().__repr__())
+
+    def __reduce__(self):
+        cls = type(self)
+        return _rebuild, (cls.__base__, cls._subtypes, list(self))
+
+    def __setitem__(self, index, value):
+        cls = type(self)
+        if isinstance(index, slice):
+            value = cls._validate_all(list(value), cls.item_type)
+        else:
+            value = cls._validate(value, cls.item_type)
+
+        super().__setitem__(index, value)
+
+    def __iadd__(self, other):
+        self.extend(other)
+        return self
+
+    def append(self, value):
+        cls = type(self)
+        super().append(cls._validate(value, cls.item_type))
+
+    def insert(self, index, value):
+        cls = type(self)
+        super().insert(index, cls._validate(value, cls.item_type))
+
+    def extend(self, iterable):
+        cls = type(self)
+        super().extend(cls._validate_all(list(iterable), cls.item_type))
+
+    def copy(self):
+        # the items are already validated, so the constructor is bypassed
+        copy = list.__new__(type(self))
+        list.extend(copy, self)
+        return copy
+
+
+class FrozenTypedList(tuple, metaclass=TypedContainerMeta, subtype_names=['item_type']):
+    """
+    An immutable sequence that only contains items of type `item_type`.
+    """
+
+    def __new__(cls, iterable=()):
+        return super().__new__(cls, cls._validate_all(tuple(iterable), cls.item_type))
+
+    @classmethod
+    def _register(cls):
+        _set_element_type(cls, cls.item_type)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, list(self))
+
+    def __reduce__(self):
+        cls = type(self)
+        return _rebuild, (cls.__base__, cls._subtypes, tuple(self))
+
+
+# The views of a `TypedDict` are python classes rather than `dict_keys` etc., so that `is_instance`
+# can tell which dict they belong to and doesn't have to look at their contents
+
+class _TypedKeysView(collections.abc.KeysView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(dict.keys(self._mapping))
+
+
+class _TypedValuesView(collections.abc.ValuesView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(dict.values(self._mapping))
+
+    def __contains__(self, value):
+        return value in dict.values(self._mapping)
+
+
+class _TypedItemsView(collections.abc.ItemsView):
+    __slots__ = ()
+
+    def __iter__(self):
+        return iter(dict.items(self._mapping))
+
+
+register_element_type(_TypedKeysView, lambda view: type(view._mapping).key_type)
+register_element_type(_TypedValuesView, lambda view: type(view._mapping).value_type)
+register_item_types(_TypedItemsView, lambda view: (type(view._mapping).key_type, type(view._mapping).value_type))
+
+
+class TypedDict(dict, metaclass=TypedContainerMeta, subtype_names=['key_type', 'value_type']):
+    """
+    A dict that only accepts keys of type `key_type` and values of type `value_type`.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.update(*args, **kwargs)
+
+    @classmethod
+    def _register(cls):
+        _set_element_type(cls, cls.key_type)
+        _set_item_types(cls, cls.key_type, cls.value_type)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, super().__repr__())
+
+    def __reduce__(self):
+        cls = type(self)
+        return _rebuild, (cls.__base__, cls._subtypes, dict(self))
+
+    def __setitem__(self, key, value):
+        cls = type(self)
+        super().__setitem__(cls._validate(key, cls.key_type), cls._validate(value, cls.value_type))
+
+    def keys(self):
+        return _TypedKeysView(self)
+
+    def values(self):
+        return _TypedValuesView(self)
+
+    def items(self):
+        return _TypedItemsView(self)
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, *args, **kwargs):
+        cls = type(self)
+        items = dict(*args, **kwargs)
+        cls._validate_all(items.keys(), cls.key_type)
+        cls._validate_all(items.values(), cls.value_type)
+        super().update(items)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+
+        return self[key]
+
+    def copy(self):
+        # the items are already validated, so the constructor is bypassed
+        copy = dict.__new__(type(self))
+        dict.update(copy, self)
+        return copy
@@ -0,0 +1,280 @@
+
+import itertools
+
+from .type_checks import (_get_checker, _container_info, _union_alternatives, _iterable_checker, _mapping_checker,
+                          _tuple_checker, _field_plan_info, _get_field_plan, _is_nested, _resolve_alias)
+
+
+__all__ = ['check', 'Mismatch']
+
+
+class Mismatch:
+    """
+    Describes an object that isn't an instance of the annotation it was expected to be an
+    instance of.
+
+    :param path: A JSON pointer (like `'/users/3/name'`) to the object, relative to the checked object
+    :param expected: The annotation the object was expected to be an instance of
+    :param actual: The class of the object
+    :param key: Whether the object is the key (rather than the value) of the mapping entry `path` points to
+    """
+
+    __slots__ = ('path', 'expected', 'actual', 'key')
+
+    def __init__(self, path, expected, actual, key=False):
+        self.path = path
+        self.expected = expected
+        self.actual = actual
+        self.key = key
+
+    def __eq__(self, other):
+        if not isinstance(other, Mismatch):
+            return NotImplemented
+
+        return (self.path, self.expected, self.actual, self.key) == (other.path, other.expected, other.actual,
+                                                                     other.key)
+
+    def __repr__(self):
+        return '{}(path={!r}, expected={!r}, actual={!r}{})'.format(type(self).__name__, self.path, self.expected,
+                                                                    self.actual, ', key=True' if self.key else '')
+
+
+# the path token of an object that is checked against an alternative of a union
+_SAME = object()
+
+
+def _pointer(tokens):
+    return ''.join('/' + str(token).replace('~', '~0').replace('/', '~1') for token in tokens if token is not _SAME)
+
+
+def _iter_elements(obj, make_checker, type_args):
+    """
+    Yields `(element, annotation, token, is_key)` tuples for all elements of the container `obj`.
+    """
+    if make_checker is _iterable_checker:
+        element_type, = type_args
+        for index, element in enumerate(obj):
+            yield element, element_type, index, False
+    elif make_checker is _tuple_checker:
+        for index, (element, element_type) in enumerate(zip(obj, type_args)):
+            yield element, element_type, index, False
+    else:
+        key_type, value_type = type_args
+        items = obj.items() if make_checker is _mapping_checker else obj
+        for key, value in items:
+            yield key, key_type, key, True
+            yield value, value_type, key, False
+
+
+def _flat_alternatives(alternatives):
+    # unions can contain references to other unions
+    for alternative in alternatives:
+        nested = _union_alternatives(alternative)
+        if nested is None:
+            yield alternative
+        else:
+            yield from _flat_alternatives(nested)
+
+
+class _Plan:
+    """
+    Describes how to explain mismatches of an annotation, computed once per annotation and
+    `check` call:
+
+    - `union` is a list of `(alternative, python_type)` tuples if the annotation is a union,
+      where `python_type` is the class of the alternative's instances if they're containers
+      (or objects with fields) and None otherwise.
+    - `field_plan` is the `_FieldPlan` of classes with fields.
+    - `container` is a `(python_type, make_checker, type_args)` tuple for containers.
+    - Objects that are none of these are checked by `check`.
+    """
+
+    __slots__ = ('type_', 'union', 'field_plan', 'container', 'check')
+
+    def __init__(self, type_):
+        self.type_ = type_
+        self.union = None
+        self.field_plan = None
+        self.container = None
+        self.check = None
+
+
+def _container_type(type_):
+    info = _field_plan_info(type_)
+    if info is not None:
+        return info[0]
+
+    info = _container_info(type_)
+    return None if info is None else info[0]
+
+
+def _make_plan(type_):
+    try:
+        type_ = _resolve_alias(type_)
+    except Exception:
+        pass
+
+    plan = _Plan(type_)
+
+    alternatives = _union_alternatives(type_)
+    if alternatives is not None:
+        plan.union = [(alternative, _container_type(alternative)) for alternative in _flat_alternatives(alternatives)]
+        return plan
+
+    info = _field_plan_info(type_)
+    if info is not None:
+        plan.field_plan = _get_field_plan(type_, info[1])
+        return plan
+
+    info = _container_info(type_)
+    if info is not None:
+        plan.container = info
+
+        # containers of objects that aren't containers are checked in one go first, since that's
+        # faster than looking at each element if the container is fine
+        if not any(map(_is_nested, info[2])):
+            plan.check = _get_checker(type_)
+
+        return plan
+
+    plan.check = _get_checker(type_)
+    return plan
+
+
+def _explain_union(obj, plan):
+    """
+    Returns True if `obj` is an instance of the union described by `plan`, or the container
+    alternative the mismatches of its elements should be looked for in, if there's exactly one
+    that `obj` could be an instance of. Otherwise returns False.
+    """
+    candidates = []
+    for alternative, python_type in plan.union:
+        if python_type is None:
+            if _get_checker(alternative)(obj):
+                return True
+        elif isinstance(obj, python_type):
+            candidates.append(alternative)
+
+    if len(candidates) == 1:
+        return candidates[0]
+
+    # blaming one of several candidates could be misleading, so the union is blamed instead
+    return any(_get_checker(alternative)(obj) for alternative in candidates)
+
+
+def _explain(obj, plan):
+    """
+    Returns None if `obj` is an instance of the annotation described by `plan` as far as it
+    itself is concerned, False if it isn't, or an iterator of `(element, annotation, token,
+    is_key)` tuples for its elements, which it's an instance of if they're instances of theirs.
+    """
+    if plan.union is not None:
+        alternative = _explain_union(obj, plan)
+        if alternative is True:
+            return None
+        if alternative is False:
+            return False
+
+        return iter([(obj, alternative, _SAME, False)])
+
+    if plan.field_plan is not None:
+        elements = plan.field_plan.get_elements(obj)
+        if elements is None:
+            return False
+
+        return ((value, annotation, name, False) for value, annotation, name in elements)
+
+    if plan.container is None:
+        return None if plan.check(obj) else False
+
+    python_type, make_checker, type_args = plan.container
+    if not isinstance(obj, python_type):
+        return False
+
+    if make_checker is _tuple_checker and len(obj) != len(type_args):
+        return False
+
+    if plan.check is not None and plan.check(obj):
+        return None
+
+    return _iter_elements(obj, make_checker, type_args)
+
+
+def _iter_mismatches(obj, type_):
+    # Each element is only looked at once. The stack holds an iterator of the elements of each
+    # container that is being explained, and `tokens` the path to each of them, so the path
+    # to a mismatch is only built when it's found. Containers that have already been explained
+    # are skipped, so that self-referencing objects don't lead to an endless loop.
+    plans = {}
+    seen = {}
+    tokens = []
+    blamed = []
+
+    stack = [iter([(obj, type_, _SAME, False)])]
+    while stack:
+        for obj, type_, token, is_key in stack[-1]:
+            try:
+                plan = plans[id(type_)][1]
+            except KeyError:
+                plan = _make_plan(type_)
+                plans[id(type_)] = (type_, plan)
+
+            # the annotation of a union is blamed if an object doesn't match its only candidate
+            blame = blamed[-1] if token is _SAME and blamed else plan.type_
+
+            if is_key:
+                explanation = None if _get_checker(plan.type_)(obj) else False
+            else:
+                key = (id(obj), id(plan))
+                if key in seen:
+                    continue
+
+                explanation = _explain(obj, plan)
+
+            if explanation is None:
+                continue
+
+            if explanation is False:
+                yield Mismatch(_pointer(tokens + [token]), blame, type(obj), is_key)
+                continue
+
+            seen[key] = obj
+
+            tokens.append(token)
+            blamed.append(plan.type_ if plan.union is not None else blame)
+            stack.append(explanation)
+            break
+        else:
+            stack.pop()
+            if tokens:
+                tokens.pop()
+                blamed.pop()
+
+
+def check(obj, type_, collect_all=False, max_errors=100):
+    """
+    Checks whether `obj` is an instance of the type annotation `type_`, like `is_instance`. But
+    instead of a boolean, this returns None if `obj` is an instance of `type_`, and otherwise a
+    `Mismatch` that describes the first element that has the wrong type.
+
+    If `collect_all` is True, a list of (up to `max_errors`) `Mismatch`es is returned instead,
+    which is empty if `obj` is an instance of `type_`.
+
+    The elements are only looked at individually if `obj` isn't an instance of `type_`, so
+    checking a valid object is just as fast as with `is_instance`.
+
+    Example:
+    ::
+        >>> check({'a': [1, 2], 'b': [3, 'x']}, typing.Dict[str, typing.List[int]])
+        Mismatch(path='/b/1', expected=<class 'int'>, actual=<class 'str'>)
+    """
+    if _get_checker(type_)(obj):
+        return [] if collect_all else None
+
+    # if the elements can't be checked again (because `obj` is an iterator, for example), the
+    # object itself is blamed
+    mismatches = list(itertools.islice(_iter_mismatches(obj, type_), max_errors if collect_all else 1))
+    if not mismatches:
+        mismatches = [Mismatch('', type_, type(obj))]
+
+    return mismatches if collect_all else mismatches[0]
@@ -1,6 +1,12 @@
 
+import types
 import typing
 
+try:
+    import typing_extensions
+except ImportError:
+    typing_extensions = None
+
 from datatypes.types import Type
 from datatypes.types.generics import GenericMeta, QualifiedGenericMeta
 from datatypes import types as dtypes
@@ -9,7 +15,104 @@ __all__ = ['get_python_type', 'is_generic', 'is_base_generic', 'is_qualified_gen
            'get_subtypes']
 
 
-if hasattr(typing, '_GenericAlias'):
+# Before python 3.9, `Annotated` is only available in `typing_extensions`, where annotated types
+# are represented as qualified versions of the class they annotate
+_Annotated = getattr(typing, 'Annotated', None) or getattr(typing_extensions, 'Annotated', None)
+
+
+def _is_legacy_annotated(cls):
+    return _Annotated is not None and not hasattr(typing, 'Annotated') and hasattr(cls, '__metadata__')
+
+
+if hasattr(typing, 'get_origin'):
+    # python 3.8+
+    _UNION_TYPES = {typing.Union}
+    if hasattr(types, 'UnionType'):
+        # python 3.10+ (`int | str`)
+        _UNION_TYPES.add(types.UnionType)
+
+    # special forms that can be subscripted, but don't have an origin themselves
+    _SPECIAL_FORMS = {typing.Union, typing.Optional, typing.ClassVar}
+    for _module in (typing, typing_extensions):
+        for _name in ('Final', 'Literal', 'Annotated', 'Concatenate', 'TypeGuard', 'Required', 'NotRequired'):
+            _form = getattr(_module, _name, None)
+            if _form is not None:
+                _SPECIAL_FORMS.add(_form)
+
+    # Maps the origins of the unqualified generics in the `typing` module (like `list` for
+    # `typing.List`) to those generics, so that `list[int]` and `List[int]` have the same base
+    _TYPING_GENERICS = {}
+    for _generic in vars(typing).values():
+        _origin = typing.get_origin(_generic)
+        if _origin is not None and _origin is not typing.Generic and not typing.get_args(_generic):
+            _TYPING_GENERICS.setdefault(_origin, _generic)
+    _TYPING_GENERICS.update(dict.fromkeys(_UNION_TYPES, typing.Union))
+
+    # qualified generics can compare equal to their base (`Tuple[()] == Tuple` in some versions),
+    # so the bases are identified by id. They're module globals, so the ids are never reused.
+    _BASE_GENERIC_IDS = {id(generic) for generic in _TYPING_GENERICS.values()}
+
+
+    def _is_special_form(cls):
+        try:
+            return cls in _SPECIAL_FORMS
+        except TypeError:
+            return False
+
+
+    def _is_generic(cls):
+        if _is_special_form(cls):
+            return True
+
+        return cls is not typing.Generic and typing.get_origin(cls) is not None
+
+
+    def _is_base_generic(cls):
+        return _is_special_form(cls) or id(cls) in _BASE_GENERIC_IDS
+
+
+    def _get_base_generic(cls):
+        if _is_legacy_annotated(cls):
+            return _Annotated
+
+        origin = typing.get_origin(cls)
+        return _TYPING_GENERICS.get(origin, origin)
+
+
+    def _get_python_type(cls):
+        """
+        Like `python_type`, but only works with `typing` classes.
+        """
+        if _is_legacy_annotated(cls):
+            return get_python_type(cls.__origin__)
+
+        origin = typing.get_origin(cls)
+        if origin is None:
+            raise NotImplementedError("Cannot determine python type of {}".format(cls))
+
+        if origin in _UNION_TYPES:
+            return typing.Union
+
+        if origin is _Annotated:
+            return get_python_type(typing.get_args(cls)[0])
+
+        return origin
+
+
+    def _get_subtypes(cls):
+        if _is_legacy_annotated(cls):
+            return (cls.__origin__,) + cls.__metadata__
+
+        subtypes = typing.get_args(cls)
+
+        # the parameters of callables are returned as a list
+        if subtypes and isinstance(subtypes[0], list):
+            subtypes = (tuple(subtypes[0]),) + subtypes[1:]
+
+        return subtypes
+
+
+elif hasattr(typing, '_GenericAlias'):
     # python 3.7
     def _is_generic(cls):
         if isinstance(cls, typing._GenericAlias):
@@ -38,6 +141,9 @@ if hasattr(typing, '_GenericAlias'):
 
 
     def _get_base_generic(cls):
+        if _is_legacy_annotated(cls):
+            return _Annotated
+
         # subclasses of Generic will have their _name set to None, but
         # their __origin__ will point to the base generic
         if cls._name is None:
@@ -53,11 +159,17 @@ if hasattr(typing, '_GenericAlias'):
         return cls.__origin__
 
 
-    def _get_name(cls):
-        try:
-            return cls._name
-        except AttributeError:
-            return cls.__name__
+    def _get_subtypes(cls):
+        if _is_legacy_annotated(cls):
+            return (cls.__origin__,) + cls.__metadata__
+
+        subtypes = cls.__args__
+
+        if get_base_generic(cls) is typing.Callable:
+            if len(subtypes) != 2 or subtypes[0] is not ...:
+                subtypes = (subtypes[:-1], subtypes[-1])
+
+        return subtypes
 else:
     # python <3.7
     if hasattr(typing, '_Union'):
@@ -77,6 +189,19 @@ else:
                 return True
 
             return False
+
+
+        def _get_subtypes(cls):
+            if _is_legacy_annotated(cls):
+                return (cls.__origin__,) + cls.__metadata__
+
+            subtypes = cls.__args__
+
+            if get_base_generic(cls) is typing.Callable:
+                if len(subtypes) != 2 or subtypes[0] is not ...:
+                    subtypes = (subtypes[:-1], subtypes[-1])
+
+            return subtypes
     else:
         # python 3.5
         def _is_generic(cls):
@@ -105,6 +230,26 @@ else:
             return False
 
 
+        def _get_subtypes(cls):
+            if isinstance(cls, typing.CallableMeta):
+                if cls.__args__ is None:
+                    return ()
+
+                return cls.__args__, cls.__result__
+
+            for name in ['__parameters__', '__union_params__', '__tuple_params__']:
+                try:
+                    subtypes = getattr(cls, name)
+                    break
+                except AttributeError:
+                    pass
+            else:
+                raise NotImplementedError("Cannot extract subtypes from {}".format(cls))
+
+            subtypes = [typ for typ in subtypes if not isinstance(typ, typing.TypeVar)]
+            return subtypes
+
+
     def _get_base_generic(cls):
         try:
             return cls.__origin__
@@ -147,47 +292,21 @@ else:
         raise NotImplementedError("Cannot determine python type of {}".format(cls))
 
 
-    def _get_name(cls):
-        try:
-            return cls.__name__
-        except AttributeError:
-            return type(cls).__name__[1:]
-
-
-if hasattr(typing.List, '__args__'):
-    # python 3.6+
-    def _get_subtypes(cls):
-        subtypes = cls.__args__
-
-        if get_base_generic(cls) is typing.Callable:
-            if len(subtypes) != 2 or subtypes[0] is not ...:
-                subtypes = (subtypes[:-1], subtypes[-1])
-
-        return subtypes
-else:
-    # python 3.5
-    def _get_subtypes(cls):
-        if isinstance(cls, typing.CallableMeta):
-            if cls.__args__ is None:
-                return ()
-
-            return cls.__args__, cls.__result__
-
-        for name in ['__parameters__', '__union_params__', '__tuple_params__']:
-            try:
-                subtypes = getattr(cls, name)
-                break
-            except AttributeError:
-                pass
-        else:
-            raise NotImplementedError("Cannot extract subtypes from {}".format(cls))
-
-        subtypes = [typ for typ in subtypes if not isinstance(typ, typing.TypeVar)]
-        return subtypes
+# the base classes of protocols, which aren't protocols themselves
+_PROTOCOL_BASES = tuple(base for base in (getattr(typing, 'Protocol', None), getattr(typing, '_Protocol', None),
+                                          getattr(typing_extensions, 'Protocol', None))
+                        if base is not None)
 
 
 def _is_protocol(cls):
-    return isinstance(cls, typing._ProtocolMeta)
+    """
+    Returns whether `cls` is a protocol class, like `typing.SupportsInt` or a user-defined subclass
+    of `typing.Protocol` (whether it's runtime checkable or not).
+    """
+    if not isinstance(cls, type) or getattr(cls, '_is_protocol', False) is not True:
+        return False
+
+    return not any(cls is base for base in _PROTOCOL_BASES)
 
 
 def is_generic(cls):
@@ -251,8 +370,9 @@ def get_python_type(annotation):
     """
     try:
         mro = annotation.mro()
-    except AttributeError:
-        # if it doesn't have an mro method, it must be a weird typing object
+    except (AttributeError, TypeError):
+        # if it doesn't have an mro method, it must be a weird typing object. (`Type[int].mro` is
+        # forwarded to `type.mro`, which is an unbound method and throws a TypeError.)
         return _get_python_type(annotation)
 
     if Type in mro:
@@ -260,7 +380,7 @@ def get_python_type(annotation):
             return annotation.python_type
         except AttributeError:
             raise ValueError("There is no python equivalent of {}".format(annotation))
-    elif annotation.__module__ == 'typing':
+    elif is_generic(annotation):
         return _get_python_type(annotation)
     else:
         return annotation
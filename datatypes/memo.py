@@ -0,0 +1,135 @@
+import collections
+import threading
+
+
+__all__ = ['Memo']
+
+
+# instances of these classes have no elements and can't be changed
+_ATOMIC_TYPES = {type(None), type(...), bool, int, float, complex, str, bytes}
+
+# instances of these classes can't be changed, but their elements might be mutable
+_FROZEN_CONTAINER_TYPES = {tuple, frozenset}
+
+_IMMUTABLE_TYPES = _ATOMIC_TYPES | _FROZEN_CONTAINER_TYPES
+
+
+def is_deeply_immutable(obj):
+    """
+    Returns whether `obj` is a tree of tuples and frozensets whose leaves are ints, strs, bytes
+    and the like, so that nothing about it can change while it's alive. Subclasses don't count,
+    since they can have mutable attributes.
+    """
+    stack = [obj]
+    seen = set()
+    while stack:
+        obj = stack.pop()
+        if type(obj) in _ATOMIC_TYPES:
+            continue
+
+        if type(obj) not in _FROZEN_CONTAINER_TYPES:
+            return False
+
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        # the classes of the elements are collected at C speed; only containers are looked at again
+        classes = set(map(type, obj))
+        if not classes <= _IMMUTABLE_TYPES:
+            return False
+
+        if not classes.isdisjoint(_FROZEN_CONTAINER_TYPES):
+            stack.extend(value for value in obj if type(value) in _FROZEN_CONTAINER_TYPES)
+
+    return True
+
+
+class Memo:
+    """
+    A bounded cache of `is_instance` results for deeply immutable objects: tuples, frozensets,
+    strs, bytes, ints and the like, nested arbitrarily. Checking an object that's already in the
+    cache against the same annotation takes constant time, no matter how large it is. Other
+    objects are checked normally and never cached.
+
+    Results are keyed on the identity of the object and the annotation. Each entry keeps a
+    reference to both, so their ids can't be reused while the entry exists. This also means that
+    up to `maxsize` checked objects are kept alive by the cache. When the cache is full, the least
+    recently used entry is evicted.
+
+    Example:
+    ::
+        >>> memo = Memo(maxsize=256)
+        >>> tenants = frozenset(range(1000000))
+        >>> is_instance(tenants, typing.FrozenSet[int], memo=memo)
+        True
+        >>> is_instance(tenants, typing.FrozenSet[int], memo=memo)  # O(1)
+        True
+        >>> memo.hits, memo.misses, memo.evictions
+        (1, 1, 0)
+
+    :param maxsize: The maximum number of results to keep
+    """
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive')
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # maps `(id(obj), id(type_))` to `(obj, type_, result)` tuples, least recently used first
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '{}(maxsize={!r}, hits={!r}, misses={!r}, evictions={!r})'.format(
+            type(self).__name__, self.maxsize, self.hits, self.misses, self.evictions)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def lookup(self, obj, type_):
+        """
+        Returns the cached result of checking `obj` against `type_`, or None if there's none.
+        """
+        if type(obj) not in _IMMUTABLE_TYPES:
+            return None
+
+        key = (id(obj), id(type_))
+        with self._lock:
+            try:
+                result = self._entries[key][2]
+            except KeyError:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def store(self, obj, type_, result):
+        """
+        Caches the result of checking `obj` against `type_`, if `obj` is deeply immutable.
+        """
+        if type(obj) not in _IMMUTABLE_TYPES or not is_deeply_immutable(obj):
+            return
+
+        key = (id(obj), id(type_))
+        with self._lock:
+            self._entries[key] = (obj, type_, result)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
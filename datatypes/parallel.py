@@ -0,0 +1,194 @@
+import concurrent.futures
+import itertools
+import os
+import pickle
+import sys
+import threading
+
+
+__all__ = ['Parallel']
+
+
+_default_executors = {}
+_default_executors_lock = threading.Lock()
+
+
+def _gil_enabled():
+    # `sys._is_gil_enabled` only exists in python versions that can be built without the GIL
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled is None or is_gil_enabled()
+
+
+class Parallel:
+    """
+    Describes how `is_instance` should split large collections into chunks that are checked
+    in parallel.
+
+    Only the outermost collection is split, and only if it has at least `threshold` elements;
+    smaller collections are checked normally. As soon as a chunk fails the check, the chunks
+    that haven't been checked yet are cancelled.
+
+    Chunks are checked in a process pool, unless the python interpreter doesn't have a GIL,
+    in which case a thread pool is used. When checking in a process pool, the chunks and the
+    annotation are pickled. If they can't be pickled (or unpickled by the workers), the
+    collection is checked in the calling process instead.
+
+    Example:
+    ::
+        >>> is_instance(list(range(5000000)), typing.List[int], parallel=Parallel())
+        True
+
+    :param threshold: The minimum number of elements a collection must have to be split into chunks
+    :param chunk_size: The number of elements per chunk, or None to choose it based on the number of workers
+    :param executor: The `concurrent.futures.Executor` to use, or None to use a shared default pool
+    :param use_processes: Whether the default pool should be a process pool, or None to decide automatically
+    :param max_workers: The number of workers of the default pool, or None for the number of CPUs
+    """
+
+    def __init__(self, threshold=100000, chunk_size=None, executor=None, use_processes=None, max_workers=None):
+        if threshold < 1:
+            raise ValueError('threshold must be positive')
+
+        if chunk_size is not None and chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+
+        if use_processes is None:
+            use_processes = _gil_enabled()
+
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.executor = executor
+        self.use_processes = use_processes
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+    def __repr__(self):
+        return '{}(threshold={!r}, chunk_size={!r}, executor={!r}, use_processes={!r}, max_workers={!r})'.format(
+            type(self).__name__, self.threshold, self.chunk_size, self.executor, self.use_processes, self.max_workers)
+
+    def get_executor(self):
+        if self.executor is not None:
+            return self.executor
+
+        key = (self.use_processes, self.max_workers)
+        with _default_executors_lock:
+            executor = _default_executors.get(key)
+
+            # a process pool breaks if a worker dies, e.g. because it can't unpickle a chunk
+            if executor is not None and not getattr(executor, '_broken', False):
+                return executor
+
+            if self.use_processes:
+                executor = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+            else:
+                executor = concurrent.futures.ThreadPoolExecutor(self.max_workers)
+
+            _default_executors[key] = executor
+            return executor
+
+    def discard_executor(self, executor):
+        """
+        Shuts down `executor` if it's a default pool that is broken, so that the next check
+        creates a new one. Executors that were passed in are left alone.
+        """
+        if executor is self.executor or not getattr(executor, '_broken', False):
+            return
+
+        key = (self.use_processes, self.max_workers)
+        with _default_executors_lock:
+            if _default_executors.get(key) is executor:
+                del _default_executors[key]
+
+        executor.shutdown(wait=False)
+
+    def get_chunk_size(self, size):
+        if self.chunk_size is not None:
+            return self.chunk_size
+
+        # a few chunks per worker, so that workers that finish early don't have to wait for the others
+        return max(size // (self.max_workers * 4), 1)
+
+
+def split(iterable, chunk_size):
+    """
+    Splits `iterable` into lists of `chunk_size` elements (except for the last one).
+    """
+    if type(iterable) in {list, tuple}:
+        for start in range(0, len(iterable), chunk_size):
+            yield iterable[start:start + chunk_size]
+        return
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+
+        yield chunk
+
+
+class _ChunkNotSent(Exception):
+    pass
+
+
+def _call_pickled(data):
+    try:
+        func, args, chunk = pickle.loads(data)
+    except Exception:
+        # e.g. an instance of a class that was defined after the worker was started
+        return None
+
+    return func(*args, chunk)
+
+
+def _submit(executor, func, args, chunk):
+    if not isinstance(executor, concurrent.futures.ProcessPoolExecutor):
+        return executor.submit(func, *args, chunk)
+
+    # chunks are pickled here rather than by the executor, so that pickling errors are raised
+    # right away and unpickling errors don't kill the workers
+    try:
+        data = pickle.dumps((func, args, chunk), pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        raise _ChunkNotSent from e
+
+    return executor.submit(_call_pickled, data)
+
+
+def run_chunks(parallel, func, args, elements, chunk_size):
+    """
+    Calls `func(*args, chunk)` for each chunk of `chunk_size` elements in parallel and returns
+    whether all calls returned True. At most twice as many chunks as there are workers are
+    submitted at once, so a failed chunk prevents the remaining chunks from being created at all.
+
+    If a chunk can't be sent to the workers, or the executor is broken, all chunks are checked in
+    the calling process instead.
+    """
+    executor = parallel.get_executor()
+    chunks = split(elements, chunk_size)
+
+    pending = set()
+    try:
+        for chunk in itertools.islice(chunks, parallel.max_workers * 2):
+            pending.add(_submit(executor, func, args, chunk))
+
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                result = future.result()
+                if result is None:
+                    raise _ChunkNotSent
+
+                if not result:
+                    return False
+
+            for chunk in itertools.islice(chunks, len(done)):
+                pending.add(_submit(executor, func, args, chunk))
+    except (_ChunkNotSent, concurrent.futures.BrokenExecutor):
+        parallel.discard_executor(executor)
+        return all(func(*args, chunk) for chunk in split(elements, chunk_size))
+    finally:
+        for future in pending:
+            future.cancel()
+
+    return True
@@ -1,17 +1,72 @@
-
 from .types import Type
+from .introspection import get_subtypes
+from .constraints import compile_constraints, find_violation, all_of
+from .caching import AnnotationCache
 
 
-__all__ = ['parse']
+__all__ = ['parse', 'compile_parser']
 
 
-def parse(value, type_):
-    from .type_compat import class_to_datatype  # this import has to be here to avoid cyclic imports at import time
+_parser_cache = AnnotationCache()
+
+
+def _annotated_parser(type_):
+    parse_base = compile_parser(get_subtypes(type_)[0])
+    check = all_of(compile_constraints(type_.__metadata__))
+    if check is None:
+        return parse_base
+
+    metadata = type_.__metadata__
+
+    def parse_annotated(value):
+        value = parse_base(value)
+        if not check(value):
+            constraint = find_violation(value, metadata)
+            raise ValueError("{!r} doesn't satisfy {!r}".format(value, constraint))
+
+        return value
+
+    return parse_annotated
+
+
+def _compile_parser(type_):
+    from .type_compat import class_to_datatype, _is_annotated  # this import has to be here to avoid cyclic imports at import time
+
+    if _is_annotated(type_):
+        return _annotated_parser(type_)
 
     type_ = class_to_datatype(type_)
 
     if isinstance(type_, type) and issubclass(type_, Type):
-        return type_.parse(value)
+        return type_.parse
+
+    return type_
+
+
+def compile_parser(type_):
+    """
+    Resolves the type annotation `type_` into a function that takes a single value as input and
+    parses it, like `parse(value, type_)`. The annotation is only converted to a datatype once,
+    and so are the types of the elements of collections.
+
+    Compiled parsers are cached, so compiling the same annotation twice returns the same function.
 
-    return type_(value)
+    Example:
+    ::
+        >>> parse_ports = compile_parser(typing.List[int])
+        >>> parse_ports('80,443')
+        [80, 443]
+    """
+    parser = _parser_cache.get(type_)
+    if parser is not None:
+        return parser
+
+    parser = _compile_parser(type_)
+    _parser_cache.set(type_, parser)
+
+    return parser
+
+
+def parse(value, type_):
+    return compile_parser(type_)(value)
     # raise TypeError('Unable to convert "{}" to {}'.format(value, type))
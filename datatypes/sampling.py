@@ -0,0 +1,171 @@
+
+import collections.abc
+import itertools
+import random
+import threading
+
+
+__all__ = ['Sampling', 'Verdict']
+
+
+_local = threading.local()
+
+
+class Sampling:
+    """
+    Describes how `is_instance` should sample large collections instead of checking every element.
+
+    Collections with at most `head + tail + samples` elements are checked completely. For larger
+    sequences, the first `head` elements, the last `tail` elements and `samples` randomly chosen
+    elements in between are checked. Collections that can't be indexed (sets, mappings, ...) are
+    sampled from their first `head + samples` elements and, if they support `reversed()`, their
+    last `tail` elements. Iterators are checked up to `head + tail + samples` elements.
+
+    `budget` limits the total number of elements that are checked in a single `is_instance` call,
+    including the elements of nested collections. Once the budget is used up, all remaining elements
+    are skipped.
+
+    Example:
+    ::
+        >>> is_instance(list(range(5000000)), typing.List[int], sampling=Sampling(budget=1000))
+        Verdict(True, sampled=True)
+
+    :param head: The number of elements to check at the start of each collection
+    :param tail: The number of elements to check at the end of each collection
+    :param samples: The number of randomly selected elements to check in each collection
+    :param seed: The seed for the random number generator, so that the selected elements are reproducible
+    :param budget: The maximum number of elements to check per call, or None for no limit
+    """
+
+    def __init__(self, head=10, tail=10, samples=50, seed=0, budget=None):
+        if min(head, tail, samples) < 0:
+            raise ValueError('head, tail and samples must not be negative')
+
+        if budget is not None and budget < 0:
+            raise ValueError('budget must not be negative')
+
+        self.head = head
+        self.tail = tail
+        self.samples = samples
+        self.seed = seed
+        self.budget = budget
+
+    def __repr__(self):
+        return '{}(head={!r}, tail={!r}, samples={!r}, seed={!r}, budget={!r})'.format(
+            type(self).__name__, self.head, self.tail, self.samples, self.seed, self.budget)
+
+
+class Verdict:
+    """
+    The result of a sampled `is_instance` check. Its truth value is the result of the check.
+
+    If `sampled` is True, some elements weren't checked and the positive result is based on a sample.
+    Negative results are always conclusive, so `sampled` is only ever True if the check succeeded.
+    """
+
+    __slots__ = ('value', 'sampled')
+
+    def __init__(self, value, sampled):
+        self.value = value
+        self.sampled = sampled
+
+    def __bool__(self):
+        return self.value
+
+    def __eq__(self, other):
+        if isinstance(other, Verdict):
+            return (self.value, self.sampled) == (other.value, other.sampled)
+
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return '{}({!r}, sampled={!r})'.format(type(self).__name__, self.value, self.sampled)
+
+
+class _Sampler:
+    """
+    Holds the state of a single sampled check.
+    """
+
+    def __init__(self, sampling):
+        self.sampling = sampling
+        self.rng = random.Random(sampling.seed)
+        self.remaining = sampling.budget
+        self.sampled = False
+
+    def select(self, iterable):
+        for value in self._candidates(iterable):
+            if self.remaining is not None:
+                if self.remaining == 0:
+                    self.sampled = True
+                    return
+
+                self.remaining -= 1
+
+            yield value
+
+    def _candidates(self, iterable):
+        sampling = self.sampling
+        limit = sampling.head + sampling.tail + sampling.samples
+
+        try:
+            size = len(iterable)
+        except TypeError:
+            for i, value in enumerate(iterable):
+                if i == limit:
+                    self.sampled = True
+                    return
+
+                yield value
+            return
+
+        if size <= limit:
+            yield from iterable
+            return
+
+        self.sampled = True
+
+        if isinstance(iterable, collections.abc.Sequence):
+            middle = range(sampling.head, size - sampling.tail)
+            indices = itertools.chain(
+                range(sampling.head),
+                sorted(self.rng.sample(middle, sampling.samples)),
+                range(size - sampling.tail, size),
+            )
+            for i in indices:
+                yield iterable[i]
+            return
+
+        yield from itertools.islice(iterable, sampling.head + sampling.samples)
+
+        try:
+            reverse_iterator = reversed(iterable)
+        except TypeError:
+            return
+
+        tail = list(itertools.islice(reverse_iterator, sampling.tail))
+        yield from reversed(tail)
+
+
+def select_elements(iterable):
+    """
+    Returns an iterator over the elements of `iterable` that the currently running sampled check
+    should look at.
+    """
+    return _local.sampler.select(iterable)
+
+
+def run_sampled(check, obj, sampling):
+    sampler = _Sampler(sampling)
+
+    previous_sampler = getattr(_local, 'sampler', None)
+    _local.sampler = sampler
+    try:
+        result = check(obj)
+    finally:
+        _local.sampler = previous_sampler
+
+    return Verdict(result, result and sampler.sampled)
@@ -0,0 +1,190 @@
+
+import typing
+
+from .introspection import is_qualified_generic, get_base_generic, get_subtypes, _get_python_type
+from .type_checks import _get_checker, _always_true
+from .containers import _type_name
+from .sampling import run_sampled
+
+
+__all__ = ['validate_stream', 'validate_async_stream']
+
+
+def _element_checker(type_, sampling):
+    if sampling is None:
+        return _get_checker(type_)
+
+    # each element gets its own sampling budget
+    check = _get_checker(type_, sampled=True)
+    return lambda value: run_sampled(check, value, sampling)
+
+
+def _stream_checkers(type_, origins, sampling=None):
+    """
+    Returns the python class of the stream annotation `type_` and checkers for the elements it
+    yields and the value it returns. `origins` are the generics that are accepted as annotation.
+    """
+    if is_qualified_generic(type_):
+        origin = get_base_generic(type_)
+        type_args = get_subtypes(type_)
+    else:
+        origin = type_
+        type_args = ()
+
+    if origin not in origins:
+        raise NotImplementedError("Cannot validate streams of type {}".format(type_))
+
+    python_type = _get_python_type(origin)
+    if not type_args:
+        return python_type, _always_true, _always_true
+
+    # the first type argument of all stream generics is the element type, and generators
+    # have a return type as their last argument
+    check_element = _element_checker(type_args[0], sampling)
+    check_return = _get_checker(type_args[-1]) if len(type_args) == 3 else _always_true
+    return python_type, check_element, check_return
+
+
+class _Validator:
+    def __init__(self, iterator, type_, check_element, check_return=_always_true):
+        self._iterator = iterator
+        self._type = type_
+        self._check_element = check_element
+        self._check_return = check_return
+        self._index = 0
+
+    def _validate_element(self, value):
+        if not self._check_element(value):
+            raise TypeError('{} expected an instance of {} at index {}, got {!r}'.format(
+                _type_name(self._type), _type_name(get_subtypes(self._type)[0]), self._index, value))
+
+        self._index += 1
+        return value
+
+
+class _StreamValidator(_Validator):
+    """
+    An iterator that checks each element of the wrapped iterator when it's retrieved.
+    """
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._resume(next, self._iterator)
+
+    def _resume(self, func, *args):
+        try:
+            value = func(*args)
+        except StopIteration as e:
+            if not self._check_return(e.value):
+                raise TypeError('{} expected a return value of type {}, got {!r}'.format(
+                    _type_name(self._type), _type_name(get_subtypes(self._type)[-1]), e.value)) from None
+            raise
+
+        return self._validate_element(value)
+
+
+class _GeneratorValidator(_StreamValidator):
+    """
+    Like `_StreamValidator`, but also forwards `send`, `throw` and `close` to the wrapped
+    generator and checks its return value.
+    """
+
+    def send(self, value):
+        return self._resume(self._iterator.send, value)
+
+    def throw(self, *args):
+        return self._resume(self._iterator.throw, *args)
+
+    def close(self):
+        self._iterator.close()
+
+
+class _AsyncStreamValidator(_Validator):
+    """
+    An asynchronous iterator that checks each element of the wrapped asynchronous iterator
+    when it's retrieved.
+    """
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return self._validate_element(await self._iterator.__anext__())
+
+
+class _AsyncGeneratorValidator(_AsyncStreamValidator):
+    """
+    Like `_AsyncStreamValidator`, but also forwards `asend`, `athrow` and `aclose` to the
+    wrapped asynchronous generator.
+    """
+
+    async def asend(self, value):
+        return self._validate_element(await self._iterator.asend(value))
+
+    async def athrow(self, *args):
+        return self._validate_element(await self._iterator.athrow(*args))
+
+    async def aclose(self):
+        await self._iterator.aclose()
+
+
+_STREAM_ORIGINS = {typing.Iterable, typing.Iterator, typing.Generator}
+_ASYNC_STREAM_ORIGINS = {typing.AsyncIterable, typing.AsyncIterator}
+if hasattr(typing, 'AsyncGenerator'):
+    _ASYNC_STREAM_ORIGINS.add(typing.AsyncGenerator)
+
+
+def validate_stream(iterable, type_, sampling=None):
+    """
+    Wraps `iterable` in an iterator that checks whether each element is an instance of the
+    element type of the annotation `type_` (which must be an `Iterable`, `Iterator` or
+    `Generator`) as it's retrieved. Unlike `is_instance`, this doesn't consume the stream.
+
+    A `TypeError` is raised if `iterable` isn't an instance of the annotation's class, and when
+    the first element that has the wrong type is retrieved. The return values of generators are
+    checked as well.
+
+    If a `Sampling` policy is passed, it's applied to each element separately, so large elements
+    are only partially checked.
+
+    Example:
+    ::
+        >>> numbers = validate_stream(iter([1, 2, 'x']), typing.Iterator[int])
+        >>> list(numbers)
+        Traceback (most recent call last):
+          ...
+        TypeError: Iterator[int] expected an instance of int at index 2, got 'x'
+    """
+    python_type, check_element, check_return = _stream_checkers(type_, _STREAM_ORIGINS, sampling)
+
+    if not isinstance(iterable, python_type):
+        raise TypeError('Expected an instance of {}, got {!r}'.format(_type_name(type_), iterable))
+
+    if python_type is _get_python_type(typing.Generator):
+        return _GeneratorValidator(iterable, type_, check_element, check_return)
+
+    return _StreamValidator(iter(iterable), type_, check_element)
+
+
+def validate_async_stream(iterable, type_, sampling=None):
+    """
+    The asynchronous counterpart of `validate_stream`. Wraps the asynchronous iterable
+    `iterable` in an asynchronous iterator that checks each element when it's retrieved. `type_`
+    must be an `AsyncIterable`, `AsyncIterator` or `AsyncGenerator` annotation.
+
+    Example:
+    ::
+        async for event in validate_async_stream(websocket, AsyncIterable[Event]):
+            ...
+    """
+    python_type, check_element, _ = _stream_checkers(type_, _ASYNC_STREAM_ORIGINS, sampling)
+
+    if not isinstance(iterable, python_type):
+        raise TypeError('Expected an instance of {}, got {!r}'.format(_type_name(type_), iterable))
+
+    if hasattr(typing, 'AsyncGenerator') and python_type is _get_python_type(typing.AsyncGenerator):
+        return _AsyncGeneratorValidator(iterable, type_, check_element)
+
+    return _AsyncStreamValidator(iterable.__aiter__(), type_, check_element)
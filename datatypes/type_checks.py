@@ -1,132 +1,697 @@
-
 import introspection
 
+import abc
+import array
+import collections
+import functools
+import itertools
+import operator
+import sys
+import threading
+import types
 import typing
+import weakref
+
+try:
+    import dataclasses
+except ImportError:  # python <3.7
+    dataclasses = None
+
+try:
+    import typing_extensions
+except ImportError:
+    typing_extensions = None
 
 from datatypes.types.generics import GenericMeta, QualifiedGenericMeta
 from datatypes.introspection import *
-from datatypes.introspection import _is_protocol, _get_name, _get_python_type
+from datatypes.introspection import _is_protocol, _get_python_type, _Annotated
+from datatypes.sampling import select_elements, run_sampled
+from datatypes.parallel import run_chunks
+from datatypes.constraints import compile_constraints, all_of
+from datatypes.caching import AnnotationCache, IdentityCache
+
+
+__all__ = ['is_instance', 'is_instance_many', 'is_subtype', 'compile_checker', 'register_element_type',
+           'register_item_types', 'resolve_forward_refs']
+
+
+_checker_cache = AnnotationCache()
+_sampled_checker_cache = AnnotationCache()
+_implication_cache = IdentityCache()
+
+_subtype_cache = IdentityCache(maxsize=4096)
+_subtype_cache_hits = [0]
+
+# `abc.get_cache_token()` when the subtype and implication caches were last valid
+_abc_cache_token = [abc.get_cache_token()]
+
+
+def _check_abc_token():
+    """
+    Clears the caches of subclass relations if a class has been registered with an ABC since
+    they were filled, since registering can change the results.
+    """
+    token = abc.get_cache_token()
+    if token == _abc_cache_token[0]:
+        return
+
+    _abc_cache_token[0] = token
+    _subtype_cache.clear()
+    _cached_is_subtype.cache_clear()
+    _implication_cache.clear()
+
+
+def _always_true(obj):
+    return True
+
+
+def _deferred_error(exc):
+    """
+    Returns a checker that raises `exc` when called. This is used to delay errors
+    that happen while compiling an annotation until the point where `is_instance`
+    would've raised them.
+    """
+    def check(obj):
+        raise exc.with_traceback(None)
+
+    return check
+
+
+def _defer_errors(func, *args):
+    try:
+        return func(*args)
+    except Exception as e:
+        return _deferred_error(e)
+
+
+_ARRAY_ELEMENT_TYPES = dict.fromkeys('bBhHiIlLqQ', int)
+_ARRAY_ELEMENT_TYPES.update(dict.fromkeys('fd', float))
+_ARRAY_ELEMENT_TYPES.update(dict.fromkeys('uw', str))
+
+_MEMORYVIEW_ELEMENT_TYPES = dict.fromkeys('bBhHiIlLqQnNP', int)
+_MEMORYVIEW_ELEMENT_TYPES.update(dict.fromkeys('fd', float))
+_MEMORYVIEW_ELEMENT_TYPES['?'] = bool
+_MEMORYVIEW_ELEMENT_TYPES['c'] = bytes
+
+
+def _memoryview_element_type(view):
+    if view.ndim != 1:
+        return None
+
+    format = view.format
+    if format.startswith('@'):
+        format = format[1:]
+
+    return _MEMORYVIEW_ELEMENT_TYPES.get(format)
+
+
+def _ndarray_element_type(array):
+    # iterating over a 1-dimensional array yields instances of `dtype.type`, unless it's an
+    # array of arbitrary python objects
+    if array.ndim != 1 or array.dtype.kind == 'O':
+        return None
+
+    return array.dtype.type
+
+
+def _is_ndarray_class(cls):
+    """
+    Detects numpy arrays (and subclasses that don't change how elements are accessed)
+    without importing numpy.
+    """
+    if not hasattr(cls, '__array_interface__') or not hasattr(cls, 'dtype') or not hasattr(cls, 'ndim'):
+        return False
+
+    for base in cls.__mro__:
+        if '__array_interface__' in vars(base):
+            break
+
+    return all(getattr(cls, attr, None) is getattr(base, attr, None) for attr in ('__iter__', '__getitem__'))
+
+
+# Maps classes to functions that return an annotation that all elements of an instance are known to
+# satisfy (or None if nothing is known about the elements of that particular instance). Classes that
+# are mapped to None are known to have no such function, which saves the search for numpy arrays.
+# These are consulted before any elements are checked, so checking a `range` or a `str` is O(1).
+_ELEMENT_TYPE_GETTERS = {
+    str: lambda value: str,
+    range: lambda value: int,
+    bytes: lambda value: int,
+    bytearray: lambda value: int,
+    array.array: lambda value: _ARRAY_ELEMENT_TYPES.get(value.typecode),
+    memoryview: _memoryview_element_type,
+}
+_ELEMENT_TYPE_GETTERS.update(dict.fromkeys([list, tuple, set, frozenset, dict, collections.deque,
+                                            type({}.keys()), type({}.values()), type({}.items())]))
+
+_MISSING = object()
+
+# Like `_ELEMENT_TYPE_GETTERS`, but for mappings (and views of their items). The functions return a
+# `(key_type, value_type)` tuple, or None.
+_ITEM_TYPES_GETTERS = {}
+
+
+def register_element_type(cls, get_element_type):
+    """
+    Registers a shortcut for checking the elements of instances of `cls`. `get_element_type` is
+    called with an instance of `cls` and returns an annotation that all elements produced by
+    iterating over it are guaranteed to be instances of, or None if nothing is known about them.
+    If that annotation implies the element type being checked, `is_instance` doesn't iterate over
+    the instance at all.
+
+    Only instances of `cls` itself (not of its subclasses) are affected.
+
+    Example:
+    ::
+        >>> register_element_type(IntVector, lambda vector: int)
+        >>> is_instance(IntVector(range(1000000)), typing.Sequence[int])  # O(1)
+        True
+    """
+    _ELEMENT_TYPE_GETTERS[cls] = get_element_type
+
+
+def register_item_types(cls, get_item_types):
+    """
+    Like `register_element_type`, but for mappings and views of their items. `get_item_types`
+    returns a `(key_type, value_type)` tuple, or None.
+    """
+    _ITEM_TYPES_GETTERS[cls] = get_item_types
+
+
+def _set_element_type(cls, element_type):
+    """
+    Declares that all elements of instances of `cls` are instances of the annotation `element_type`.
+    """
+    register_element_type(cls, lambda iterable: element_type)
+
+
+def _set_item_types(cls, key_type, value_type):
+    """
+    Declares that all keys and values of instances of the mapping `cls` are instances of `key_type`
+    and `value_type`, respectively.
+    """
+    register_item_types(cls, lambda mapping: (key_type, value_type))
+
+
+def _get_element_type(iterable):
+    """
+    If the elements of `iterable` are known to be instances of some annotation without iterating
+    over it (because it's a buffer, an array, or a typed container), returns that annotation.
+    Otherwise returns None.
+    """
+    get_element_type = _ELEMENT_TYPE_GETTERS.get(type(iterable), _MISSING)
+    if get_element_type is None:
+        return None
+
+    if get_element_type is _MISSING:
+        if not _is_ndarray_class(type(iterable)):
+            return None
+
+        get_element_type = _ndarray_element_type
+
+    try:
+        return get_element_type(iterable)
+    except Exception:
+        return None
+
+
+def _is_decided_by_type(target):
+    """
+    Returns whether `isinstance(obj, target)` depends only on the class of `obj`, i.e. whether
+    no class in `target` has a metaclass with a custom `__instancecheck__`.
+    """
+    if isinstance(target, tuple):
+        return all(_is_decided_by_type(cls) for cls in target)
+
+    return type(target) in {type, abc.ABCMeta}
+
+
+# collections that can be iterated over more than once and whose length is known in advance
+_REITERABLE_TYPES = {list, tuple, set, frozenset, collections.deque, type({}.keys()), type({}.values()),
+                     type({}.items())}
+
+# below this size, collecting the classes of the elements costs more than it saves
+_TYPE_SCAN_THRESHOLD = 64
+
 
+def _classes_are_subclasses(elements, target):
+    """
+    Returns whether the classes of all `elements` are subclasses of `target`. Each distinct class
+    is only judged once, and the classes are collected at C speed. If this returns False, some
+    elements may still be instances of `target` (for example proxies that override `__class__`),
+    so `isinstance` has to decide.
+    """
+    return all(issubclass(cls, target) for cls in set(map(type, elements)))
 
-__all__ = ['is_instance', 'is_subtype']
 
+def _instances_scanner(target, project=None):
+    """
+    Returns a function that checks whether all elements of a collection (or the results of
+    calling `project` on them) are instances of `target`.
 
-def _instancecheck_iterable(iterable, type_args):
+    Real data usually contains only a handful of distinct classes, so if the check only depends on
+    the class of an object, large collections are checked by judging each distinct class once.
+    For a single ordinary class, `isinstance` is just as fast, so that isn't done.
+    """
+    def elements_of(collection):
+        return collection if project is None else map(project, collection)
+
+    def scan(collection):
+        return all(map(isinstance, elements_of(collection), itertools.repeat(target)))
+
+    if type(target) is type or not _is_decided_by_type(target):
+        return scan
+
+    def scan_classes(collection):
+        if (type(collection) in _REITERABLE_TYPES and len(collection) >= _TYPE_SCAN_THRESHOLD
+                and _classes_are_subclasses(elements_of(collection), target)):
+            return True
+
+        return scan(collection)
+
+    return scan_classes
+
+
+def _iter_classes(target):
+    if isinstance(target, tuple):
+        for cls in target:
+            yield from _iter_classes(cls)
+    else:
+        yield target
+
+
+def _implies(known_type, type_):
+    """
+    Returns whether every object that is an instance of the annotation `known_type` is guaranteed
+    to be an instance of the annotation `type_` as well.
+    """
+    _check_abc_token()
+
+    result = _implication_cache.get((known_type, type_))
+    if result is not None:
+        return result
+
+    try:
+        result = _compute_implication(known_type, type_)
+    except Exception:
+        result = False
+
+    _implication_cache.set((known_type, type_), result)
+
+    return result
+
+
+def _compute_implication(known_type, type_):
+    # Only annotations whose checks depend on nothing but the class of an object are compared.
+    # The elements of a typed container can still be mutated, so knowing that an element was an
+    # instance of `List[int]` or of a dataclass when it was added doesn't mean that it still is.
+    target = _isinstance_target(type_)
+    if target is object:
+        return True
+
+    if target is None or not _is_decided_by_type(target):
+        return False
+
+    known_target = _isinstance_target(known_type)
+    if known_target is None or not _is_decided_by_type(known_target):
+        return False
+
+    return all(issubclass(cls, target) for cls in _iter_classes(known_target))
+
+
+def _has_element_type(iterable, type_):
+    """
+    Returns True if all elements of `iterable` are known to be instances of `type_` without
+    iterating over it. A return value of False means that the elements have to be checked.
+    """
+    element_type = _get_element_type(iterable)
+    return element_type is not None and _implies(element_type, type_)
+
+
+def _has_item_types(mapping, key_type, value_type):
+    """
+    Like `_has_element_type`, but for the keys and values of a mapping.
+    """
+    try:
+        item_types = _ITEM_TYPES_GETTERS[type(mapping)](mapping)
+    except Exception:
+        return False
+
+    if item_types is None:
+        return False
+
+    known_key_type, known_value_type = item_types
+    return _implies(known_key_type, key_type) and _implies(known_value_type, value_type)
+
+
+def _iterable_checker(type_args, sampled=False):
     if len(type_args) != 1:
         raise TypeError("Generic iterables must have exactly 1 type argument; found {}".format(type_args))
 
     type_ = type_args[0]
-    return all(is_instance(val, type_) for val in iterable)
 
+    target = _isinstance_target(type_)
+    if target is not None:
+        if sampled:
+            def scan(iterable):
+                return all(map(isinstance, select_elements(iterable), itertools.repeat(target)))
+        else:
+            scan = _instances_scanner(target)
+    else:
+        check_item = _get_checker(type_, sampled)
+        if sampled:
+            def scan(iterable):
+                return all(map(check_item, select_elements(iterable)))
+        else:
+            def scan(iterable):
+                return all(map(check_item, iterable))
+
+    def check(iterable):
+        # if the elements are already known to be of the correct type, there's no need to
+        # iterate over them. Otherwise, at least one of them has to be checked anyway. (For
+        # buffers and arrays, checking the first element is enough to disprove the type.)
+        if _ELEMENT_TYPE_GETTERS.get(type(iterable), _MISSING) is not None and _has_element_type(iterable, type_):
+            return True
+
+        return scan(iterable)
+
+    return check
+
+
+def _elements_checker(type_, project=None):
+    """
+    Returns a function that checks whether all elements of a collection (or the results of
+    calling `project` on them) are instances of the annotation `type_`, or None if `type_` can't
+    be checked with `isinstance`.
+    """
+    target = _isinstance_target(type_)
+    if target is None:
+        return None
+
+    return _instances_scanner(target, project)
+
+
+def _mapping_checker(type_args, sampled=False):
+    check_items = _itemsview_checker(type_args, sampled)
+    key_type, value_type = type_args
+
+    # if the keys or the values can be checked with `isinstance`, they're checked separately,
+    # so that they can be scanned at C speed
+    check_keys = check_values = None
+    if not sampled:
+        check_keys = _elements_checker(key_type)
+        check_values = _elements_checker(value_type)
+
+    if check_keys is None and check_values is None:
+        check_all = lambda mapping: check_items(mapping.items())
+    else:
+        if check_keys is None:
+            check_key = _get_checker(key_type)
+            check_keys = lambda keys: all(map(check_key, keys))
+
+        if check_values is None:
+            check_value = _get_checker(value_type)
+            check_values = lambda values: all(map(check_value, values))
+
+        check_all = lambda mapping: check_keys(mapping.keys()) and check_values(mapping.values())
+
+    def check(mapping):
+        if type(mapping) in _ITEM_TYPES_GETTERS and _has_item_types(mapping, key_type, value_type):
+            return True
 
-def _instancecheck_mapping(mapping, type_args):
-    return _instancecheck_itemsview(mapping.items(), type_args)
+        return check_all(mapping)
 
+    return check
 
-def _instancecheck_itemsview(itemsview, type_args):
+
+def _itemsview_checker(type_args, sampled=False):
     if len(type_args) != 2:
         raise TypeError("Generic mappings must have exactly 2 type arguments; found {}".format(type_args))
 
     key_type, value_type = type_args
-    return all(is_instance(key, key_type) and is_instance(val, value_type) for key, val in itemsview)
+    check_key = _get_checker(key_type, sampled)
+    check_value = _get_checker(value_type, sampled)
+
+    check_keys = check_values = None
+    if not sampled:
+        check_keys = _elements_checker(key_type, operator.itemgetter(0))
+        check_values = _elements_checker(value_type, operator.itemgetter(1))
+
+    if sampled:
+        def scan(itemsview):
+            return all(check_key(key) and check_value(val) for key, val in select_elements(itemsview))
+    elif check_keys is not None and check_values is not None:
+        def scan(itemsview):
+            return check_keys(itemsview) and check_values(itemsview)
+    else:
+        def scan(itemsview):
+            return all(check_key(key) and check_value(val) for key, val in itemsview)
 
+    def check(itemsview):
+        if type(itemsview) in _ITEM_TYPES_GETTERS and _has_item_types(itemsview, key_type, value_type):
+            return True
 
-def _instancecheck_tuple(tup, type_args):
-    if len(tup) != len(type_args):
-        return False
+        return scan(itemsview)
+
+    return check
+
+
+def _tuple_args(type_args):
+    # `Tuple[()]` is represented as a tuple with a single empty tuple as argument
+    if type_args == ((),):
+        return ()
+
+    return type_args
+
+
+def _is_variadic(type_args):
+    """
+    Returns whether `type_args` are the arguments of a variable-length tuple like `Tuple[int, ...]`.
+    """
+    return len(type_args) == 2 and type_args[1] is ...
+
+
+def _tuple_checker(type_args, sampled=False):
+    type_args = _tuple_args(type_args)
+
+    # variable-length tuples are homogeneous, so their elements are scanned like those of any other
+    # sequence, which only takes a single `isinstance` call per element if possible
+    if _is_variadic(type_args):
+        return _iterable_checker(type_args[:1], sampled)
 
-    return all(is_instance(val, type_) for val, type_ in zip(tup, type_args))
+    checkers = tuple(_get_checker(type_, sampled) for type_ in type_args)
+
+    def check(tup):
+        if len(tup) != len(checkers):
+            return False
+
+        return all(check_item(val) for check_item, val in zip(checkers, tup))
+
+    return check
 
 
 _ORIGIN_TYPE_CHECKERS = {}
-for class_path, check_func in {
+for class_path, make_checker in {
     # iterables
-    'typing.Container': _instancecheck_iterable,
-    'typing.Collection': _instancecheck_iterable,
-    'typing.AbstractSet': _instancecheck_iterable,
-    'typing.MutableSet': _instancecheck_iterable,
-    'typing.Sequence': _instancecheck_iterable,
-    'typing.MutableSequence': _instancecheck_iterable,
-    'typing.ByteString': _instancecheck_iterable,
-    'typing.Deque': _instancecheck_iterable,
-    'typing.List': _instancecheck_iterable,
-    'typing.Set': _instancecheck_iterable,
-    'typing.FrozenSet': _instancecheck_iterable,
-    'typing.KeysView': _instancecheck_iterable,
-    'typing.ValuesView': _instancecheck_iterable,
-    'typing.Iterable': _instancecheck_iterable,
-    'typing.AsyncIterable': _instancecheck_iterable,
+    'typing.Container': _iterable_checker,
+    'typing.Collection': _iterable_checker,
+    'typing.AbstractSet': _iterable_checker,
+    'typing.MutableSet': _iterable_checker,
+    'typing.Sequence': _iterable_checker,
+    'typing.MutableSequence': _iterable_checker,
+    'typing.ByteString': _iterable_checker,
+    'typing.Deque': _iterable_checker,
+    'typing.List': _iterable_checker,
+    'typing.Set': _iterable_checker,
+    'typing.FrozenSet': _iterable_checker,
+    'typing.KeysView': _iterable_checker,
+    'typing.ValuesView': _iterable_checker,
+    'typing.Iterable': _iterable_checker,
 
     # mappings
-    'typing.Mapping': _instancecheck_mapping,
-    'typing.MutableMapping': _instancecheck_mapping,
-    'typing.MappingView': _instancecheck_mapping,
-    'typing.ItemsView': _instancecheck_itemsview,
-    'typing.Dict': _instancecheck_mapping,
-    'typing.DefaultDict': _instancecheck_mapping,
-    'typing.Counter': _instancecheck_mapping,
-    'typing.ChainMap': _instancecheck_mapping,
+    'typing.Mapping': _mapping_checker,
+    'typing.MutableMapping': _mapping_checker,
+    'typing.MappingView': _mapping_checker,
+    'typing.ItemsView': _itemsview_checker,
+    'typing.Dict': _mapping_checker,
+    'typing.DefaultDict': _mapping_checker,
+    'typing.Counter': _mapping_checker,
+    'typing.ChainMap': _mapping_checker,
 
     # other
-    'typing.Tuple': _instancecheck_tuple,
+    'typing.Tuple': _tuple_checker,
 }.items():
     try:
         cls = eval(class_path)
     except AttributeError:
         continue
 
-    _ORIGIN_TYPE_CHECKERS[cls] = check_func
+    _ORIGIN_TYPE_CHECKERS[cls] = make_checker
 
 
-def _instancecheck_callable(value, type_):
-    if not callable(value):
+def _get_signature(value):
+    # newer versions of `introspection` store the signature in the `__signature__` attribute, which
+    # would hide later changes of the annotations and defaults, so it's removed again
+    had_signature = '__signature__' in getattr(value, '__dict__', {})
+    sig = introspection.Signature.from_callable(value)
+
+    if not had_signature:
+        try:
+            del value.__signature__
+        except (AttributeError, TypeError):
+            pass
+
+    return sig
+
+
+def _has_typevars(type_):
+    """
+    Returns whether the annotation `type_` is or contains a TypeVar.
+    """
+    if isinstance(type_, typing.TypeVar):
+        return True
+
+    try:
+        params = getattr(type_, '__parameters__', ())
+    except Exception:
         return False
 
-    if is_base_generic(type_):
+    return isinstance(params, tuple) and bool(params)
+
+
+def _bind_type(bindings, typevar, type_):
+    """
+    Binds `typevar` to the annotation `type_` in the dict `bindings`, which maps TypeVars to the
+    tuple of all types they've been matched with, or returns False if that's not possible. All
+    types that a TypeVar is matched with must be related (one a subtype of the other), so that
+    the result doesn't depend on the order in which they're matched.
+    """
+    if not isinstance(type_, typing.TypeVar):
+        if typevar.__constraints__:
+            for constraint in typevar.__constraints__:
+                if is_subtype(type_, constraint):
+                    type_ = constraint
+                    break
+            else:
+                return False
+        elif typevar.__bound__ is not None and not is_subtype(type_, typevar.__bound__):
+            return False
+
+    bound_types = bindings.get(typevar, ())
+    if type_ in bound_types:
         return True
 
+    if not all(is_subtype(type_, other) or is_subtype(other, type_) for other in bound_types):
+        return False
+
+    bindings[typevar] = bound_types + (type_,)
+    return True
+
+
+def _unify(sub_type, super_type, sub_bindings, super_bindings):
+    """
+    Like `is_subtype`, but TypeVars in `sub_type` and `super_type` are bound to the types they're
+    matched with, in `sub_bindings` and `super_bindings` respectively. See `_bind_type`.
+    """
+    if isinstance(sub_type, typing.TypeVar):
+        return _bind_type(sub_bindings, sub_type, super_type)
+
+    if isinstance(super_type, typing.TypeVar):
+        return _bind_type(super_bindings, super_type, sub_type)
+
+    if not _has_typevars(sub_type) and not _has_typevars(super_type):
+        return is_subtype(sub_type, super_type)
+
+    sub_origin = _typing_origin(sub_type)
+    super_origin = _typing_origin(super_type)
+
+    if sub_origin is typing.Callable and super_origin is typing.Callable:
+        sub_params, sub_ret = get_subtypes(sub_type)
+        super_params, super_ret = get_subtypes(super_type)
+        if sub_params is not ... and super_params is not ...:
+            if len(sub_params) != len(super_params):
+                return False
+
+            # parameters are contravariant
+            for sub_param, super_param in zip(sub_params, super_params):
+                if not _unify(super_param, sub_param, super_bindings, sub_bindings):
+                    return False
+
+        return _unify(sub_ret, super_ret, sub_bindings, super_bindings)
+
+    # the type arguments of other generics are matched pairwise, regardless of their variance
+    if (sub_origin is None or super_origin is None or sub_origin is typing.Union
+            or super_origin is typing.Union or super_origin is typing.Callable):
+        return is_subtype(sub_type, super_type)
+
+    if not issubclass(get_python_type(sub_type), get_python_type(super_type)):
+        return False
+
+    sub_args = get_subtypes(sub_type)
+    super_args = get_subtypes(super_type)
+    if len(sub_args) != len(super_args):
+        return is_subtype(sub_type, super_type)
+
+    return all(_unify(sub_arg, super_arg, sub_bindings, super_bindings)
+               for sub_arg, super_arg in zip(sub_args, super_args)
+               if sub_arg is not ... and super_arg is not ...)
+
+
+def _solve_callable(value, type_):
+    """
+    Matches the signature of the callable `value` against the `Callable` annotation `type_`.
+    Returns a dict that maps the TypeVars in `type_` to the tuples of types they're bound to, or
+    None if `value` isn't an instance of `type_`. TypeVars in the signature of `value` are bound
+    separately, since the callable is generic in them.
+
+    A `ValueError` is raised if the signature lacks annotations that would be needed to decide.
+    """
+    if not callable(value):
+        return None
+
+    if is_base_generic(type_):
+        return {}
+
     expected_types, ret_type = get_subtypes(type_)
-    sig = introspection.Signature.from_callable(value)
+    sig = _get_signature(value)
 
+    bindings = {}
+    sig_bindings = {}
     missing_annotations = []
 
     if expected_types is not ...:
-        # if any of the existing annotations don't match the type, we'll return False.
+        # if any of the existing annotations don't match the type, we'll return None.
         # Then, if any annotations are missing, we'll throw an exception.
         param_iter = iter(sig.parameters.values())
         for expected_type in expected_types:
             try:
                 param = next(param_iter)
             except StopIteration:
-                return False
+                return None
 
             if param.kind is introspection.Parameter.VAR_POSITIONAL:
                 param_iter = iter([param])
             elif param.kind in {introspection.Parameter.VAR_KEYWORD, introspection.Parameter.KEYWORD_ONLY}:
-                return False
+                return None
 
             param_type = param.annotation
             if param_type in {introspection.Parameter.empty, introspection.Parameter.missing}:
                 missing_annotations.append(param.name)
                 continue
 
-            # FIXME: add support for TypeVars
-            if isinstance(expected_type, typing.TypeVar) or isinstance(param_type, typing.TypeVar):
-                raise NotImplementedError('TypeVars are not supported')
-
-            if not is_subtype(param_type, expected_type):
-                return False
+            if not _unify(expected_type, param_type, bindings, sig_bindings):
+                return None
 
         # make sure the remaining parameters are optional
         for param in param_iter:
             if not param.is_optional:
-                return False
+                return None
 
     if sig.return_annotation is introspection.Signature.empty:
         missing_annotations.append('return')
     else:
-        if not is_subtype(sig.return_annotation, ret_type):
-            return False
+        if not _unify(sig.return_annotation, ret_type, sig_bindings, bindings):
+            return None
 
     if missing_annotations:
         seen = set()
@@ -139,161 +704,2167 @@ def _instancecheck_callable(value, type_):
             seen.add(param)
         raise ValueError("Missing annotations: {}".format(', '.join(missing_names)))
 
-    return True
+    return bindings
+
+
+def _instancecheck_callable(value, type_):
+    return _solve_callable(value, type_) is not None
+
+
+# unions of at most this many ordinary classes are checked with a plain `isinstance` call
+_SMALL_UNION_SIZE = 4
+
+# the number of successful checks after which the members of a union are reordered
+_UNION_REORDER_INTERVAL = 1024
+
+
+def _member_class(type_):
+    """
+    Returns a class that all instances of the annotation `type_` are instances of, and whether
+    being an instance of that class is enough to be an instance of `type_`. The class is None if
+    it's unknown (or if `isinstance` doesn't only depend on the class of an object).
+    """
+    try:
+        target = _isinstance_target(type_)
+        if target is not None:
+            return (target, True) if _is_decided_by_type(target) else (None, False)
+
+        info = _container_info(type_)
+        if info is not None:
+            cls = info[0]
+        elif _field_plan_type(type_) is not None:
+            cls = type_
+        else:
+            return None, False
+    except Exception:
+        return None, False
+
+    return (cls, False) if _is_decided_by_type(cls) else (None, False)
+
+
+class _UnionIndex:
+    """
+    Maps the classes of objects to the members of a union that objects of that class can be
+    instances of, so that a check doesn't have to try every member. Members whose checks can't be
+    decided by the class alone are ordered by how often they matched, and the order is adapted
+    as the counts change.
+    """
+
+    def __init__(self, types):
+        self.member_classes = tuple(_member_class(typ) for typ in types)
+        self.all_members = tuple(range(len(types)))
+
+        # Maps classes to a tuple of the indices of the candidate members, or True if objects of
+        # that class are known to be instances of the union
+        self.candidates = {}
+        self.hits = [0] * len(types)
+        self.num_hits = 0
+        self.abc_token = abc.get_cache_token()
+
+    def lookup(self, cls):
+        # registering a class with an ABC can change which members its instances can match
+        token = abc.get_cache_token()
+        if token != self.abc_token:
+            self.candidates = {}
+            self.abc_token = token
+
+        try:
+            return self.candidates[cls]
+        except KeyError:
+            pass
+
+        candidates = []
+        for i, (member_cls, is_sufficient) in enumerate(self.member_classes):
+            if member_cls is None:
+                candidates.append(i)
+                continue
+
+            try:
+                matches = issubclass(cls, member_cls)
+            except TypeError:
+                matches = True
+
+            if matches and is_sufficient:
+                candidates = True
+                break
+
+            # objects can lie about their class, but only in their `__class__` attribute. Those
+            # are handled by the caller, so classes that don't match can be skipped.
+            if matches:
+                candidates.append(i)
+
+        if candidates is not True:
+            hits = self.hits
+            candidates = tuple(sorted(candidates, key=lambda i: -hits[i]))
+
+        if len(self.candidates) >= _checker_cache.maxsize:
+            self.candidates.clear()
+        self.candidates[cls] = candidates
+
+        return candidates
+
+    def record_hit(self, index):
+        self.hits[index] += 1
+        self.num_hits += 1
+        if self.num_hits >= _UNION_REORDER_INTERVAL:
+            self.reorder()
+
+    def reorder(self):
+        # older hits count half as much as newer ones, so that the order follows changes in the data
+        hits = self.hits = [count // 2 for count in self.hits]
+        self.num_hits = 0
 
+        # the tuples are replaced rather than sorted in place, so concurrent checks aren't affected
+        for cls, candidates in list(self.candidates.items()):
+            if candidates is not True and len(candidates) > 1:
+                self.candidates[cls] = tuple(sorted(candidates, key=lambda i: -hits[i]))
 
-def _instancecheck_union(value, type_):
+
+def _union_checker(type_, sampled=False):
     types = get_subtypes(type_)
-    return any(is_instance(value, typ) for typ in types)
 
+    target = _isinstance_target(type_)
+    if target is not None:
+        # `isinstance` with a few ordinary classes is as fast as a lookup in the index
+        classes = list(_iter_classes(target))
+        is_small = len(classes) <= _SMALL_UNION_SIZE and all(type(cls) is type for cls in classes)
+        if is_small or not _is_decided_by_type(target):
+            return lambda value: isinstance(value, target)
+
+    checkers = tuple(_get_checker(typ, sampled) for typ in types)
+    index = _UnionIndex(types)
+
+    def check(value):
+        cls = type(value)
+        candidates = index.lookup(cls)
+        if candidates is True:
+            return True
+
+        for i in candidates:
+            if checkers[i](value):
+                if len(candidates) > 1:
+                    index.record_hit(i)
+                return True
+
+        # objects whose `__class__` isn't their real class may be instances of members that
+        # were skipped
+        if value.__class__ is not cls:
+            return any(check(value) for check in checkers)
 
-def _instancecheck_type(value, type_):
-    # if it's not a class, return False
-    if not isinstance(value, type):
         return False
 
+    return check
+
+
+def _type_checker(type_, sampled=False):
+    validator = _defer_errors(_subclass_checker, type_)
+    return lambda value: isinstance(value, type) and validator(value)
+
+
+def _subclass_checker(type_):
     if is_base_generic(type_):
-        return True
+        return _always_true
 
     type_args = get_subtypes(type_)
     if len(type_args) != 1:
         raise TypeError("Type must have exactly 1 type argument; found {}".format(type_args))
 
-    return is_subtype(value, type_args[0])
-
-
-def _instancecheck_protocol(value, proto):
-    def is_abstract(thing):
-        return getattr(thing, '__isabstractmethod__', False)
+    super_type = type_args[0]
+    return lambda cls: is_subtype(cls, super_type)
 
-    def extract_inner_methods(thing):
-        if isinstance(thing, property):
-            return {
-                'property.fget': thing.fget,
-                'property.fset': thing.fset,
-                'property.fdel': thing.fdel
-            }
 
-        if isinstance(thing, classmethod):
-            return {'classmethod.__func__': thing.__func__}
+def _function_signature_key(func):
+    """
+    Returns a `(key, state)` tuple for a python function (following `__wrapped__` like
+    `Signature.from_callable` does). Functions with the same key and an equal state have
+    the same signature. Returns None if the signature can't be described this way.
+    """
+    codes = []
+    states = []
+    while True:
+        if type(func) is not types.FunctionType:
+            return None
 
-        if isinstance(thing, staticmethod):
-            return {'staticmethod.__func__': thing.__func__}
+        attrs = func.__dict__
+        kwdefaults = func.__kwdefaults__
+        codes.append(func.__code__)
+        states.append((dict(func.__annotations__), func.__defaults__, kwdefaults and dict(kwdefaults),
+                       attrs.get('__signature__')))
 
-        return {'': thing}
+        if '__wrapped__' not in attrs:
+            return tuple(codes), tuple(states)
 
-    abcs = {}
-    seen = set()
-    for cls in proto.mro():
-        for name, val in vars(cls).items():
-            if name in seen:
-                continue
-            seen.add(name)
+        func = attrs['__wrapped__']
 
-            abstracts = {k for k, meth in extract_inner_methods(val).items() if is_abstract(meth)}
-            if abstracts:
-                abcs[name] = abstracts
-
-    for name, abstracts in abcs.items():
-        try:
-            meth = getattr(value, name)
-        except AttributeError:
-            return False
 
-        abcs = {k for k, m in extract_inner_methods(meth).items() if is_abstract(m)}
-        if abstracts & abcs:
-            return False
+def _signature_key(value):
+    """
+    Returns a `(key, state)` tuple that identifies the signature of the callable `value`, or
+    None if its signature can't be cached. The key is derived from the code objects of the
+    functions that define the signature, and the state records everything else the signature
+    depends on (annotations, defaults and `__signature__` attributes).
+    """
+    cls = type(value)
+    if cls is types.FunctionType:
+        return _function_signature_key(value)
 
-    return True
+    if cls is types.MethodType:
+        key = _function_signature_key(value.__func__)
+        if key is None:
+            return None
 
+        return (types.MethodType, key[0]), key[1]
 
-def _instancecheck_typevar(obj, typevar):
-    bound = typevar.__bound__
-    if bound is not None:
-        return isinstance(obj, bound) and type(obj) is not bound
+    # instances of classes with a `__call__` method
+    if isinstance(value, type) or hasattr(value, '__wrapped__') or getattr(value, '__signature__', None) is not None:
+        return None
 
-    return isinstance(obj, typevar.__constraints__)
+    key = _function_signature_key(getattr(cls, '__call__', None))
+    if key is None:
+        return None
 
+    return (cls, key[0]), key[1]
 
-_SPECIAL_INSTANCE_CHECKERS = {
-    'Union': _instancecheck_union,
-    'Callable': _instancecheck_callable,
-    'Type': _instancecheck_type,
-    'Any': lambda v, t: True,
-}
 
+def _callable_checker(type_, sampled=False):
+    if is_base_generic(type_):
+        return callable
 
-def is_instance(obj, type_):
-    if type(type_) is str:
-        if type_ == 'ellipsis':
-            return obj is ...
-        else:
-            raise ValueError('Cannot resolve forward reference {!r}'.format(type_))
+    has_typevars = _has_typevars(type_)
 
-    if type_.__module__ == 'typing':
-        if _is_protocol(type_):
-            return _instancecheck_protocol(obj, type_)
+    # Maps signature keys to `(state, solution, exception)` tuples, so the TypeVars of a signature
+    # are only solved once
+    solutions = {}
 
-        if is_qualified_generic(type_):
-            base_generic = get_base_generic(type_)
-        else:
-            base_generic = type_
-        name = _get_name(base_generic)
+    def solve(value):
+        signature_key = _signature_key(value)
+        if signature_key is None:
+            return _solve_callable(value, type_)
 
+        key, state = signature_key
         try:
-            validator = _SPECIAL_INSTANCE_CHECKERS[name]
+            cached_state, solution, exception = solutions[key]
         except KeyError:
             pass
         else:
-            return validator(obj, type_)
+            if cached_state == state:
+                if exception is not None:
+                    raise exception.with_traceback(None)
+                return solution
 
-    if is_base_generic(type_):
-        python_type = _get_python_type(type_)
-        return isinstance(obj, python_type)
+        try:
+            solution = _solve_callable(value, type_)
+        except (ValueError, NotImplementedError) as e:
+            solution, exception = None, e
+        else:
+            exception = None
 
-    if is_qualified_generic(type_):
-        python_type = _get_python_type(type_)
-        if not isinstance(obj, python_type):
+        if len(solutions) >= _checker_cache.maxsize:
+            solutions.clear()
+        solutions[key] = (state, solution, exception)
+
+        if exception is not None:
+            raise exception
+        return solution
+
+    def check(value):
+        solution = solve(value)
+        if solution is None:
             return False
 
-        base = get_base_generic(type_)
-        try:
-            validator = _ORIGIN_TYPE_CHECKERS[base]
-        except KeyError:
-            raise NotImplementedError("Cannot perform is_instance check for type {}".format(type_))
+        # the TypeVars of the annotation are shared with the rest of the check
+        return not has_typevars or _merge_bindings(solution)
 
-        type_args = get_subtypes(type_)
-        return validator(obj, type_args)
+    return check
 
-    if isinstance(type_, typing.TypeVar):
-        return _instancecheck_typevar(obj, type_)
 
-    return isinstance(obj, type_)
+def _is_abstract(thing):
+    return getattr(thing, '__isabstractmethod__', False)
 
 
-def is_subtype(sub_type, super_type):
-    if not is_generic(sub_type):
-        python_super = get_python_type(super_type)
-        return issubclass(sub_type, python_super)
-
-    # at this point we know `sub_type` is a generic
-    python_sub = get_python_type(sub_type)
-    python_super = get_python_type(super_type)
-    if not issubclass(python_sub, python_super):
-        return False
+def _extract_inner_methods(thing):
+    if isinstance(thing, property):
+        return {
+            'property.fget': thing.fget,
+            'property.fset': thing.fset,
+            'property.fdel': thing.fdel
+        }
 
-    # at this point we know that `sub_type`'s base type is a subtype of `super_type`'s base type.
-    # If `super_type` isn't qualified, then there's nothing more to do.
-    if not is_generic(super_type) or is_base_generic(super_type):
-        return True
+    if isinstance(thing, classmethod):
+        return {'classmethod.__func__': thing.__func__}
 
-    # at this point we know that `super_type` is a qualified generic... so if `sub_type` isn't
-    # qualified, it can't be a subtype.
-    if is_base_generic(sub_type):
-        return False
+    if isinstance(thing, staticmethod):
+        return {'staticmethod.__func__': thing.__func__}
 
-    # at this point we know that both types are qualified generics, so we just have to
-    # compare their sub-types.
-    sub_args = get_subtypes(sub_type)
-    super_args = get_subtypes(super_type)
-    return all(is_subtype(sub_arg, super_arg) for sub_arg, super_arg in zip(sub_args, super_args))
+    return {'': thing}
+
+
+def _abstract_inner_methods(thing):
+    return {k for k, meth in _extract_inner_methods(thing).items() if _is_abstract(meth)}
+
+
+# builtin classes that look up attributes the same way as `object` does. (Other builtins, like
+# weakref proxies and bound methods, forward attribute access to another object.)
+_GENERIC_GETATTR_TYPES = {object, int, float, complex, str, bytes, bytearray, list, tuple, dict, set, frozenset,
+                          range, memoryview, collections.deque, array.array}
+
+
+# attributes of protocol classes that aren't members of the protocol
+_NON_PROTOCOL_MEMBERS = frozenset({
+    '__abstractmethods__', '__annotations__', '__dict__', '__doc__', '__init__', '__module__', '__new__',
+    '__slots__', '__subclasshook__', '__weakref__', '__class_getitem__', '__init_subclass__', '__match_args__',
+    '__qualname__', '__parameters__', '__orig_bases__', '__orig_class__', '__args__', '__origin__',
+    '__next_in_mro__', '__extra__', '__tree_hash__', '__type_params__', '__static_attributes__',
+    '__firstlineno__', '__annotate__', '__annotate_func__', '__annotations_cache__', '__protocol_attrs__',
+    '__non_callable_proto_members__', '__callable_proto_members_only__', '_is_protocol', '_is_runtime_protocol',
+    '_gorg', '_MutableMapping__marker',
+})
+
+
+def _protocol_member_names(proto):
+    """
+    Returns the names of the attributes and methods that are declared by the protocol classes in
+    the MRO of `proto`.
+    """
+    names = set()
+    for cls in proto.__mro__:
+        if not _is_protocol(cls):
+            continue
+
+        names.update(vars(cls).get('__annotations__', {}))
+        names.update(name for name in vars(cls) if not name.startswith('_abc_'))
+
+    return names - _NON_PROTOCOL_MEMBERS
+
+
+class _ProtocolPlan:
+    """
+    The members of a protocol, computed once per protocol, and a cache of the verdicts for
+    classes whose instances are known to be checked the same way.
+    """
+
+    def __init__(self, proto):
+        declared_names = _protocol_member_names(proto)
+
+        # Maps the names of the members to the names of their abstract inner methods, if any.
+        # Abstract members of other base classes (like `__int__` of `SupportsInt`) are members too.
+        abstract_members = {}
+        seen = set()
+        for cls in proto.mro():
+            for name, val in vars(cls).items():
+                if name in seen:
+                    continue
+                seen.add(name)
+
+                abstracts = _abstract_inner_methods(val)
+                if abstracts or name in declared_names:
+                    abstract_members[name] = abstracts
+
+        # members that are only annotated aren't in any class dict
+        for name in declared_names - seen:
+            abstract_members[name] = set()
+
+        self.abstract_members = tuple(abstract_members.items())
+        self.names = frozenset(abstract_members)
+        self.member_names = tuple(abstract_members)
+
+        # Maps weak references to classes to a `(verdict, has_instance_dict, members)` tuple. The
+        # verdict is None if it can differ between instances of the class, and `members` are the
+        # class attributes the verdict is based on (see `class_members`).
+        self.verdicts = {}
+
+    def check(self, value):
+        for name, abstracts in self.abstract_members:
+            try:
+                meth = getattr(value, name)
+            except AttributeError:
+                return False
+
+            if abstracts & _abstract_inner_methods(meth):
+                return False
+
+        return True
+
+    def class_members(self, cls):
+        """
+        Returns the attributes that the members of the protocol are looked up as in `cls`, so
+        that a cached verdict can be discarded when attributes are added to (or removed from)
+        the class or its bases.
+        """
+        return tuple(getattr(cls, name, _MISSING) for name in self.member_names)
+
+    def is_cacheable(self, cls):
+        """
+        Returns whether all instances of `cls` have the same verdict, i.e. whether looking up
+        the protocol's members on an instance always returns the same attributes.
+        """
+        if hasattr(cls, '__getattr__'):
+            return False
+
+        for base in cls.__mro__:
+            if '__getattribute__' in vars(base):
+                if base not in _GENERIC_GETATTR_TYPES:
+                    return False
+                break
+
+        # data descriptors (like properties and slots) can return something different for
+        # each instance
+        for name in self.names:
+            for base in cls.__mro__:
+                if name in vars(base):
+                    attr_type = type(vars(base)[name])
+                    if hasattr(attr_type, '__set__') or hasattr(attr_type, '__delete__'):
+                        return False
+                    break
+
+        return True
+
+
+_protocol_plans = weakref.WeakKeyDictionary()
+
+
+def _get_protocol_plan(proto):
+    try:
+        return _protocol_plans[proto]
+    except KeyError:
+        pass
+
+    plan = _ProtocolPlan(proto)
+    _protocol_plans[proto] = plan
+    return plan
+
+
+def _shadows_members(value, names):
+    instance_dict = getattr(value, '__dict__', None)
+    return bool(instance_dict) and not names.isdisjoint(instance_dict)
+
+
+def _protocol_checker(proto):
+    plan = _get_protocol_plan(proto)
+    names = plan.names
+    verdicts = plan.verdicts
+
+    def forget_class(cls_ref):
+        verdicts.pop(cls_ref, None)
+
+    def check_uncached(value, cls):
+        has_instance_dict = cls.__dictoffset__ != 0
+        if has_instance_dict and _shadows_members(value, names):
+            return plan.check(value)
+
+        # classes look up their members in themselves rather than in their metaclass
+        if plan.is_cacheable(cls) and not issubclass(cls, type):
+            verdict = plan.check(value)
+            members = plan.class_members(cls)
+        else:
+            verdict = members = None
+
+        verdicts[weakref.ref(cls, forget_class)] = (verdict, has_instance_dict, members)
+        return plan.check(value) if verdict is None else verdict
+
+    def check(value):
+        cls = type(value)
+        try:
+            verdict, has_instance_dict, members = verdicts[weakref.ref(cls)]
+        except KeyError:
+            return check_uncached(value, cls)
+
+        if verdict is None:
+            return plan.check(value)
+
+        # attributes in the instance dict shadow the ones defined in the class
+        if has_instance_dict and _shadows_members(value, names):
+            return plan.check(value)
+
+        try:
+            unchanged = plan.class_members(cls) == members
+        except Exception:
+            unchanged = False
+
+        if not unchanged:
+            return check_uncached(value, cls)
+
+        return verdict
+
+    return check
+
+
+# `Literal` was added to `typing` in python 3.8, but is available in `typing_extensions` before that
+_LITERAL_FORMS = {getattr(module, 'Literal', None) for module in (typing, typing_extensions)} - {None}
+
+_get_type_hints = getattr(typing_extensions, 'get_type_hints', typing.get_type_hints)
+
+
+def _literal_values(type_):
+    """
+    If `type_` is a `Literal` annotation, returns the values it allows. Otherwise returns None.
+    """
+    try:
+        if type_.__origin__ not in _LITERAL_FORMS:
+            return None
+    except (AttributeError, TypeError):
+        return None
+
+    values = []
+    for arg in type_.__args__:
+        # older versions of python don't flatten nested literals
+        nested_values = _literal_values(arg)
+        if nested_values is None:
+            values.append(arg)
+        else:
+            values.extend(nested_values)
+    return values
+
+
+def _literal_checker(type_, sampled=False):
+    # the class is part of the key, because `Literal[1]` doesn't accept `True` or `1.0` even
+    # though they're equal to 1
+    keys = frozenset((type(value), value) for value in _literal_values(type_))
+
+    def check(obj):
+        try:
+            return (type(obj), obj) in keys
+        except TypeError:
+            # unhashable objects can't be equal to any of the values
+            return False
+
+    return check
+
+
+class _FieldPlan:
+    """
+    The fields of a class whose instances are checked field by field, computed once per class.
+    The annotations of the fields are only resolved and compiled when they're first needed,
+    rather than when the class is defined, so that classes can refer to themselves.
+
+    Subclasses implement `field_names(cls, hints)`, `check(obj, sampled)` and `get_elements(obj)`,
+    which returns a list of `(value, annotation, name)` tuples for the fields of `obj`, or None if
+    `obj` doesn't have the fields of the class.
+    """
+
+    def __init__(self, cls):
+        self.cls_ref = weakref.ref(cls)
+
+        # A tuple of `(name, annotation)` tuples
+        self.annotations = None
+
+        # Maps the `sampled` flag to a tuple of `(name, annotation, checker)` tuples
+        self.fields = {}
+
+    def get_annotations(self):
+        if self.annotations is not None:
+            return self.annotations
+
+        cls = self.cls_ref()
+        try:
+            # the class can refer to itself by name, even if it isn't defined at module level
+            hints = _get_type_hints(cls, localns={cls.__name__: cls})
+        except NameError as e:
+            raise ValueError('Cannot resolve the field annotations of {}: {}'.format(cls.__qualname__, e)) from None
+
+        self.annotations = tuple((name, hints.get(name, typing.Any)) for name in self.field_names(cls, hints))
+        return self.annotations
+
+    def get_fields(self, sampled=False):
+        try:
+            return self.fields[sampled]
+        except KeyError:
+            pass
+
+        fields = tuple((name, annotation, _get_checker(annotation, sampled))
+                       for name, annotation in self.get_annotations())
+        self.fields[sampled] = fields
+        return fields
+
+
+class _TypedDictPlan(_FieldPlan):
+    def __init__(self, cls):
+        super().__init__(cls)
+
+        required_keys = getattr(cls, '__required_keys__', None)
+        if required_keys is None:
+            required_keys = frozenset(cls.__annotations__) if cls.__total__ else frozenset()
+        self.required_keys = required_keys
+
+    def field_names(self, cls, hints):
+        return list(hints)
+
+    def check(self, obj, sampled=False):
+        if not isinstance(obj, dict):
+            return False
+
+        # keys that aren't declared are allowed, because the class of an object that has extra
+        # keys is still a subtype of the `TypedDict`
+        for name, _, check_value in self.get_fields(sampled):
+            value = obj.get(name, _MISSING)
+            if value is _MISSING:
+                if name in self.required_keys:
+                    return False
+            elif not check_value(value):
+                return False
+
+        return True
+
+    def get_elements(self, obj):
+        if not isinstance(obj, dict) or not self.required_keys <= obj.keys():
+            return None
+
+        return [(obj[name], annotation, name) for name, annotation, _ in self.get_fields() if name in obj]
+
+
+class _NamedTuplePlan(_FieldPlan):
+    def field_names(self, cls, hints):
+        return cls._fields
+
+    def check(self, obj, sampled=False):
+        if not isinstance(obj, self.cls_ref()):
+            return False
+
+        return all(check_value(value) for (_, _, check_value), value in zip(self.get_fields(sampled), obj))
+
+    def get_elements(self, obj):
+        if not isinstance(obj, self.cls_ref()):
+            return None
+
+        return [(value, annotation, name) for (name, annotation, _), value in zip(self.get_fields(), obj)]
+
+
+class _DataclassPlan(_FieldPlan):
+    def field_names(self, cls, hints):
+        # `fields` excludes class variables and init-only variables
+        return [field.name for field in dataclasses.fields(cls)]
+
+    def check(self, obj, sampled=False):
+        if not isinstance(obj, self.cls_ref()):
+            return False
+
+        for name, _, check_value in self.get_fields(sampled):
+            value = getattr(obj, name, _MISSING)
+            if value is _MISSING or not check_value(value):
+                return False
+
+        return True
+
+    def get_elements(self, obj):
+        if not isinstance(obj, self.cls_ref()):
+            return None
+
+        elements = [(getattr(obj, name, _MISSING), annotation, name) for name, annotation, _ in self.get_fields()]
+        if any(value is _MISSING for value, _, _ in elements):
+            return None
+
+        return elements
+
+
+def _field_plan_type(type_):
+    """
+    Returns the `_FieldPlan` subclass that checks instances of `type_` if it's a `TypedDict`, an
+    annotated `NamedTuple` or a dataclass. Otherwise returns None.
+    """
+    if not isinstance(type_, type) or isinstance(type_, GenericMeta):
+        return None
+
+    if issubclass(type_, dict) and hasattr(type_, '__total__') and hasattr(type_, '__annotations__'):
+        return _TypedDictPlan
+
+    if issubclass(type_, tuple) and hasattr(type_, '_fields') and getattr(type_, '__annotations__', None):
+        return _NamedTuplePlan
+
+    if dataclasses is not None and dataclasses.is_dataclass(type_):
+        return _DataclassPlan
+
+    return None
+
+
+_field_plans = weakref.WeakKeyDictionary()
+
+
+def _get_field_plan(cls, plan_type):
+    try:
+        return _field_plans[cls]
+    except KeyError:
+        pass
+
+    plan = plan_type(cls)
+    _field_plans[cls] = plan
+    return plan
+
+
+def _field_checker(cls, plan_type, sampled=False):
+    plan = _get_field_plan(cls, plan_type)
+    check = plan.check
+    return lambda obj: check(obj, sampled)
+
+
+def _instancecheck_typevar(obj, typevar):
+    bound = typevar.__bound__
+    if bound is not None:
+        return isinstance(obj, bound) and type(obj) is not bound
+
+    constraints = typevar.__constraints__
+    return not constraints or isinstance(obj, constraints)
+
+
+# The TypeVars of an annotation are bound while an object is checked against it, so that all
+# objects that are matched with the same TypeVar (like the elements of `List[T]`) share one
+# binding. The bindings of the check that's running are stored per thread.
+_typevar_scope = threading.local()
+
+
+def _scoped_checker(check):
+    """
+    Returns a checker that runs `check` with a dict of TypeVar bindings. The outermost scoped
+    checker of a check creates the dict and nested ones share it, but they undo their bindings
+    if their object isn't an instance, so that the alternatives of a union don't affect each other.
+    """
+    def scoped(obj):
+        bindings = getattr(_typevar_scope, 'bindings', None)
+        if bindings is None:
+            _typevar_scope.bindings = {}
+            try:
+                return check(obj)
+            finally:
+                _typevar_scope.bindings = None
+
+        saved = bindings.copy()
+        result = check(obj)
+        if not result:
+            bindings.clear()
+            bindings.update(saved)
+        return result
+
+    return scoped
+
+
+def _bind_class(bindings, typevar, cls):
+    """
+    Binds the unconstrained `typevar` to the class `cls`, or returns False if it's already bound
+    to a class that's unrelated to `cls`. The bindings are tuples of all classes a TypeVar has
+    been matched with, and each pair of them must be related, so that the result doesn't depend
+    on the order of the objects.
+    """
+    bound_classes = bindings.get(typevar, ())
+    if cls in bound_classes:
+        return True
+
+    if not all(issubclass(cls, other) or issubclass(other, cls) for other in bound_classes):
+        return False
+
+    bindings[typevar] = bound_classes + (cls,)
+    return True
+
+
+def _merge_bindings(solution):
+    """
+    Merges the TypeVar bindings found by `_solve_callable` into the bindings of the running check.
+    Bindings to annotations that aren't classes can't be compared with those and are ignored.
+    """
+    bindings = getattr(_typevar_scope, 'bindings', None)
+    if bindings is None:
+        return True
+
+    for typevar, bound_types in solution.items():
+        for type_ in bound_types:
+            if typevar.__constraints__:
+                candidates = bindings.get(typevar, typevar.__constraints__)
+                if type_ not in candidates:
+                    return False
+
+                bindings[typevar] = (type_,)
+            elif isinstance(type_, type) and not _bind_class(bindings, typevar, type_):
+                return False
+
+    return True
+
+
+def _annotated_checker(type_, sampled=False):
+    base_type = get_subtypes(type_)[0]
+    check_base = _get_checker(base_type, sampled)
+
+    check_size, check_value = compile_constraints(getattr(type_, '__metadata__', ()))
+    if check_size is None and check_value is None:
+        return check_base
+
+    # the size of a collection is checked before its elements, so that collections that are
+    # too large are rejected without looking at them
+    info = _container_info(base_type)
+    if check_size is not None and info is not None:
+        python_type = info[0]
+        return all_of([lambda obj: isinstance(obj, python_type), check_size, check_base, check_value])
+
+    return all_of([check_base, check_size, check_value])
+
+
+# Maps the special forms of the `typing` module (or, for qualified annotations, their bases) to the
+# functions that compile checkers for them
+_SPECIAL_INSTANCE_CHECKERS = {
+    typing.Union: _union_checker,
+    typing.Callable: _callable_checker,
+    typing.Type: _type_checker,
+    typing.Any: lambda type_, sampled=False: _always_true,
+}
+_SPECIAL_INSTANCE_CHECKERS.update(dict.fromkeys(_LITERAL_FORMS, _literal_checker))
+if _Annotated is not None:
+    _SPECIAL_INSTANCE_CHECKERS[_Annotated] = _annotated_checker
+
+
+def _special_origin(type_):
+    """
+    Returns the key of `type_` in `_SPECIAL_INSTANCE_CHECKERS`, or None if it isn't
+    handled by one of the special checkers.
+    """
+    if is_qualified_generic(type_):
+        origin = get_base_generic(type_)
+    else:
+        origin = type_
+
+    try:
+        return origin if origin in _SPECIAL_INSTANCE_CHECKERS else None
+    except TypeError:
+        # unhashable annotations can't be special forms
+        return None
+
+
+def _isinstance_target(type_):
+    """
+    If checking an object against `type_` is equivalent to a plain `isinstance` call,
+    returns the class (or tuple of classes) to pass to `isinstance`. Otherwise returns None.
+    """
+    try:
+        if type(type_) is str or isinstance(type_, typing.TypeVar):
+            return None
+
+        if isinstance(type_, GenericMeta):
+            return type_
+
+        if _is_protocol(type_):
+            return None
+
+        origin = _special_origin(type_)
+        if origin is not None:
+            if origin is typing.Any:
+                return object
+
+            if origin is typing.Union and is_qualified_generic(type_):
+                targets = []
+                for subtype in get_subtypes(type_):
+                    target = _isinstance_target(subtype)
+                    if target is None:
+                        return None
+                    targets.append(target)
+                return tuple(targets)
+
+            return None
+
+        if is_base_generic(type_):
+            return _get_python_type(type_)
+
+        if is_generic(type_) or not isinstance(type_, type):
+            return None
+
+        # the fields of these classes have to be checked as well
+        if _field_plan_type(type_) is not None:
+            return None
+    except Exception:
+        return None
+
+    return type_
+
+
+_FORWARD_REF_TYPES = tuple(getattr(typing, name) for name in ('ForwardRef', '_ForwardRef') if hasattr(typing, name))
+
+# `type` aliases (python 3.12+)
+_TYPE_ALIAS_TYPES = tuple({getattr(module, 'TypeAliasType') for module in (typing, typing_extensions)
+                           if module is not None and hasattr(module, 'TypeAliasType')})
+
+
+class _BoundRef:
+    """
+    A forward reference that's bound to the namespace it has to be resolved in. The referenced
+    annotation is only evaluated when it's needed, and its own forward references are bound to
+    the same namespace, so recursive annotations refer back to the same `_BoundRef`.
+    """
+
+    __slots__ = ('name', 'namespace', 'value', '__weakref__')
+
+    def __init__(self, name, namespace):
+        self.name = name
+        self.namespace = namespace
+        self.value = _MISSING
+
+    def __repr__(self):
+        return 'ForwardRef({!r})'.format(self.name)
+
+    def __call__(self, *args, **kwargs):
+        # typing only accepts callable objects as type arguments
+        raise TypeError('Forward references cannot be instantiated')
+
+    def resolve(self):
+        if self.value is _MISSING:
+            try:
+                value = eval(self.name, self.namespace)
+            except Exception as e:
+                raise ValueError('Cannot resolve forward reference {!r}: {}'.format(self.name, e)) from None
+
+            self.value = resolve_forward_refs(value, self.namespace)
+
+        return self.value
+
+
+# Maps `(name, namespace)` pairs to bound references. Names are interned, so equal names are
+# the same object.
+_bound_refs = IdentityCache()
+
+# Maps `(type_, namespace)` pairs to the resolved annotations
+_resolved_annotations = IdentityCache()
+
+
+def _get_bound_ref(name, namespace):
+    key = (sys.intern(name), namespace)
+    ref = _bound_refs.get(key)
+    if ref is not None:
+        return ref
+
+    ref = _BoundRef(name, namespace)
+    _bound_refs.set(key, ref)
+
+    return ref
+
+
+def _replace_type_args(type_, type_args):
+    """
+    Returns a copy of the typing generic `type_` with different type arguments.
+    """
+    if hasattr(type_, 'copy_with'):
+        return type_.copy_with(type_args)
+
+    if _typing_origin(type_) is typing.Union:
+        return typing.Union[type_args]
+
+    origin = get_base_generic(type_)
+    if hasattr(types, 'GenericAlias') and isinstance(type_, types.GenericAlias):
+        origin = type_.__origin__
+
+    return origin[type_args if len(type_args) != 1 else type_args[0]]
+
+
+def _bind_forward_refs(type_, namespace):
+    if type(type_) is str:
+        return _get_bound_ref(type_, namespace)
+
+    if isinstance(type_, _FORWARD_REF_TYPES):
+        return _get_bound_ref(type_.__forward_arg__, namespace)
+
+    # the arguments of literals are values rather than annotations
+    if not is_qualified_generic(type_) or _special_origin(type_) in _LITERAL_FORMS:
+        return type_
+
+    type_args = getattr(type_, '__args__', None)
+    if not type_args:
+        return type_
+
+    bound_args = tuple(_bind_forward_refs(arg, namespace) for arg in type_args)
+    if all(bound is arg for bound, arg in zip(bound_args, type_args)):
+        return type_
+
+    return _replace_type_args(type_, bound_args)
+
+
+def resolve_forward_refs(type_, namespace):
+    """
+    Returns a version of the type annotation `type_` in which all forward references (strings
+    and `typing.ForwardRef`s) are resolved in the namespace `namespace`, usually the `globals()`
+    of the module the annotation is defined in. Passing `namespace` to `is_instance` or
+    `compile_checker` does the same.
+
+    References are only evaluated when they're needed for a check, so recursive annotations are
+    supported. Results are cached per annotation and namespace, so the namespace shouldn't change
+    after references to it have been resolved.
+
+    Example:
+    ::
+        >>> Tree = typing.Dict[str, typing.Union[int, 'Tree']]
+        >>> is_instance({'a': {'b': 1}}, resolve_forward_refs(Tree, globals()))
+        True
+    """
+    resolved = _resolved_annotations.get((type_, namespace), _MISSING)
+    if resolved is not _MISSING:
+        return resolved
+
+    try:
+        resolved = _bind_forward_refs(type_, namespace)
+    except Exception:
+        resolved = type_
+
+    _resolved_annotations.set((type_, namespace), resolved)
+
+    return resolved
+
+
+def _alias_value(type_):
+    """
+    If `type_` is a reference to another annotation that can be resolved without knowing where
+    `type_` was used (a bound or module-qualified forward reference or a `type` alias), returns
+    the referenced annotation. Otherwise returns `_MISSING`.
+    """
+    if type(type_) is _BoundRef:
+        return type_.resolve()
+
+    if isinstance(type_, _TYPE_ALIAS_TYPES):
+        module = sys.modules.get(type_.__module__)
+        value = type_.__value__
+        return value if module is None else resolve_forward_refs(value, vars(module))
+
+    if isinstance(type_, _FORWARD_REF_TYPES):
+        module = sys.modules.get(getattr(type_, '__forward_module__', None) or '')
+        if module is not None:
+            return _get_bound_ref(type_.__forward_arg__, vars(module)).resolve()
+
+    return _MISSING
+
+
+def _resolve_alias(type_):
+    """
+    Follows references to other annotations (see `_alias_value`) until it finds an annotation
+    that isn't a reference.
+    """
+    seen = set()
+    while True:
+        value = _alias_value(type_)
+        if value is _MISSING:
+            return type_
+
+        if id(type_) in seen:
+            raise ValueError('Annotation {!r} only refers to itself'.format(type_))
+        seen.add(id(type_))
+
+        type_ = value
+
+
+def _alias_checker(type_, sampled=False):
+    checker = None
+
+    # The reference is resolved when the first object is checked rather than while compiling,
+    # so that compiling a recursive annotation doesn't recurse endlessly. After that, the
+    # referenced annotation's checker is called directly.
+    def check(obj):
+        nonlocal checker
+        if checker is None:
+            checker = _get_checker(_resolve_alias(type_), sampled)
+
+        return checker(obj)
+
+    return check
+
+
+def _forward_ref_checker(type_, sampled=False):
+    if type_ == 'ellipsis':
+        return lambda obj: obj is ...
+
+    # references that know their module are resolved in it
+    if getattr(type_, '__forward_module__', None) in sys.modules:
+        return _alias_checker(type_, sampled)
+
+    name = type_ if isinstance(type_, str) else type_.__forward_arg__
+    raise ValueError('Cannot resolve forward reference {!r}; pass the namespace it refers to'.format(name))
+
+
+def _typevar_checker(type_, sampled=False):
+    constraints = type_.__constraints__
+    if constraints:
+        checkers = [(constraint, _get_checker(constraint, sampled)) for constraint in constraints]
+
+        def check_constrained(obj):
+            bindings = getattr(_typevar_scope, 'bindings', None)
+            if bindings is None:
+                return any(check(obj) for _, check in checkers)
+
+            # the TypeVar is bound to all constraints that every object so far is an instance of
+            candidates = bindings.get(type_, constraints)
+            matches = tuple(constraint for constraint, check in checkers
+                            if constraint in candidates and check(obj))
+            if not matches:
+                return False
+
+            bindings[type_] = matches
+            return True
+
+        return check_constrained
+
+    def check(obj):
+        if not _instancecheck_typevar(obj, type_):
+            return False
+
+        bindings = getattr(_typevar_scope, 'bindings', None)
+        return bindings is None or _bind_class(bindings, type_, type(obj))
+
+    return check
+
+
+# Maps the classes of annotations that are neither classes nor generics to the functions that
+# compile checkers for them
+_ANNOTATION_CLASS_CHECKERS = {
+    str: _forward_ref_checker,
+    typing.TypeVar: _typevar_checker,
+    _BoundRef: _alias_checker,
+}
+_ANNOTATION_CLASS_CHECKERS.update(dict.fromkeys(_FORWARD_REF_TYPES, _forward_ref_checker))
+_ANNOTATION_CLASS_CHECKERS.update(dict.fromkeys(_TYPE_ALIAS_TYPES, _alias_checker))
+
+
+def _compile_checker(type_, sampled=False):
+    make_checker = _ANNOTATION_CLASS_CHECKERS.get(type(type_))
+    if make_checker is not None:
+        return make_checker(type_, sampled)
+
+    if isinstance(type_, GenericMeta):
+        # datatypes generics implement their own instance checks
+        return lambda obj: isinstance(obj, type_)
+
+    if not sampled and _needs_traversal(type_):
+        node = _get_node(type_)
+        return lambda obj: _Traversal().run(obj, node)
+
+    plan_type = _field_plan_type(type_)
+    if plan_type is not None:
+        return _field_checker(type_, plan_type, sampled)
+
+    origin = _special_origin(type_)
+    if origin is not None:
+        return _SPECIAL_INSTANCE_CHECKERS[origin](type_, sampled)
+
+    if _is_protocol(type_):
+        return _protocol_checker(type_)
+
+    if is_base_generic(type_):
+        python_type = _get_python_type(type_)
+        return lambda obj: isinstance(obj, python_type)
+
+    if is_qualified_generic(type_):
+        python_type = _get_python_type(type_)
+        validator = _defer_errors(_origin_type_checker, type_, sampled)
+        return lambda obj: isinstance(obj, python_type) and validator(obj)
+
+    return lambda obj: isinstance(obj, type_)
+
+
+def _origin_type_checker(type_, sampled=False):
+    base = get_base_generic(type_)
+    try:
+        make_checker = _ORIGIN_TYPE_CHECKERS[base]
+    except KeyError:
+        raise NotImplementedError("Cannot perform is_instance check for type {}".format(type_))
+
+    type_args = get_subtypes(type_)
+    return make_checker(type_args, sampled)
+
+
+def _get_checker(type_, sampled=False):
+    # Some annotations compare equal even though their members are in a different order, like
+    # `Union[int, str] == Union[str, int]`, but that doesn't change the results of their checks.
+    cache = _sampled_checker_cache if sampled else _checker_cache
+    checker = cache.get(type_)
+    if checker is not None:
+        return checker
+
+    checker = _defer_errors(_compile_checker, type_, sampled)
+    if _has_typevars(type_):
+        checker = _scoped_checker(checker)
+
+    cache.set(type_, checker)
+
+    return checker
+
+
+# Nested containers are checked by nested checkers, which recurse on the call stack. That's the
+# fastest way to check them, but recursive annotations (like `Json = Union[int, List['Json']]`)
+# can describe objects that are nested arbitrarily deeply (or contain themselves), and very deep
+# annotations would exhaust the call stack as well. These are checked by a `_Traversal` instead,
+# which keeps the containers it still has to visit on an explicit stack and checks shared objects
+# only once. The annotation is described by a graph of `_Node`s:
+#
+# - Nodes of containers whose elements are containers themselves have an `expand` function that
+#   returns the elements of the container, paired with their nodes.
+# - Nodes of unions that include containers have `alternatives`.
+# - All other nodes `check` their objects with a compiled checker. The results for containers
+#   (that don't contain other containers) are memoized.
+
+_node_cache = AnnotationCache()
+
+# containers of these types with at most `_SMALL_CONTAINER_SIZE` elements are checked instead of memoized
+_SMALL_CONTAINER_SIZE = 8
+_SMALL_CONTAINER_TYPES = {list, tuple, dict, set, frozenset}
+
+# the number of type arguments that each checker factory expects
+_ORIGIN_CHECKER_ARITIES = {
+    _iterable_checker: 1,
+    _mapping_checker: 2,
+    _itemsview_checker: 2,
+}
+
+
+class _Node:
+    __slots__ = ('type_', 'check', 'memoize', 'python_type', 'expand', 'alternatives', 'index')
+
+    def __init__(self, type_, check=None, memoize=False, python_type=None, expand=None, alternatives=None,
+                 index=None):
+        self.type_ = type_
+        self.check = check
+        self.memoize = memoize
+        self.python_type = python_type
+        self.expand = expand
+        self.alternatives = alternatives
+        self.index = index
+
+
+def _container_info(type_):
+    """
+    If `type_` is a generic container that's checked by one of the `_ORIGIN_TYPE_CHECKERS`,
+    returns a `(python_type, make_checker, type_args)` tuple. Otherwise returns None.
+    """
+    try:
+        type_ = _resolve_alias(type_)
+
+        if type(type_) is str or isinstance(type_, GenericMeta):
+            return None
+
+        if _is_protocol(type_) or _special_origin(type_) is not None:
+            return None
+
+        if is_base_generic(type_) or not is_qualified_generic(type_):
+            return None
+
+        make_checker = _ORIGIN_TYPE_CHECKERS[get_base_generic(type_)]
+        python_type = _get_python_type(type_)
+        type_args = get_subtypes(type_)
+    except Exception:
+        return None
+
+    if make_checker is _tuple_checker:
+        type_args = _tuple_args(type_args)
+
+        # variable-length tuples are treated like any other homogeneous collection
+        if _is_variadic(type_args):
+            make_checker, type_args = _iterable_checker, type_args[:1]
+
+    if len(type_args) != _ORIGIN_CHECKER_ARITIES.get(make_checker, len(type_args)):
+        return None
+
+    return python_type, make_checker, type_args
+
+
+def _union_alternatives(type_):
+    try:
+        type_ = _resolve_alias(type_)
+    except Exception:
+        return None
+
+    if _typing_origin(type_) is not typing.Union:
+        return None
+
+    return get_subtypes(type_)
+
+
+def _field_plan_info(type_):
+    """
+    If `type_` is a class whose instances are checked by a `_FieldPlan`, returns a
+    `(python_type, plan_type)` tuple. Otherwise returns None.
+    """
+    try:
+        type_ = _resolve_alias(type_)
+    except Exception:
+        return None
+
+    plan_type = _field_plan_type(type_)
+    if plan_type is None:
+        return None
+
+    # instances of `TypedDict`s are plain dicts
+    return (dict if plan_type is _TypedDictPlan else type_), plan_type
+
+
+def _is_container(type_):
+    return _container_info(type_) is not None or _field_plan_info(type_) is not None
+
+
+def _is_nested(type_):
+    """
+    Returns whether instances of `type_` can be containers (or objects with fields) whose
+    elements have to be checked.
+    """
+    if _is_container(type_):
+        return True
+
+    alternatives = _union_alternatives(type_)
+    return alternatives is not None and any(_is_container(alt) for alt in alternatives)
+
+
+# annotations that are nested more deeply than this are checked by a `_Traversal`
+_MAX_CHECKER_DEPTH = 64
+
+
+def _annotation_args(type_):
+    """
+    Returns the annotations that instances of `type_` can contain (or be instances of, for unions).
+    """
+    info = _container_info(type_)
+    if info is not None:
+        return info[2]
+
+    plan_type = _field_plan_type(type_)
+    if plan_type is not None:
+        try:
+            return tuple(annotation for _, annotation in _get_field_plan(type_, plan_type).get_annotations())
+        except ValueError:
+            # the error is raised when an object is checked
+            return ()
+
+    return _union_alternatives(type_) or ()
+
+
+def _needs_traversal(type_):
+    """
+    Returns whether `type_` is an annotation of nested containers (or classes with fields) that
+    refers to itself or is nested more than `_MAX_CHECKER_DEPTH` levels deep, which is checked by
+    a `_Traversal`.
+    """
+    if not _annotation_args(type_):
+        return False
+
+    # depth-first search for a cycle. `on_path` holds the annotations on the path to the current
+    # one, `heights` the nesting depths of the annotations that have been searched completely.
+    on_path = {id(type_)}
+    heights = {}
+    stack = [[type_, iter(_annotation_args(type_)), 0]]
+    while stack:
+        frame = stack[-1]
+        for arg in frame[1]:
+            try:
+                resolved = _resolve_alias(arg)
+            except Exception:
+                continue
+
+            if id(arg) in on_path or id(resolved) in on_path:
+                return True
+
+            height = heights.get(id(resolved))
+            if height is None:
+                args = _annotation_args(resolved)
+                if args:
+                    if len(stack) >= _MAX_CHECKER_DEPTH:
+                        return True
+
+                    on_path.update((id(arg), id(resolved)))
+                    stack.append([arg, iter(args), 0])
+                    break
+
+                height = 0
+
+            frame[2] = max(frame[2], height)
+        else:
+            arg, _, height = stack.pop()
+            resolved = _resolve_alias(arg)
+            on_path.difference_update((id(arg), id(resolved)))
+            heights[id(resolved)] = height + 1
+
+            if stack:
+                stack[-1][2] = max(stack[-1][2], height + 1)
+
+    return heights[id(type_)] > _MAX_CHECKER_DEPTH
+
+
+def _iterable_expander(python_type, type_args):
+    type_, = type_args
+
+    def expand(iterable):
+        if not isinstance(iterable, python_type):
+            return False
+
+        if _ELEMENT_TYPE_GETTERS.get(type(iterable), _MISSING) is not None and _has_element_type(iterable, type_):
+            return None
+
+        return zip(iterable, itertools.repeat(_get_node(type_)))
+
+    return expand
+
+
+def _mapping_expander(python_type, type_args):
+    key_type, value_type = type_args
+
+    def expand(mapping):
+        if not isinstance(mapping, python_type):
+            return False
+
+        if type(mapping) in _ITEM_TYPES_GETTERS and _has_item_types(mapping, key_type, value_type):
+            return None
+
+        key_node = _get_node(key_type)
+        value_node = _get_node(value_type)
+
+        # keys are rarely containers, so they're checked all at once if possible
+        if key_node.check is not None and not key_node.memoize:
+            if not all(map(key_node.check, mapping.keys())):
+                return False
+
+            return zip(mapping.values(), itertools.repeat(value_node))
+
+        return zip(itertools.chain.from_iterable(mapping.items()), itertools.cycle((key_node, value_node)))
+
+    return expand
+
+
+def _itemsview_expander(python_type, type_args):
+    key_type, value_type = type_args
+
+    def expand(itemsview):
+        if not isinstance(itemsview, python_type):
+            return False
+
+        if type(itemsview) in _ITEM_TYPES_GETTERS and _has_item_types(itemsview, key_type, value_type):
+            return None
+
+        key_node = _get_node(key_type)
+        value_node = _get_node(value_type)
+        return (pair for key, value in itemsview for pair in ((key, key_node), (value, value_node)))
+
+    return expand
+
+
+def _tuple_expander(python_type, type_args):
+    def expand(tup):
+        if not isinstance(tup, python_type) or len(tup) != len(type_args):
+            return False
+
+        return zip(tup, [_get_node(type_) for type_ in type_args])
+
+    return expand
+
+
+def _field_expander(cls, plan_type):
+    plan = _get_field_plan(cls, plan_type)
+
+    def expand(obj):
+        elements = plan.get_elements(obj)
+        if elements is None:
+            return False
+
+        return iter([(value, _get_node(annotation)) for value, annotation, _ in elements])
+
+    return expand
+
+
+_ORIGIN_TYPE_EXPANDERS = {
+    _iterable_checker: _iterable_expander,
+    _mapping_checker: _mapping_expander,
+    _itemsview_checker: _itemsview_expander,
+    _tuple_checker: _tuple_expander,
+}
+
+
+def _make_node(type_):
+    # the fields of classes are always expanded, since their annotations are only resolved when
+    # the first object is checked
+    info = _field_plan_info(type_)
+    if info is not None:
+        python_type, plan_type = info
+        return _Node(type_, python_type=python_type, expand=_field_expander(_resolve_alias(type_), plan_type))
+
+    info = _container_info(type_)
+    if info is not None:
+        python_type, make_checker, type_args = info
+        if any(_is_nested(arg) for arg in type_args):
+            expand = _ORIGIN_TYPE_EXPANDERS[make_checker](python_type, type_args)
+            return _Node(type_, python_type=python_type, expand=expand)
+
+        return _Node(type_, check=_get_checker(type_), memoize=True)
+
+    alternatives = _union_alternatives(type_)
+    if alternatives is not None and any(_is_nested(alt) for alt in alternatives):
+        return _Node(type_, alternatives=tuple(_get_node(alt) for alt in alternatives),
+                     index=_UnionIndex(alternatives))
+
+    return _Node(type_, check=_get_checker(type_))
+
+
+def _get_node(type_):
+    node = _node_cache.get(type_)
+    if node is not None:
+        return node
+
+    node = _make_node(type_)
+    _node_cache.set(type_, node)
+
+    return node
+
+
+class _Traversal:
+    """
+    The state of a single instance check of nested containers. `memo` maps the ids of the
+    containers that are known to be instances of (or are currently being checked against) a node
+    to that node (or a set of nodes), so that each container is only checked once and
+    self-referencing containers don't cause an endless loop. `journal` lists the containers and
+    their nodes in the order they were added, and keeps the containers alive so that their ids
+    can't be reused.
+
+    Most data doesn't contain any container twice, so memoizing has to be cheap: the keys are
+    plain ids and no tuples are created.
+    """
+
+    def __init__(self):
+        self.memo = {}
+        self.journal = []
+
+    def run(self, obj, node):
+        memo_get = self.memo.get
+        memoize = self.memoize
+
+        stack = [iter([(obj, node)])]
+        while stack:
+            for obj, node in stack[-1]:
+                if node.expand is None:
+                    if node.alternatives is not None:
+                        children = self.visit_union(obj, node)
+                        if children is None:
+                            continue
+                        if children is False:
+                            return False
+
+                        stack.append(children)
+                        break
+
+                    # checking a small builtin container is cheaper than memoizing it
+                    if not node.memoize or (type(obj) in _SMALL_CONTAINER_TYPES and len(obj) <= _SMALL_CONTAINER_SIZE):
+                        if not node.check(obj):
+                            return False
+                        continue
+
+                    entry = memo_get(id(obj))
+                    if entry is not None and (entry is node or (type(entry) is set and node in entry)):
+                        continue
+
+                    if not node.check(obj):
+                        return False
+
+                    memoize(obj, node, entry)
+                    continue
+
+                entry = memo_get(id(obj))
+                if entry is not None and (entry is node or (type(entry) is set and node in entry)):
+                    continue
+
+                children = node.expand(obj)
+                if children is False:
+                    return False
+
+                # the container is memoized before its elements are checked, so that it's treated
+                # as an instance if it (directly or indirectly) contains itself
+                memoize(obj, node, entry)
+
+                if children is not None:
+                    stack.append(children)
+                    break
+            else:
+                stack.pop()
+
+        return True
+
+    def memoize(self, obj, node, entry):
+        if entry is None:
+            self.memo[id(obj)] = node
+        elif type(entry) is set:
+            entry.add(node)
+        else:
+            self.memo[id(obj)] = {entry, node}
+
+        self.journal += (obj, node)
+
+    def forget(self, checkpoint):
+        """
+        Removes the containers that were memoized after the journal had the length `checkpoint`.
+        """
+        memo = self.memo
+        journal = self.journal
+        for i in range(checkpoint, len(journal), 2):
+            obj_id = id(journal[i])
+            entry = memo[obj_id]
+            if type(entry) is set:
+                entry.discard(journal[i + 1])
+                if entry:
+                    continue
+
+            del memo[obj_id]
+
+        del journal[checkpoint:]
+
+    def visit_union(self, obj, node):
+        """
+        Returns False if `obj` isn't an instance of the union, None if it is, or an iterator of
+        `(element, node)` pairs that have to be checked to find out.
+        """
+        alternatives = node.alternatives
+        indices = node.index.lookup(type(obj))
+        if indices is True:
+            return None
+
+        if obj.__class__ is not type(obj):
+            indices = node.index.all_members
+
+        candidates = []
+        for i in indices:
+            alternative = alternatives[i]
+            if alternative.expand is None:
+                if self.run(obj, alternative):
+                    if len(indices) > 1:
+                        node.index.record_hit(i)
+                    return None
+            elif isinstance(obj, alternative.python_type):
+                candidates.append(alternative)
+
+        if not candidates:
+            return False
+
+        # if the object could be an instance of multiple alternatives, all but the last one
+        # have to be checked separately. If a check fails, all results that were memoized
+        # during the check are discarded, since they may have been based on assumptions
+        # that turned out to be wrong.
+        for alternative in candidates[:-1]:
+            checkpoint = len(self.journal)
+            if self.run(obj, alternative):
+                return None
+
+            self.forget(checkpoint)
+
+        return iter([(obj, candidates[-1])])
+
+
+def _check_chunk(type_, chunk):
+    return all(map(_get_checker(type_), chunk))
+
+
+def _check_items_chunk(key_type, value_type, items):
+    check_key = _get_checker(key_type)
+    check_value = _get_checker(value_type)
+    return all(check_key(key) and check_value(value) for key, value in items)
+
+
+def _chunk_plan(type_):
+    """
+    If instances of `type_` are collections whose elements can be checked in independent chunks,
+    returns a function that takes an object and returns False if it isn't an instance of the
+    collection class, True if its elements are known to be instances without checking them, or
+    a `(check_chunk, args, elements)` tuple, where `check_chunk(*args, chunk)` checks a chunk of
+    `elements`. Otherwise returns None.
+    """
+    info = _container_info(type_)
+    if info is None or info[1] is _tuple_checker:
+        return None
+
+    # the chunks would bind the TypeVars independently of each other
+    if _has_typevars(type_):
+        return None
+
+    python_type, make_checker, type_args = info
+
+    def plan(obj):
+        if not isinstance(obj, python_type):
+            return False
+
+        if make_checker is _iterable_checker:
+            element_type, = type_args
+            if _ELEMENT_TYPE_GETTERS.get(type(obj), _MISSING) is not None and _has_element_type(obj, element_type):
+                return True
+
+            return _check_chunk, (element_type,), obj
+
+        if make_checker is _mapping_checker:
+            if type(obj) in _ITEM_TYPES_GETTERS and _has_item_types(obj, *type_args):
+                return True
+
+            obj = obj.items()
+
+        return _check_items_chunk, type_args, obj
+
+    return plan
+
+
+def _parallel_checker(type_, parallel):
+    """
+    Returns a checker that splits large collections into chunks that are checked in parallel,
+    as described by the `Parallel` policy `parallel`.
+    """
+    check = _get_checker(type_)
+
+    plan = _chunk_plan(type_)
+    if plan is None:
+        return check
+
+    def check_parallel(obj):
+        result = plan(obj)
+        if result is True or result is False:
+            return result
+
+        check_chunk, args, elements = result
+        try:
+            size = len(elements)
+        except TypeError:
+            return check(obj)
+
+        if size < parallel.threshold:
+            return check(obj)
+
+        chunk_size = parallel.get_chunk_size(size)
+        return run_chunks(parallel, check_chunk, args, elements, chunk_size)
+
+    return check_parallel
+
+
+def compile_checker(type_, parallel=None, namespace=None):
+    """
+    Resolves the type annotation `type_` into a specialized function that takes a single
+    object as input and returns whether it's an instance of `type_`. Calling the returned
+    function is equivalent to (but faster than) calling `is_instance(obj, type_)`.
+
+    Compiled checkers are cached, so compiling the same annotation twice returns the same
+    function. (Unless a `Parallel` policy is passed, see `is_instance`.)
+
+    Forward references are resolved in `namespace`, see `resolve_forward_refs`.
+
+    Example:
+    ::
+        >>> check = compile_checker(typing.List[int])
+        >>> check([1, 2, 3])
+        True
+        >>> check([1, 'x'])
+        False
+    """
+    if namespace is not None:
+        type_ = resolve_forward_refs(type_, namespace)
+
+    if parallel is not None:
+        return _parallel_checker(type_, parallel)
+
+    return _get_checker(type_)
+
+
+def is_instance(obj, type_, sampling=None, parallel=None, memo=None, namespace=None):
+    """
+    Checks whether `obj` is an instance of the type annotation `type_`.
+
+    If a `Sampling` policy is passed, large collections are only partially checked and the
+    result is returned as a `Verdict` that records whether any elements were skipped.
+
+    If a `Parallel` policy is passed, large collections are split into chunks that are checked
+    in parallel. This can't be combined with sampling.
+
+    If a `Memo` is passed, the result for a deeply immutable `obj` is looked up in and stored in
+    the memo. This can't be combined with sampling either.
+
+    Forward references (like `'Tree'` in `Dict[str, 'Tree']`) are resolved in `namespace`, see
+    `resolve_forward_refs`.
+
+    TypeVars are bound while checking, so all objects that are matched with the same TypeVar
+    must agree: `[1, True]` is an instance of `List[T]`, but `[1, 'x']` isn't.
+    """
+    if namespace is not None:
+        type_ = resolve_forward_refs(type_, namespace)
+
+    if memo is None:
+        return _check_instance(obj, type_, sampling, parallel)
+
+    if sampling is not None:
+        raise ValueError("Sampled results can't be memoized")
+
+    result = memo.lookup(obj, type_)
+    if result is None:
+        result = _check_instance(obj, type_, sampling, parallel)
+        memo.store(obj, type_, result)
+
+    return result
+
+
+def _check_instance(obj, type_, sampling, parallel):
+    if parallel is not None:
+        if sampling is not None:
+            raise ValueError("Sampled checks can't be parallelized")
+
+        return _parallel_checker(type_, parallel)(obj)
+
+    if sampling is None:
+        return _get_checker(type_)(obj)
+
+    return run_sampled(_get_checker(type_, sampled=True), obj, sampling)
+
+
+_BATCH_MODES = {'all', 'mask', 'first_failure'}
+
+
+def _batch_verdicts(objects, type_):
+    """
+    Returns an iterable of booleans that says whether each object in `objects` is an instance
+    of `type_`, or None if it's known that all of them are.
+    """
+    target = _isinstance_target(type_)
+    if target is None:
+        return map(_get_checker(type_), objects)
+
+    # If the check only depends on the class of an object, each distinct class only has to be
+    # judged once. This needs a second pass over `objects`, so it's only done for sequences.
+    if type(objects) in {list, tuple} and _is_decided_by_type(target):
+        if _classes_are_subclasses(objects, target):
+            return None
+
+    return map(isinstance, objects, itertools.repeat(target))
+
+
+def is_instance_many(objects, type_, mode='all'):
+    """
+    Checks whether each object in the iterable `objects` is an instance of the type annotation
+    `type_`. This is equivalent to calling `is_instance` on each object, but the annotation is
+    only resolved once. The result depends on `mode`:
+
+    - `'all'`: Returns whether all objects are instances of `type_`.
+    - `'mask'`: Returns a `bytearray` with a 1 for each object that is an instance of `type_`
+      and a 0 for each object that isn't.
+    - `'first_failure'`: Returns the index of the first object that isn't an instance of
+      `type_`, or None if all of them are.
+
+    Example:
+    ::
+        >>> is_instance_many([1, 'x', 2], int, mode='mask')
+        bytearray(b'\\x01\\x00\\x01')
+        >>> is_instance_many([1, 'x', 2], int, mode='first_failure')
+        1
+    """
+    if mode not in _BATCH_MODES:
+        raise ValueError('Invalid mode {!r}; expected one of {}'.format(mode, ', '.join(sorted(_BATCH_MODES))))
+
+    verdicts = _batch_verdicts(objects, type_)
+
+    if mode == 'all':
+        return verdicts is None or all(verdicts)
+
+    if mode == 'mask':
+        if verdicts is None:
+            return bytearray(b'\x01') * len(objects)
+
+        return bytearray(verdicts)
+
+    if verdicts is None:
+        return None
+
+    failures = itertools.compress(itertools.count(), map(operator.not_, verdicts))
+    return next(failures, None)
+
+
+def _typing_origin(type_):
+    """
+    Returns the base generic that `type_` is a qualified version of (for example `Union` for
+    `Union[int, str]` and `int | str`), or None if `type_` isn't a qualified typing generic.
+    """
+    try:
+        if isinstance(type_, GenericMeta) or not is_qualified_generic(type_):
+            return None
+
+        return get_base_generic(type_)
+    except Exception:
+        return None
+
+
+def _normalize_type(type_):
+    """
+    Converts `type_` to the form that is used as key for the subtype cache: `None` becomes
+    `NoneType` and unqualified typing generics become their python classes.
+    """
+    if type_ is None:
+        return type(None)
+
+    try:
+        # special forms like `Union` don't have a python class
+        if not isinstance(type_, GenericMeta) and is_base_generic(type_):
+            return _get_python_type(type_)
+    except Exception:
+        pass
+
+    return type_
+
+
+def _typevar_bounds(typevar):
+    if typevar.__constraints__:
+        return typevar.__constraints__
+
+    if typevar.__bound__ is not None:
+        return (typevar.__bound__,)
+
+    return (object,)
+
+
+def _tuple_element_types(tuple_type):
+    return _tuple_args(get_subtypes(tuple_type))
+
+
+_COVARIANT = 'covariant'
+_CONTRAVARIANT = 'contravariant'
+_INVARIANT = 'invariant'
+
+
+# Since python 3.9, the generics in the `typing` module don't have type parameters anymore, so the
+# variances of those that aren't covariant are listed here
+_TYPING_VARIANCES = {}
+for _name, _variances in [
+    ('List', [_INVARIANT]),
+    ('Set', [_INVARIANT]),
+    ('MutableSequence', [_INVARIANT]),
+    ('MutableSet', [_INVARIANT]),
+    ('Deque', [_INVARIANT]),
+    ('Counter', [_INVARIANT]),
+    ('Dict', [_INVARIANT, _INVARIANT]),
+    ('MutableMapping', [_INVARIANT, _INVARIANT]),
+    ('DefaultDict', [_INVARIANT, _INVARIANT]),
+    ('OrderedDict', [_INVARIANT, _INVARIANT]),
+    ('ChainMap', [_INVARIANT, _INVARIANT]),
+    ('Mapping', [_INVARIANT, _COVARIANT]),
+    ('Generator', [_COVARIANT, _CONTRAVARIANT, _COVARIANT]),
+    ('Coroutine', [_COVARIANT, _CONTRAVARIANT, _COVARIANT]),
+    ('AsyncGenerator', [_COVARIANT, _CONTRAVARIANT]),
+]:
+    if hasattr(typing, _name):
+        _TYPING_VARIANCES[getattr(typing, _name)] = _variances
+
+
+def _get_variances(generic, num_args):
+    """
+    Returns the variance of each type parameter of the qualified generic `generic`. Generics that
+    don't declare their type parameters are treated as covariant.
+    """
+    base = get_base_generic(generic)
+    params = getattr(base, '__parameters__', ())
+
+    if len(params) != num_args:
+        variances = _TYPING_VARIANCES.get(base)
+        if variances is not None and len(variances) == num_args:
+            return variances
+
+        return [_COVARIANT] * num_args
+
+    variances = []
+    for param in params:
+        if param.__covariant__:
+            variances.append(_COVARIANT)
+        elif param.__contravariant__:
+            variances.append(_CONTRAVARIANT)
+        else:
+            variances.append(_INVARIANT)
+    return variances
+
+
+def _is_callable_subtype(sub_type, super_type):
+    if _typing_origin(sub_type) is not typing.Callable:
+        # classes and unqualified callables don't have a known signature
+        return _is_generic_subtype(sub_type, super_type)
+
+    sub_params, sub_return = get_subtypes(sub_type)
+    super_params, super_return = get_subtypes(super_type)
+
+    if not is_subtype(sub_return, super_return):
+        return False
+
+    if sub_params is ... or super_params is ...:
+        return True
+
+    if len(sub_params) != len(super_params):
+        return False
+
+    # parameters are contravariant
+    return all(is_subtype(super_param, sub_param) for sub_param, super_param in zip(sub_params, super_params))
+
+
+def _is_tuple_subtype(sub_type, super_type):
+    element_types = _tuple_element_types(sub_type)
+    variadic = _is_variadic(element_types)
+    if variadic:
+        element_types = element_types[:1]
+
+    if _typing_origin(super_type) is typing.Tuple:
+        super_element_types = _tuple_element_types(super_type)
+
+        # a variable-length tuple accepts tuples of any length, as long as all of their elements
+        # have the right type
+        if _is_variadic(super_element_types):
+            return all(is_subtype(typ, super_element_types[0]) for typ in element_types)
+
+        if variadic or len(element_types) != len(super_element_types):
+            return False
+
+        return all(is_subtype(sub, sup) for sub, sup in zip(element_types, super_element_types))
+
+    python_super = _python_class(super_type)
+    if python_super is None or not issubclass(tuple, python_super):
+        return False
+
+    if not is_qualified_generic(super_type):
+        return True
+
+    # at this point we know that `super_type` is a homogeneous collection like `Sequence[int]`,
+    # so every element type of the tuple must be a subtype of its item type
+    super_args = get_subtypes(super_type)
+    if len(super_args) != 1:
+        return _is_generic_subtype(sub_type, super_type)
+
+    return all(is_subtype(typ, super_args[0]) for typ in element_types)
+
+
+def _python_class(type_):
+    """
+    Like `get_python_type`, but returns None for special forms like `NoReturn`, which aren't
+    classes and have no python class either.
+    """
+    try:
+        cls = get_python_type(type_)
+    except (NotImplementedError, AttributeError):
+        # python 3.7 treats special forms as generics without an `__origin__`
+        return None
+
+    return cls if isinstance(cls, type) else None
+
+
+def _is_generic_subtype(sub_type, super_type):
+    python_sub = _python_class(sub_type) if is_generic(sub_type) else sub_type
+    python_super = _python_class(super_type)
+
+    # special forms are only subtypes of themselves, which the caller has ruled out
+    if not isinstance(python_sub, type) or python_super is None or not issubclass(python_sub, python_super):
+        return False
+
+    # at this point we know that `sub_type`'s base type is a subtype of `super_type`'s base type.
+    # If either of them isn't qualified, its type arguments are implicitly `Any`, so there's
+    # nothing more to do.
+    if not is_qualified_generic(super_type) or not is_qualified_generic(sub_type):
+        return True
+
+    # at this point we know that both types are qualified generics, so we just have to
+    # compare their sub-types according to the variance of `super_type`'s type parameters.
+    sub_args = get_subtypes(sub_type)
+    super_args = get_subtypes(super_type)
+    variances = _get_variances(super_type, len(super_args))
+
+    for sub_arg, super_arg, variance in zip(sub_args, super_args, variances):
+        if variance != _CONTRAVARIANT and not is_subtype(sub_arg, super_arg):
+            return False
+
+        if variance != _COVARIANT and not is_subtype(super_arg, sub_arg):
+            return False
+
+    return True
+
+
+def _is_literal_value_subtype(value, super_type):
+    super_values = _literal_values(super_type)
+    if super_values is not None:
+        # `Literal[1]` and `Literal[True]` are different, even though `1 == True`
+        return any(type(super_value) is type(value) and super_value == value for super_value in super_values)
+
+    if _typing_origin(super_type) is typing.Union:
+        return any(_is_literal_value_subtype(value, typ) for typ in get_subtypes(super_type))
+
+    return is_subtype(type(value), super_type)
+
+
+def _is_subtype(sub_type, super_type):
+    if sub_type == super_type:
+        return True
+
+    # `Any` is compatible with every type in both directions
+    if sub_type is typing.Any or super_type is typing.Any:
+        return True
+
+    if _typing_origin(sub_type) is typing.Union:
+        return all(is_subtype(typ, super_type) for typ in get_subtypes(sub_type))
+
+    # literals are split into their values before unions are, so that `Literal[1, 'x']` is a
+    # subtype of `Union[int, str]`
+    literal_values = _literal_values(sub_type)
+    if literal_values is not None:
+        return all(_is_literal_value_subtype(value, super_type) for value in literal_values)
+
+    if _typing_origin(super_type) is typing.Union:
+        return any(is_subtype(sub_type, typ) for typ in get_subtypes(super_type))
+
+    if isinstance(sub_type, typing.TypeVar):
+        return all(is_subtype(typ, super_type) for typ in _typevar_bounds(sub_type))
+
+    if isinstance(super_type, typing.TypeVar):
+        return any(is_subtype(sub_type, typ) for typ in _typevar_bounds(super_type))
+
+    if _typing_origin(super_type) is typing.Callable:
+        return _is_callable_subtype(sub_type, super_type)
+
+    if _typing_origin(sub_type) is typing.Tuple:
+        return _is_tuple_subtype(sub_type, super_type)
+
+    return _is_generic_subtype(sub_type, super_type)
+
+
+_cached_is_subtype = functools.lru_cache(maxsize=_subtype_cache.maxsize)(_is_subtype)
+
+
+def _is_normalized_subtype(sub_type, super_type):
+    sub_type = _normalize_type(sub_type)
+    super_type = _normalize_type(super_type)
+
+    try:
+        hash((sub_type, super_type))
+    except TypeError:
+        return _is_subtype(sub_type, super_type)
+
+    return _cached_is_subtype(sub_type, super_type)
+
+
+def is_subtype(sub_type, super_type):
+    """
+    Checks whether `sub_type` is a subtype of `super_type`. Both can be classes or type annotations.
+
+    - Unions are accepted on either side, and `None` is treated as `NoneType`.
+    - `Literal`s are subtypes of the classes of their values. Special forms that aren't classes,
+      like `NoReturn`, are only subtypes of themselves.
+    - `Any` is compatible with every type in both directions.
+    - Tuples must have the same number of elements, unless the supertype is a variable-length
+      tuple like `Tuple[int, ...]`.
+    - Callables are contravariant in their parameters and covariant in their return type.
+    - The type arguments of generics are compared according to the variance of their type
+      parameters, so `List[bool]` isn't a subtype of `List[int]`, but `Sequence[bool]` is a
+      subtype of `Sequence[int]`.
+
+    Results are memoized in a bounded LRU cache keyed on the normalized pair of types;
+    `is_subtype.cache_info()` reports its statistics.
+    """
+    # Hashing typing annotations is slow, so there's an identity-keyed cache in front of the
+    # LRU cache. Each entry keeps references to its types, so ids can't be reused while cached.
+    _check_abc_token()
+
+    result = _subtype_cache.get((sub_type, super_type))
+    if result is not None:
+        _subtype_cache_hits[0] += 1
+        return result
+
+    result = _is_normalized_subtype(sub_type, super_type)
+    _subtype_cache.set((sub_type, super_type), result)
+
+    return result
+
+
+_SubtypeCacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _subtype_cache_info():
+    info = _cached_is_subtype.cache_info()
+    return _SubtypeCacheInfo(info.hits + _subtype_cache_hits[0], info.misses, info.maxsize, info.currsize)
+
+
+def _clear_subtype_caches():
+    _subtype_cache.clear()
+    _subtype_cache_hits[0] = 0
+    _cached_is_subtype.cache_clear()
+
+
+is_subtype.cache_info = _subtype_cache_info
+is_subtype.cache_clear = _clear_subtype_caches
@@ -1,6 +1,9 @@
 
 from datatypes import types as dtypes
+from datatypes.types.type import Type, TypeMeta
 from datatypes.introspection import is_generic, is_base_generic, get_base_generic, get_python_type, get_subtypes
+from datatypes.introspection import _Annotated
+from datatypes.caching import AnnotationCache
 
 
 __all__ = ['class_to_datatype']
@@ -10,19 +13,62 @@ _CLASS_TO_DTYPE = {dtype.python_type: dtype for dtype in vars(dtypes).values() i
 _TYPING_TO_DTYPE = {dtype.typing_type: dtype for dtype in vars(dtypes).values() if hasattr(dtype, 'typing_type')}
 
 
+class _AnnotatedMeta(TypeMeta):
+    def __str__(cls):
+        return str(cls.annotation)
+
+    def __instancecheck__(cls, instance):
+        from .type_checks import is_instance
+
+        return is_instance(instance, cls.annotation)
+
+
+class _AnnotatedType(Type, metaclass=_AnnotatedMeta):
+    """
+    Base class of the datatypes that are created for `Annotated` annotations, so that their
+    constraints are checked when they're parsed.
+    """
+
+    @classmethod
+    def parse(cls, value):
+        from .parse import compile_parser
+
+        return compile_parser(cls.annotation)(value)
+
+
+_annotated_datatypes = AnnotationCache()
+
+
+def _annotated_to_datatype(annotation):
+    dtype = _annotated_datatypes.get(annotation)
+    if dtype is not None:
+        return dtype
+
+    attrs = {'annotation': annotation, 'python_type': get_python_type(annotation)}
+    dtype = _AnnotatedMeta('Annotated', (_AnnotatedType,), attrs)
+
+    _annotated_datatypes.set(annotation, dtype)
+    return dtype
+
+
+def _is_annotated(cls):
+    return _Annotated is not None and is_generic(cls) and not is_base_generic(cls) and get_base_generic(cls) is _Annotated
+
+
 def class_to_datatype(cls):
     """
     Given a class or type annotation as input, returns the corresponding datatypes class. If no equivalent
     datatype exists, the input is returned unchanged.
     """
-    if cls.__module__ not in {'typing', 'datatypes'}:
-        return _CLASS_TO_DTYPE.get(cls, cls)
+    if _is_annotated(cls):
+        return _annotated_to_datatype(cls)
 
     if not is_generic(cls) or is_base_generic(cls):
-        if cls.__module__ == 'typing':
-            return _TYPING_TO_DTYPE.get(cls, cls)
-
-        return _CLASS_TO_DTYPE.get(cls, cls)
+        try:
+            return _TYPING_TO_DTYPE.get(cls) or _CLASS_TO_DTYPE.get(cls, cls)
+        except TypeError:
+            # unhashable type arguments (like the parameter list of a `Callable`) have no equivalent
+            return cls
 
     # at this point we know the class is a qualified generic
     base = get_base_generic(cls)
@@ -9,11 +9,13 @@ from .dict import *
 from .file import *
 from .filepath import *
 from .list import *
+from .ndarray import *
 from .numbers import *
 from .optional import *
 from .regex import *
 from .set import *
 from .text import *
+from .tuple import *
 
 # because some of the submodules have names that conflict with builtins, we REALLY have to make sure
 # a `from datatypes import *` doesn't import those...
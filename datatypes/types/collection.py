@@ -3,7 +3,7 @@ import collections.abc
 
 from .type import Type
 from .generics import GenericMeta
-from ..parse import parse
+from ..parse import compile_parser
 
 __all__ = ['Collection']
 
@@ -24,6 +24,12 @@ class CollectionMeta(GenericMeta):
             return True
 
         first_subtype = getattr(cls, first_subtype_name)
+
+        # typed containers already know the type of their contents
+        from ..type_checks import _has_element_type
+        if _has_element_type(instance, first_subtype):
+            return True
+
         return all(isinstance(val, first_subtype) for val in instance)
 
 
@@ -38,6 +44,6 @@ class Collection(Type, metaclass=CollectionMeta):
             raise TypeError('Expected an iterable, got a {}'.format(type(value).__name__))
 
         if hasattr(cls, 'item_type'):
-            value = (parse(v, cls.item_type) for v in value)
+            value = map(compile_parser(cls.item_type), value)
 
         return cls.python_type(value)
@@ -4,7 +4,7 @@ import typing
 
 from .collection import CollectionMeta
 from .type import Type
-from ..parse import parse
+from ..parse import compile_parser
 
 __all__ = ['Dict']
 
@@ -27,7 +27,10 @@ class Dict(Type, metaclass=CollectionMeta, subtype_names=['key_type', 'value_typ
         else:
             raise TypeError('Expected a dict of {} -> {}, got {}'.format(self.key_type, self.value_type, type(value)))
 
-        key_converter = lambda key: parse(key, cls.key_type)
-        value_converter = lambda value: parse(value, cls.value_type)
+        if not hasattr(cls, 'key_type'):
+            return python_type(value)
+
+        key_converter = compile_parser(cls.key_type)
+        value_converter = compile_parser(cls.value_type)
         value = python_type((key_converter(k), value_converter(v)) for k, v in value)
         return value
\ No newline at end of file
@@ -4,6 +4,13 @@ from .type import *
 __all__ = ['GenericMeta', 'QualifiedGenericMeta']
 
 
+def _subtype_name(subtype):
+    if subtype is ...:
+        return '...'
+
+    return subtype.__name__
+
+
 class GenericMeta(TypeMeta):
     def __new__(mcs, name, bases, attrs, subtype_names):
         return super().__new__(mcs, name, bases, attrs)
@@ -18,30 +25,37 @@ class GenericMeta(TypeMeta):
         if not isinstance(subtypes, tuple):
             subtypes = (subtypes,)
 
-        for subtype in subtypes:
-            if not isinstance(subtype, type):
-                raise TypeError('subtypes must be types, not {}'.format(subtype))
+        cls._check_subtypes(subtypes)
 
         if subtypes in cls._class_for_subtype:
             return cls._class_for_subtype[subtypes]
 
         metacls = type('Specialized{}Meta'.format(cls.__name__), (QualifiedGenericMeta, type(cls)), {})
-        name = '{}[{}]'.format(cls.__name__, ', '.join(subtype.__name__ for subtype in subtypes))
+        name = '{}[{}]'.format(cls.__name__, ', '.join(map(_subtype_name, subtypes)) or '()')
         bases = (cls,)
         attrs = {
             '_base': cls,
+            '_subtypes': subtypes,
         }
         for attr in ('python_type','typing_type'):
             if hasattr(cls, attr):
                 attrs[attr] = getattr(cls, attr)
 
         subcls = metacls(name, bases, attrs)
-        for subtype, subtype_name in zip(subtypes, cls._subtype_names):
-            setattr(subcls, subtype_name, subtype)
+        cls._set_subtypes(subcls, subtypes)
 
         cls._class_for_subtype[subtypes] = subcls
         return subcls
 
+    def _check_subtypes(cls, subtypes):
+        for subtype in subtypes:
+            if not isinstance(subtype, type):
+                raise TypeError('subtypes must be types, not {}'.format(subtype))
+
+    def _set_subtypes(cls, subcls, subtypes):
+        for subtype, subtype_name in zip(subtypes, cls._subtype_names):
+            setattr(subcls, subtype_name, subtype)
+
 
 class QualifiedGenericMeta(GenericMeta):
     def __new__(mcs, *args, **kwargs):
@@ -56,7 +70,7 @@ class QualifiedGenericMeta(GenericMeta):
         raise TypeError("{} is not a generic class".format(cls.__name__))
 
     def _list_subtypes(cls):
-        return tuple(getattr(cls, attr) for attr in cls._subtype_names)
+        return cls._subtypes
 
 
 # class Generic(Type, metaclass=GenericMeta):
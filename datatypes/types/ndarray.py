@@ -0,0 +1,90 @@
+
+from .type import Type
+from .generics import GenericMeta
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ['NDArray']
+
+
+# Python classes are matched against numpy's dtype kinds rather than scalar types, because
+# numpy's integer scalars don't inherit from `int` (and its booleans don't inherit from `bool`)
+_KINDS_FOR_PYTHON_TYPE = {
+    bool: 'b',
+    int: 'iu',
+    float: 'f',
+    complex: 'c',
+    str: 'U',
+    bytes: 'S',
+}
+
+
+def _get_dtype(obj):
+    """
+    Returns the dtype of a numpy-like array, or None if `obj` isn't one. Arrays are recognized
+    by duck typing, so numpy doesn't have to be installed.
+    """
+    cls = type(obj)
+    if not all(hasattr(cls, attr) for attr in ('__array_interface__', 'dtype', 'shape')):
+        return None
+
+    dtype = obj.dtype
+    if not hasattr(dtype, 'kind') or not hasattr(dtype, 'type'):
+        return None
+
+    return dtype
+
+
+def _dtype_matches(dtype, expected):
+    try:
+        kinds = _KINDS_FOR_PYTHON_TYPE[expected]
+    except KeyError:
+        return issubclass(dtype.type, expected)
+
+    return dtype.kind in kinds
+
+
+class NDArrayMeta(GenericMeta):
+    def __instancecheck__(cls, instance):
+        dtype = _get_dtype(instance)
+        if dtype is None:
+            return False
+
+        if not hasattr(cls, 'dtype'):
+            return True
+
+        return _dtype_matches(dtype, cls.dtype)
+
+
+class NDArray(Type, metaclass=NDArrayMeta, subtype_names=['dtype']):
+    """
+    A numpy array, optionally with a specific element type. The element type can either be a
+    numpy scalar type (`NDArray[numpy.float32]`) or a python class, which matches all dtypes of
+    the same kind (`NDArray[int]` matches arrays of any signed or unsigned integer type).
+
+    Instance checks only look at the array's dtype, so they don't iterate over the array.
+    """
+    if numpy is not None:
+        python_type = numpy.ndarray
+
+    @classmethod
+    def parse(cls, value):
+        if isinstance(value, cls):
+            return value
+
+        if numpy is None:
+            raise TypeError('Expected a numpy array, got a {}'.format(type(value).__name__))
+
+        dtype = getattr(cls, 'dtype', None)
+        try:
+            array = numpy.asarray(value, dtype=dtype)
+        except (TypeError, ValueError):
+            raise TypeError('Expected a numpy array, got {!r}'.format(value)) from None
+
+        if not isinstance(array, cls):
+            raise TypeError('Expected a numpy array of {}, got {!r}'.format(dtype.__name__, value))
+
+        return array
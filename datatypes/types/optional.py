@@ -1,7 +1,7 @@
 
 from .type import Type
 from .generics import GenericMeta
-from ..parse import parse
+from ..parse import compile_parser
 
 __all__ = ['Optional']
 
@@ -23,4 +23,4 @@ class Optional(Type, metaclass=OptionalMeta, subtype_names=['subtype']):
         if value is None:
             return value
 
-        return parse(value, cls.subtype)
+        return compile_parser(cls.subtype)(value)
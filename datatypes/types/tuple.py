@@ -0,0 +1,78 @@
+
+import collections.abc
+import typing
+
+from .type import Type
+from .generics import GenericMeta
+from ..parse import compile_parser
+
+__all__ = ['Tuple']
+
+
+def _is_variadic(item_types):
+    return len(item_types) == 2 and item_types[1] is ...
+
+
+class TupleMeta(GenericMeta):
+    def __new__(mcs, name, bases, attrs, subtype_names=['item_types']):
+        return super().__new__(mcs, name, bases, attrs, subtype_names)
+
+    def __init__(cls, name, bases, attrs, subtype_names=['item_types']):
+        super().__init__(name, bases, attrs, subtype_names)
+
+    def __instancecheck__(cls, instance):
+        if not isinstance(instance, cls.python_type):
+            return False
+
+        if not hasattr(cls, 'item_types'):
+            return True
+
+        if _is_variadic(cls.item_types):
+            item_type = cls.item_types[0]
+            return all(isinstance(val, item_type) for val in instance)
+
+        if len(instance) != len(cls.item_types):
+            return False
+
+        return all(isinstance(val, item_type) for val, item_type in zip(instance, cls.item_types))
+
+    def _check_subtypes(cls, subtypes):
+        # like in `typing.Tuple`, an ellipsis turns `Tuple[int, ...]` into a variable-length tuple
+        if _is_variadic(subtypes):
+            subtypes = subtypes[:1]
+
+        super()._check_subtypes(subtypes)
+
+    def _set_subtypes(cls, subcls, subtypes):
+        # the number of subtypes varies, so they're all stored in a single attribute
+        subcls.item_types = subtypes
+
+
+class Tuple(Type, metaclass=TupleMeta):
+    """
+    A tuple with a fixed number of elements (`Tuple[int, str]`), or with any number of elements of
+    the same type (`Tuple[int, ...]`).
+    """
+
+    python_type = tuple
+    typing_type = typing.Tuple
+
+    @classmethod
+    def parse(cls, value):
+        if isinstance(value, str):
+            value = [val.strip() for val in value.split(',')]
+        elif not isinstance(value, collections.abc.Iterable):
+            raise TypeError('Expected an iterable, got a {}'.format(type(value).__name__))
+
+        if not hasattr(cls, 'item_types'):
+            return tuple(value)
+
+        if _is_variadic(cls.item_types):
+            return tuple(map(compile_parser(cls.item_types[0]), value))
+
+        value = tuple(value)
+        if len(value) != len(cls.item_types):
+            raise ValueError('Expected {} elements, got {}'.format(len(cls.item_types), len(value)))
+
+        parsers = [compile_parser(item_type) for item_type in cls.item_types]
+        return tuple(parse_item(val) for parse_item, val in zip(parsers, value))
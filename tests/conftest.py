@@ -3,7 +3,7 @@ def pytest_make_parametrize_id(config, val, argname):
     if getattr(val, '__module__', None) == 'typing':
         return str(val).replace('typing.', '')
 
-    if callable(val):
+    if callable(val) and hasattr(val, '__name__'):
         return val.__name__
 
     if isinstance(val, list):
@@ -0,0 +1,79 @@
+
+import pytest
+
+import asyncio
+import concurrent.futures
+
+from typing import *
+
+from datatypes import is_instance_async
+
+
+def _run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (list(range(100)), List[int], True),
+    (list(range(100)) + ['x'], List[int], False),
+    ({str(i): [i] for i in range(100)}, Dict[str, List[int]], True),
+    ({str(i): [i] for i in range(100)}, Dict[str, List[str]], False),
+    (range(10 ** 12), Sequence[int], True),
+    ((1, 'x'), Tuple[int, str], True),
+    (5, int, True),
+    ('x', List[int], False),
+])
+def test_is_instance_async(value, type_, expected):
+    assert _run(is_instance_async(value, type_, slice_budget=7)) == expected
+
+
+def test_is_instance_async_yields_to_event_loop():
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(None)
+            await asyncio.sleep(0)
+
+    async def check():
+        ticker = asyncio.ensure_future(tick())
+        try:
+            return await is_instance_async(list(range(1000)), List[int], slice_budget=10, slice_time=None)
+        finally:
+            ticker.cancel()
+
+    assert _run(check())
+    assert len(ticks) >= 50
+
+
+@pytest.mark.parametrize('value, type_', [
+    ({str(i): i for i in range(100)}, Dict[str, int]),
+    (set(range(100)), Set[int]),
+])
+def test_is_instance_async_collection_changed_while_checked(value, type_):
+    async def change():
+        await asyncio.sleep(0)
+        value.clear()
+
+    async def check():
+        changer = asyncio.ensure_future(change())
+        result = await is_instance_async(value, type_, slice_budget=10, slice_time=None)
+        await changer
+        return result
+
+    assert _run(check())
+
+
+def test_is_instance_async_offloads_to_executor():
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        coroutine = is_instance_async(list(range(1000)) + ['x'], List[int], executor=executor, offload_threshold=100)
+        assert not _run(coroutine)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {'slice_budget': 0},
+    {'slice_time': 0},
+])
+def test_invalid_slices(kwargs):
+    with pytest.raises(ValueError):
+        _run(is_instance_async([1], List[int], **kwargs))
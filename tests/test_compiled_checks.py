@@ -0,0 +1,103 @@
+
+import pytest
+
+import sys
+from typing import *
+
+from datatypes import compile_checker, is_instance
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (5, int, True),
+    ('5', int, False),
+    ([1, 2], List[int], True),
+    ([1, 'x'], List[int], False),
+    ([{'a': [1]}], List[Dict[str, List[int]]], True),
+    ([{'a': [1.5]}], List[Dict[str, List[int]]], False),
+    (('bar', True), Tuple[str, bool], True),
+    (('bar',), Tuple[str, bool], False),
+    (3, Union[str, int], True),
+    ([3], Union[str, List[int]], True),
+    (None, Optional[int], True),
+    (int, Type[int], True),
+    (5, Type[int], False),
+    (..., 'ellipsis', True),
+])
+def test_compiled_checker(value, type_, expected):
+    check = compile_checker(type_)
+
+    assert check(value) == expected
+    assert is_instance(value, type_) == expected
+
+
+def test_compiled_checker_is_cached():
+    assert compile_checker(List[int]) is compile_checker(List[int])
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason='builtin generics need python 3.9')
+def test_inline_annotations_share_checkers():
+    # `list[int]` creates a new object every time
+    assert compile_checker(list[int]) is compile_checker(list[int])
+    assert compile_checker(dict[str, list[int]]) is compile_checker(dict[str, list[int]])
+
+
+def test_compiled_checker_defers_errors():
+    check = compile_checker('foo')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            check(5)
+
+
+def _nested(value, type_, depth):
+    for _ in range(depth):
+        value = [value]
+        type_ = List[type_]
+    return value, type_
+
+
+def test_deep_nesting():
+    value, type_ = _nested(1, int, 450)
+    assert is_instance(value, type_)
+
+    value, type_ = _nested('x', int, 450)
+    assert not is_instance(value, type_)
+
+
+class _CountingList(list):
+    iterations = 0
+
+    def __iter__(self):
+        type(self).iterations += 1
+        return super().__iter__()
+
+
+Nested = List[Union[int, 'Nested']]
+
+
+def test_shared_objects_are_checked_once():
+    shared = _CountingList([1, 2, 3])
+
+    # only recursive annotations are checked by a traversal that notices shared objects
+    assert is_instance([[shared] * 100, [shared]], Nested, namespace=globals())
+    assert _CountingList.iterations == 1
+
+
+def test_self_reference():
+    value = []
+    value.append(value)
+
+    assert is_instance(value, List[List[List[List[Any]]]])
+    assert is_instance(value, Nested, namespace=globals())
+
+
+@pytest.mark.parametrize('value, expected', [
+    (([[1]], 'a'), True),
+    (([[1]], 5), True),
+    (([['x']], 5), False),
+    (([['x']], 'a'), False),
+])
+def test_ambiguous_union_of_nested_containers(value, expected):
+    type_ = Union[Tuple[List[List[int]], int], Tuple[List[List[int]], str]]
+
+    assert is_instance(value, type_) == expected
@@ -0,0 +1,77 @@
+
+import pytest
+
+import sys
+import typing
+
+from datatypes import is_instance, parse, Gt, Ge, Lt, Le, MinLen, MaxLen, Pattern, Predicate
+
+
+try:
+    Annotated = sys.modules['typing'].Annotated
+except AttributeError:
+    Annotated = pytest.importorskip('typing_extensions').Annotated
+
+
+Port = Annotated[int, Ge(1), Le(65535)]
+Name = Annotated[str, MinLen(1), MaxLen(8), Pattern(r'^[a-z]+$')]
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (80, Port, True),
+    (0, Port, False),
+    (70000, Port, False),
+    ('80', Port, False),
+    (0.5, Annotated[float, Gt(0), Lt(1)], True),
+    (1.0, Annotated[float, Gt(0), Lt(1)], False),
+    (3, Annotated[int, Gt(0), Ge(2), Lt(10)], True),
+    (1, Annotated[int, Gt(0), Ge(2), Lt(10)], False),
+    ('abc', Name, True),
+    ('', Name, False),
+    ('abcdefghi', Name, False),
+    ('ABC', Name, False),
+    (4, Annotated[int, Predicate(lambda n: n % 2 == 0)], True),
+    (3, Annotated[int, Predicate(lambda n: n % 2 == 0)], False),
+    ([80, 443], typing.List[Port], True),
+    ([80, 0], typing.List[Port], False),
+    ({'web': [80]}, typing.Dict[Name, Annotated[typing.List[Port], MinLen(1)]], True),
+    ({'web': []}, typing.Dict[Name, Annotated[typing.List[Port], MinLen(1)]], False),
+    ([1, 2], Annotated[typing.List[int], MaxLen(2)], True),
+    ([1, 2, 3], Annotated[typing.List[int], MaxLen(2)], False),
+    (3, Annotated[typing.List[int], MaxLen(2)], False),
+    (5, Annotated[int, 'not a constraint'], True),
+    (None, Annotated[typing.Optional[int], Ge(0)], False),
+    (1, Annotated[typing.Optional[int], Ge(0)], True),
+    (None, Annotated[typing.Optional[str], Pattern('a')], False),
+    (3, Annotated[int, MinLen(1)], False),
+])
+def test_constraints(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+def test_size_is_checked_before_elements():
+    # checking the elements would raise an error, since the forward reference can't be resolved
+    assert not is_instance([1, 2, 3], Annotated[typing.List['Undefined'], MaxLen(2)])
+
+
+def test_parse_constraints():
+    assert parse('8080', Port) == 8080
+    assert parse('1,2', Annotated[typing.List[Port], MaxLen(2)]) == [1, 2]
+
+    with pytest.raises(ValueError, match='Le'):
+        parse('70000', Port)
+
+    with pytest.raises(ValueError, match='MaxLen'):
+        parse('1,2,3', Annotated[typing.List[Port], MaxLen(2)])
+
+
+def test_parse_inapplicable_constraint():
+    with pytest.raises(ValueError, match='MinLen'):
+        parse('3', Annotated[int, MinLen(1)])
+
+
+def test_constraint_equality():
+    assert Ge(0) == Ge(0)
+    assert Ge(0) != Gt(0)
+    assert hash(MaxLen(3)) == hash(MaxLen(3))
+    assert repr(Pattern('a+')) == "Pattern('a+')"
@@ -0,0 +1,121 @@
+
+import pytest
+
+import pickle
+import typing
+
+import datatypes
+from datatypes import TypedList, TypedDict, FrozenTypedList, is_instance
+
+
+@pytest.mark.parametrize('operation', [
+    lambda lst: lst.append('x'),
+    lambda lst: lst.insert(0, 'x'),
+    lambda lst: lst.extend([3, 'x']),
+    lambda lst: lst.__setitem__(0, 'x'),
+    lambda lst: lst.__setitem__(slice(0, 1), ['x']),
+    lambda lst: lst.__iadd__(['x']),
+])
+def test_typed_list_rejects_wrong_items(operation):
+    lst = TypedList[int]([1, 2])
+
+    with pytest.raises(TypeError):
+        operation(lst)
+
+    assert lst == [1, 2]
+
+
+def test_typed_list_constructor_validates():
+    with pytest.raises(TypeError):
+        TypedList[int]([1, 'x'])
+
+
+@pytest.mark.parametrize('operation', [
+    lambda dct: dct.__setitem__('a', 'x'),
+    lambda dct: dct.__setitem__(1, 1),
+    lambda dct: dct.update(a='x'),
+    lambda dct: dct.setdefault('b'),
+])
+def test_typed_dict_rejects_wrong_items(operation):
+    dct = TypedDict[str, int](a=1)
+
+    with pytest.raises(TypeError):
+        operation(dct)
+
+    assert dct == {'a': 1}
+
+
+def test_frozen_typed_list():
+    lst = FrozenTypedList[str]('abc')
+
+    assert lst == ('a', 'b', 'c')
+    with pytest.raises(TypeError):
+        FrozenTypedList[str]([1])
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (TypedList[int]([1]), typing.List[int], True),
+    (TypedList[bool]([True]), typing.Sequence[int], True),
+    (TypedList[object]([1]), typing.List[int], True),
+    (TypedList[object](['x']), typing.List[int], False),
+    (TypedDict[str, typing.List[int]](a=[1]), typing.Mapping[str, typing.Sequence[int]], True),
+    (FrozenTypedList[int]([1]), typing.Sequence[int], True),
+    (TypedDict[str, int](a=1).keys(), typing.KeysView[str], True),
+    (TypedDict[str, int](a=1).values(), typing.ValuesView[int], True),
+    (TypedDict[str, int](a=1).values(), typing.ValuesView[str], False),
+    (TypedDict[str, int](a=1).items(), typing.ItemsView[str, int], True),
+    (TypedDict[str, int](a=1).items(), typing.ItemsView[str, str], False),
+])
+def test_is_instance(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+def test_views():
+    dct = TypedDict[str, int](a=1, b=2)
+
+    assert list(dct.keys()) == ['a', 'b']
+    assert list(dct.values()) == [1, 2]
+    assert list(dct.items()) == [('a', 1), ('b', 2)]
+    assert 2 in dct.values()
+    assert ('a', 1) in dct.items()
+    assert dct.keys() & {'a'} == {'a'}
+
+
+def test_tag_is_trusted():
+    lst = TypedList[int]([1])
+    list.append(lst, 'x')  # bypasses the validation
+
+    assert is_instance(lst, typing.List[int])
+    assert isinstance(lst, datatypes.List[int])
+
+
+def test_mutable_elements_are_checked():
+    dataclasses = pytest.importorskip('dataclasses')
+
+    @dataclasses.dataclass
+    class Point:
+        x: int
+
+    lists = TypedList[typing.List[int]]([[1]])
+    lists[0].append('x')
+    assert not is_instance(lists, typing.List[typing.List[int]])
+
+    dct = TypedDict[str, typing.List[int]](a=[1])
+    dct['a'].append('x')
+    assert not is_instance(dct, typing.Dict[str, typing.List[int]])
+
+    points = TypedList[Point]([Point(1)])
+    points[0].x = 'bad'
+    assert not is_instance(points, typing.List[Point])
+
+
+@pytest.mark.parametrize('value', [
+    TypedList[int]([1]),
+    TypedDict[str, int](a=1),
+    FrozenTypedList[int]([1]),
+])
+def test_pickling(value):
+    loaded = pickle.loads(pickle.dumps(value))
+
+    assert type(loaded) is type(value)
+    assert loaded == value
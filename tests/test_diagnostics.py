@@ -0,0 +1,68 @@
+
+import pytest
+
+from typing import *
+
+from datatypes import check, Mismatch
+
+
+@pytest.mark.parametrize('value, type_', [
+    (5, int),
+    ({'a': [1, 2]}, Dict[str, List[int]]),
+    ([None, [1]], List[Optional[List[int]]]),
+])
+def test_valid(value, type_):
+    assert check(value, type_) is None
+    assert check(value, type_, collect_all=True) == []
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    ('x', int, Mismatch('', int, str)),
+    ({'a': [1, 2], 'b': [3, 'x']}, Dict[str, List[int]], Mismatch('/b/1', int, str)),
+    ({'a': [1], 5: [2]}, Dict[str, List[int]], Mismatch('/5', str, int, key=True)),
+    ({1: 2}, Dict[str, int], Mismatch('/1', str, int, key=True)),
+    ({'1': '2'}, Dict[str, int], Mismatch('/1', int, str)),
+    ([(1, 'a'), (2, 3)], List[Tuple[int, str]], Mismatch('/1/1', str, int)),
+    ([(1, 'a'), (2,)], List[Tuple[int, str]], Mismatch('/1', Tuple[int, str], tuple)),
+    ([[1], 5.5], List[Optional[List[int]]], Mismatch('/1', Optional[List[int]], float)),
+    ([[1], [2, 'x']], List[Optional[List[int]]], Mismatch('/1/1', int, str)),
+    ({'a/b~c': 'x'}, Dict[str, int], Mismatch('/a~1b~0c', int, str)),
+])
+def test_first_mismatch(value, type_, expected):
+    assert check(value, type_) == expected
+
+
+def test_collect_all():
+    value = {'a': [1, 'x', 2, None], 'b': 'y'}
+    type_ = Dict[str, List[int]]
+
+    assert check(value, type_, collect_all=True) == [
+        Mismatch('/a/1', int, str),
+        Mismatch('/a/3', int, type(None)),
+        Mismatch('/b', List[int], str),
+    ]
+    assert check(value, type_, collect_all=True, max_errors=2) == [
+        Mismatch('/a/1', int, str),
+        Mismatch('/a/3', int, type(None)),
+    ]
+
+
+def test_self_reference():
+    value = ['x']
+    value.append(value)
+
+    assert check(value, List[List[Any]], collect_all=True) == [Mismatch('/0', List[Any], str)]
+
+
+def test_shared_leaves_are_reported_at_every_path():
+    assert check([None, 1, None], List[int], collect_all=True) == [
+        Mismatch('/0', int, type(None)),
+        Mismatch('/2', int, type(None)),
+    ]
+
+
+def test_union_with_fields():
+    class Point(NamedTuple):
+        x: int
+
+    assert check({'y': Point('a')}, Dict[str, Optional[Point]]) == Mismatch('/y/x', int, str)
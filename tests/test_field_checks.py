@@ -0,0 +1,132 @@
+
+import pytest
+
+import sys
+import typing
+from typing import *
+
+from datatypes import is_instance, check, Mismatch
+
+
+def _typing_extension(name):
+    if hasattr(typing, name):
+        return getattr(typing, name)
+
+    return getattr(pytest.importorskip('typing_extensions'), name)
+
+
+class Point(NamedTuple):
+    x: int
+    y: int = 0
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (Point(1, 2), Point, True),
+    (Point(1, 'x'), Point, False),
+    ((1, 2), Point, False),
+    ([Point(1, 2), Point(3)], List[Point], True),
+    ([Point(1, 2), Point(3, 4.5)], List[Point], False),
+])
+def test_named_tuple(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+def test_typed_dict():
+    TypedDict = _typing_extension('TypedDict')
+
+    class Movie(TypedDict):
+        title: str
+        tags: 'List[str]'
+
+    class RatedMovie(Movie, total=False):
+        rating: int
+
+    assert is_instance({'title': 'x', 'tags': []}, Movie)
+    assert is_instance({'title': 'x', 'tags': [], 'year': 1999}, Movie)
+    assert not is_instance({'title': 'x'}, Movie)
+    assert not is_instance({'title': 'x', 'tags': [1]}, Movie)
+    assert not is_instance([('title', 'x')], Movie)
+
+    assert is_instance({'title': 'x', 'tags': []}, RatedMovie)
+    assert is_instance({'title': 'x', 'tags': [], 'rating': 5}, RatedMovie)
+    assert not is_instance({'title': 'x', 'tags': [], 'rating': '5'}, RatedMovie)
+    assert not is_instance({'tags': [], 'rating': 5}, RatedMovie)
+
+
+def test_dataclass():
+    dataclasses = pytest.importorskip('dataclasses')
+
+    @dataclasses.dataclass
+    class Node:
+        value: int
+        next: Optional['Node'] = None
+        label: ClassVar[str] = 'node'
+
+    assert is_instance(Node(1, Node(2)), Node)
+    assert not is_instance(Node(1, Node('x')), Node)
+    assert not is_instance(Node(1, 'x'), Node)
+    assert check(Node(1, Node(2, Node('x'))), Node) == Mismatch('/next/next/value', int, str)
+
+
+def _nest(depth, make_parent, leaf):
+    value = leaf
+    for _ in range(depth):
+        value = make_parent(value)
+    return value
+
+
+def test_deep_recursive_typed_dict():
+    TypedDict = _typing_extension('TypedDict')
+
+    class Tree(TypedDict):
+        name: str
+        children: List['Tree']
+
+    depth = sys.getrecursionlimit() * 2
+    assert is_instance(_nest(depth, lambda child: {'name': 'x', 'children': [child]}, {'name': 'x', 'children': []}),
+                       Tree)
+    assert not is_instance(_nest(depth, lambda child: {'name': 'x', 'children': [child]}, {'name': 'x'}), Tree)
+
+
+def test_deep_recursive_dataclass():
+    dataclasses = pytest.importorskip('dataclasses')
+
+    @dataclasses.dataclass
+    class Node:
+        value: int
+        next: Optional['Node'] = None
+
+    depth = sys.getrecursionlimit() * 2
+    assert is_instance(_nest(depth, lambda child: Node(1, child), None), Optional[Node])
+    assert not is_instance(_nest(depth, lambda child: Node(1, child), Node('x')), Node)
+
+
+def test_unresolvable_field_annotation():
+    dataclasses = pytest.importorskip('dataclasses')
+
+    @dataclasses.dataclass
+    class Broken:
+        value: 'Undefined'
+
+    with pytest.raises(ValueError):
+        is_instance(Broken(1), Broken)
+
+
+def test_field_mismatch():
+    assert check(Point(1, 'x'), Point) == Mismatch('/y', int, str)
+    assert check([Point(1, 2), Point(3, 4.5)], List[Point]) == Mismatch('/1/y', int, float)
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1, True),
+    ('a', True),
+    (None, True),
+    (True, False),
+    (1.0, False),
+    (2, False),
+    ([1], False),
+])
+def test_literal(value, expected):
+    Literal = _typing_extension('Literal')
+
+    assert is_instance(value, Literal[1, 'a', Literal[None]]) == expected
@@ -0,0 +1,82 @@
+
+import pytest
+
+import sys
+from typing import *
+
+from datatypes import is_instance, compile_checker, check, resolve_forward_refs, Mismatch
+
+
+Tree = Dict[str, Union[int, 'Tree']]
+Json = Union[None, bool, int, float, str, List['Json'], Dict[str, 'Json']]
+Point = Tuple['int', 'int']
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    ({'a': {'b': 1}}, Tree, True),
+    ({'a': {'b': 'x'}}, Tree, False),
+    ([1, {'a': [None, 'x']}], Json, True),
+    ([1, {'a': [None, object()]}], Json, False),
+    ((1, 2), Point, True),
+    ((1, '2'), Point, False),
+    ([(1, 2)], 'List[Point]', True),
+    ({'a': {}}, 'Tree', True),
+])
+def test_forward_refs(value, type_, expected):
+    assert is_instance(value, type_, namespace=globals()) == expected
+    assert compile_checker(type_, namespace=globals())(value) == expected
+
+
+def test_resolution_is_cached():
+    assert resolve_forward_refs(Tree, globals()) is resolve_forward_refs(Tree, globals())
+    assert resolve_forward_refs(int, globals()) is int
+
+
+def test_deep_recursive_object():
+    value = 1
+    for _ in range(sys.getrecursionlimit() * 2):
+        value = [value]
+
+    assert is_instance(value, Json, namespace=globals())
+    assert not is_instance([value, object()], Json, namespace=globals())
+
+
+def test_forward_ref_mismatch():
+    expected = resolve_forward_refs(Union[int, 'Tree'], globals())
+    assert check({'a': {'b': 'x'}}, resolve_forward_refs(Tree, globals())) == Mismatch('/a/b', expected, str)
+
+
+Number = 'float'
+
+
+def test_forward_ref_leaf_mismatch():
+    assert check([1.5, 'x'], resolve_forward_refs(List['Number'], globals())) == Mismatch('/1', float, str)
+
+
+def test_deep_mismatch():
+    value = object()
+    for _ in range(4000):
+        value = [value]
+
+    type_ = resolve_forward_refs(Json, globals())
+    assert check(value, type_) == Mismatch('/0' * 4000, type_, object)
+
+
+@pytest.mark.parametrize('type_', ['Undefined', List['Undefined']])
+def test_unresolvable_forward_ref(type_):
+    with pytest.raises(ValueError):
+        is_instance([1], type_, namespace=globals())
+
+
+def test_forward_ref_without_namespace():
+    with pytest.raises(ValueError):
+        is_instance({'a': {}}, Tree)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason='type aliases were added in python 3.12')
+def test_type_alias():
+    namespace = {}
+    exec('type Tree = dict[str, int | Tree]', namespace)
+
+    assert is_instance({'a': {'b': 1}}, namespace['Tree'])
+    assert not is_instance({'a': {'b': 'x'}}, namespace['Tree'])
@@ -1,9 +1,17 @@
 
 import pytest
 
+import abc
+import array
+import itertools
+import inspect
+import sys
+import weakref
+
 from typing import *
 
-from datatypes import is_instance
+from datatypes import is_instance, is_instance_many, register_element_type, type_checks
+from datatypes.type_checks import _UnionIndex, _UNION_REORDER_INTERVAL
 
 
 def test_basic_type():
@@ -42,6 +50,20 @@ def test_nested_generics():
     assert is_instance(([1.5], 'bar'), Tuple[List[float], str])
 
 
+@pytest.mark.parametrize('value, type_, expected', [
+    ((), Tuple[int, ...], True),
+    ((1, 2, 3), Tuple[int, ...], True),
+    ((1, 'x', 3), Tuple[int, ...], False),
+    ([1, 2], Tuple[int, ...], False),
+    (((1,), (2, 3)), Tuple[Tuple[int, ...], ...], True),
+    (((1,), (2, 'x')), Tuple[Tuple[int, ...], ...], False),
+    ((), Tuple[()], True),
+    ((1,), Tuple[()], False),
+])
+def test_variadic_tuple(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
 def test_any():
     assert is_instance(5, Any)
 
@@ -50,6 +72,34 @@ def test_ellipsis():
     assert is_instance(..., 'ellipsis')
 
 
+# these annotations are only valid syntax in newer python versions, so they're evaluated lazily
+@pytest.mark.skipif(sys.version_info < (3, 10), reason='builtin generics and `X | Y` require python 3.10')
+@pytest.mark.parametrize('value, annotation, expected', [
+    ([1, 2], 'list[int]', True),
+    ([1, 'x'], 'list[int]', False),
+    ({'a': [1]}, 'dict[str, list[int]]', True),
+    ({'a': [1, 'x']}, 'dict[str, list[int]]', False),
+    ((1, 2), 'tuple[int, ...]', True),
+    (None, 'int | None', True),
+    ('x', 'int | None', False),
+    ([[1], None], 'list[list[int] | None]', True),
+    (bool, 'type[int]', True),
+])
+def test_builtin_generics(value, annotation, expected):
+    assert is_instance(value, eval(annotation)) == expected
+
+
+def test_annotated():
+    try:
+        Annotated = sys.modules['typing'].Annotated
+    except AttributeError:
+        Annotated = pytest.importorskip('typing_extensions').Annotated
+
+    assert is_instance(5, Annotated[int, 'meta'])
+    assert not is_instance('5', Annotated[int, 'meta'])
+    assert is_instance([1], Annotated[List[int], 'meta'])
+
+
 if 'Type' in globals():  # for some reason Type doesn't exist in 3.5.0 even though it's documented
     @pytest.mark.parametrize('value, type_, expected', [
         (int, Type, True),
@@ -70,6 +120,54 @@ def test_union(value, type_, expected):
     assert is_instance(value, type_) == expected
 
 
+_MESSAGE_CLASSES = [type('Message{}'.format(i), (), {}) for i in range(10)]
+_Message = Union[tuple(_MESSAGE_CLASSES)]
+
+
+class _MessageProxy:
+    # pretends to be a message, which `isinstance` believes
+    __class__ = _MESSAGE_CLASSES[-1]
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (_MESSAGE_CLASSES[7](), _Message, True),
+    (type('Sub', (_MESSAGE_CLASSES[3],), {})(), _Message, True),
+    (_MessageProxy(), _Message, True),
+    (1, _Message, False),
+    (None, Optional[Hashable], True),
+    ([], Optional[Hashable], False),
+    ([1], Union[List[str], List[int], int], True),
+    ([1], Union[List[str], Set[int], int], False),
+    (_MessageProxy(), Union[List[int], _MESSAGE_CLASSES[-1]], True),
+])
+def test_large_union(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+def test_union_adapts_to_hits():
+    index = _UnionIndex([List[str], List[bytes], List[int], int])
+    assert index.lookup(bool) is True
+    assert index.lookup(list) == (0, 1, 2)
+
+    for _ in range(_UNION_REORDER_INTERVAL):
+        index.record_hit(2)
+
+    assert index.lookup(list) == (2, 0, 1)
+
+
+def test_union_sees_abc_registration():
+    abcs = [type('ABC{}'.format(i), (abc.ABC,), {}) for i in range(5)]
+    union = Union[tuple(abcs)]
+
+    class Registered:
+        pass
+
+    assert not is_instance(Registered(), union)
+
+    abcs[4].register(Registered)
+    assert is_instance(Registered(), union)
+
+
 @pytest.mark.parametrize('value, type_, expected', [
     (3.5, SupportsInt, True),
     ('foo', Hashable, True),
@@ -128,6 +226,69 @@ def test_unannotated_callable(value, type_):
         is_instance(value, type_)
 
 
+def test_unannotated_callable_error_is_cached():
+    def func(i):
+        pass
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            is_instance(func, Callable[[int], None])
+
+
+def test_callable_cache_sees_changed_annotations():
+    def func(i: int) -> float:
+        pass
+
+    assert is_instance(func, Callable[[int], float])
+
+    func.__annotations__['return'] = str
+    assert not is_instance(func, Callable[[int], float])
+
+    func.__annotations__ = {'i': int, 'return': float}
+    assert is_instance(func, Callable[[int], float])
+
+
+def test_callable_cache_sees_changed_defaults():
+    def func(i: int, j: int = 0) -> float:
+        pass
+
+    assert is_instance(func, Callable[[int], float])
+
+    func.__defaults__ = None
+    assert not is_instance(func, Callable[[int], float])
+
+
+def test_callable_cache_sees_signature():
+    def func(i: int) -> float:
+        pass
+
+    assert is_instance(func, Callable[[int], float])
+
+    func.__signature__ = inspect.signature(int_str__float)
+    assert not is_instance(func, Callable[[int], float])
+
+
+def test_callable_closures_share_code():
+    def make_func(type_):
+        def func(i: type_) -> float:
+            pass
+        return func
+
+    assert is_instance(make_func(int), Callable[[int], float])
+    assert not is_instance(make_func(str), Callable[[int], float])
+    assert is_instance(make_func(int), Callable[[int], float])
+
+
+def test_callable_instance():
+    class Handler:
+        def __call__(self, i: int) -> float:
+            pass
+
+    assert is_instance(Handler(), Callable[[int], float])
+    assert is_instance(Handler().__call__, Callable[[int], float])
+    assert not is_instance(Handler(), Callable[[str], float])
+
+
 T = TypeVar('T')
 
 def t__t(x: T) -> T:
@@ -185,3 +346,310 @@ def test_bounded_typevar(value, bound, expected):
     var = TypeVar('T', bound=bound)
 
     assert is_instance(value, var) == expected
+
+
+def int__list_int(x: int) -> List[int]:
+    pass
+
+def t__list_t(x: T) -> List[T]:
+    pass
+
+def str__list_int(x: str) -> List[int]:
+    pass
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (1, T, True),
+    ([1, True, 2], List[T], True),
+    ([1, 'x'], List[T], False),
+    ([], List[T], True),
+    ({'a': [1], 'b': [2]}, Dict[str, List[T]], True),
+    ({'a': [1], 'b': ['x']}, Dict[str, List[T]], False),
+    ((1, 2), Tuple[T, T], True),
+    ((1, 'x'), Tuple[T, T], False),
+    (([1], 'x'), Tuple[Union[List[T], int], T], False),
+    (['a', 'b'], List[AnyStr], True),
+    (['a', b'b'], List[AnyStr], False),
+    (int__list_int, Callable[[T], List[T]], True),
+    (t__list_t, Callable[[T], List[T]], True),
+    (str__list_int, Callable[[T], List[T]], False),
+    ((int__list_int, 1), Tuple[Callable[[T], List[T]], T], True),
+    ((int__list_int, 'x'), Tuple[Callable[[T], List[T]], T], False),
+])
+def test_typevar_bindings(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+@pytest.mark.parametrize('elements', list(itertools.permutations([1, 'x', object()])))
+def test_typevar_binding_does_not_depend_on_order(elements):
+    assert not is_instance(list(elements), List[T])
+    assert is_instance(list(elements), List[Union[T, int, str]])
+
+
+def test_typevar_solution_is_cached(monkeypatch):
+    calls = []
+    solve = type_checks._solve_callable
+    monkeypatch.setattr(type_checks, '_solve_callable', lambda *args: calls.append(args) or solve(*args))
+
+    def func(x: int) -> List[int]:
+        pass
+
+    for _ in range(3):
+        assert is_instance(func, Callable[[T], List[T]])
+
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (b'abc', Sequence[int], True),
+    (b'abc', Sequence[str], False),
+    (b'', Sequence[str], True),
+    (bytearray(b'abc'), MutableSequence[int], True),
+    (array.array('d', [1.5]), Iterable[float], True),
+    (array.array('i', [1]), Iterable[float], False),
+    (memoryview(b'abc'), Sequence[int], True),
+    (memoryview(b'abc').cast('c'), Sequence[bytes], True),
+])
+def test_buffer(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (range(10**18), Sequence[int], True),
+    (range(2), Sequence[bool], False),
+    (range(0), Sequence[bool], True),
+    ('abc', Sequence[str], True),
+    ('abc', Iterable[int], False),
+    ([range(10**18)], List[Iterable[int]], True),
+])
+def test_known_element_type(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+def test_register_element_type():
+    class Digits(list):
+        pass
+
+    register_element_type(Digits, lambda digits: int)
+
+    # the registered shortcut is trusted, so the elements aren't looked at
+    assert is_instance(Digits(['x']), List[int])
+    assert not is_instance(Digits(['x']), List[bytes])
+
+
+class _IntProxy:
+    # pretends to be an int, which `isinstance` believes
+    __class__ = int
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (list(range(100)), List[Union[str, int]], True),
+    (list(range(100)) + ['x'], List[Union[float, int]], False),
+    (list(range(100)) + [_IntProxy()], List[Union[float, int]], True),
+    (set(range(100)), AbstractSet[Hashable], True),
+    ({str(i): i for i in range(100)}, Dict[str, Union[int, float]], True),
+    (dict.fromkeys(range(100), 'x'), Dict[Union[int, float], List[int]], False),
+    ({i: [i] for i in range(100)}, Dict[Union[int, float], List[int]], True),
+    ({i: i for i in range(100)}.items(), ItemsView[Union[int, float], Hashable], True),
+    ({i: [i] for i in range(100)}.items(), ItemsView[Union[int, float], Hashable], False),
+])
+def test_large_collection(value, type_, expected):
+    assert is_instance(value, type_) == expected
+
+
+def test_numpy_array():
+    numpy = pytest.importorskip('numpy')
+
+    assert is_instance(numpy.arange(3.0), Iterable[float])
+    assert not is_instance(numpy.arange(3), Iterable[int])
+    assert not is_instance(numpy.array([1, 'x'], dtype=object), Iterable[int])
+
+
+class _FakeDType:
+    def __init__(self, kind, type_):
+        self.kind = kind
+        self.type = type_
+
+
+class _FakeArray:
+    # looks like a numpy array to duck typing, and counts how often it's iterated over
+    __array_interface__ = {}
+    dtype = None
+    ndim = 1
+    shape = ()
+
+    def __init__(self, elements, dtype, ndim=1):
+        self.elements = elements
+        self.dtype = dtype
+        self.ndim = ndim
+        self.shape = (len(elements),)
+        self.iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        return iter(self.elements)
+
+    def __getitem__(self, index):
+        return self.elements[index]
+
+    def __len__(self):
+        return len(self.elements)
+
+
+class _ReversedFakeArray(_FakeArray):
+    # changes how the elements are accessed, so the dtype doesn't describe them
+    def __iter__(self):
+        self.iterations += 1
+        return reversed(self.elements)
+
+
+@pytest.mark.parametrize('array, expected, scanned', [
+    (_FakeArray([1, 2], _FakeDType('i', int)), True, False),
+    (_FakeArray([1.5], _FakeDType('f', float)), False, True),
+    (_FakeArray([1, 'x'], _FakeDType('O', object)), False, True),
+    (_FakeArray([[1]], _FakeDType('i', int), ndim=2), False, True),
+    (_ReversedFakeArray([1, 2], _FakeDType('i', int)), True, True),
+    (_ReversedFakeArray([1, 'x'], _FakeDType('i', int)), False, True),
+])
+def test_duck_typed_array(array, expected, scanned):
+    assert is_instance(array, Iterable[int]) == expected
+    assert (array.iterations > 0) == scanned
+
+
+@pytest.mark.parametrize('objects, type_', [
+    ([1, 'x', True, None], int),
+    ((1, 2, 3), int),
+    ([1, 2.5, 'x'], Union[int, str]),
+    ([[1], ['x'], []], List[int]),
+    ([{'a': 1}, {'a': 'b'}], Dict[str, int]),
+    ([], Any),
+])
+def test_is_instance_many(objects, type_):
+    expected = [is_instance(obj, type_) for obj in objects]
+
+    assert is_instance_many(objects, type_) == all(expected)
+    assert is_instance_many(iter(objects), type_) == all(expected)
+    assert is_instance_many(objects, type_, mode='mask') == bytearray(expected)
+    assert is_instance_many(objects, type_, mode='first_failure') == next(
+        (i for i, ok in enumerate(expected) if not ok), None)
+
+
+def test_is_instance_many_invalid_mode():
+    with pytest.raises(ValueError):
+        is_instance_many([], int, mode='any')
+
+
+class _NoInt:
+    pass
+
+
+class _MaybeInt:
+    def __init__(self, has_int):
+        self.has_int = has_int
+
+    @property
+    def __int__(self):
+        if not self.has_int:
+            raise AttributeError('__int__')
+        return lambda: 1
+
+
+def test_protocol_verdicts_are_cached_per_class():
+    assert is_instance(3.5, SupportsInt)
+    assert is_instance(7.5, SupportsInt)
+    assert not is_instance(_NoInt(), SupportsInt)
+    assert not is_instance(_NoInt(), SupportsInt)
+
+
+def test_protocol_instance_dict_overrides_cache():
+    with_int = _NoInt()
+    with_int.__int__ = lambda: 1
+
+    assert not is_instance(_NoInt(), SupportsInt)
+    assert is_instance(with_int, SupportsInt)
+    assert not is_instance(_NoInt(), SupportsInt)
+
+
+@pytest.mark.parametrize('base', [False, True])
+def test_protocol_verdict_follows_class_changes(base):
+    class NoInt:
+        pass
+
+    class Sub(NoInt):
+        pass
+
+    cls = Sub if base else NoInt
+    assert not is_instance(cls(), SupportsInt)
+
+    NoInt.__int__ = lambda self: 1
+    assert is_instance(cls(), SupportsInt)
+
+    del NoInt.__int__
+    assert not is_instance(cls(), SupportsInt)
+
+
+def test_protocol_with_data_descriptor():
+    assert is_instance(_MaybeInt(True), SupportsInt)
+    assert not is_instance(_MaybeInt(False), SupportsInt)
+    assert is_instance(_MaybeInt(True), SupportsInt)
+
+
+def test_protocol_class_as_value():
+    assert is_instance(float, SupportsInt)
+    assert not is_instance(_NoInt, SupportsInt)
+
+
+def test_protocol_with_proxy():
+    class Int:
+        def __int__(self):
+            return 1
+
+    with_int, without_int = Int(), _NoInt()
+
+    assert is_instance(weakref.proxy(with_int), SupportsInt)
+    assert not is_instance(weakref.proxy(without_int), SupportsInt)
+
+
+def _protocol_base():
+    import typing
+
+    if hasattr(typing, 'Protocol'):
+        return typing.Protocol, typing.runtime_checkable
+
+    typing_extensions = pytest.importorskip('typing_extensions')
+    return typing_extensions.Protocol, typing_extensions.runtime_checkable
+
+
+class _Closeable:
+    name = 'file'
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('runtime_checkable', [False, True])
+def test_user_defined_protocol(runtime_checkable):
+    Protocol, make_runtime_checkable = _protocol_base()
+
+    class Closeable(Protocol):
+        name: str
+
+        def close(self) -> None:
+            ...
+
+    if runtime_checkable:
+        Closeable = make_runtime_checkable(Closeable)
+
+    without_name = _NoInt()
+    without_name.close = lambda: None
+
+    assert is_instance(_Closeable(), Closeable)
+    assert is_instance([_Closeable()], List[Closeable])
+    assert not is_instance(_NoInt(), Closeable)
+    assert not is_instance(without_name, Closeable)
+
+    with_close = _NoInt()
+    with_close.close = lambda: None
+    with_close.name = 'x'
+    assert is_instance(with_close, Closeable)
+    assert not is_instance(_NoInt(), Closeable)
@@ -0,0 +1,73 @@
+
+import pytest
+
+from typing import *
+
+from datatypes import is_instance, Memo, Sampling
+from datatypes.memo import is_deeply_immutable
+
+
+@pytest.mark.parametrize('value, expected', [
+    (1, True),
+    ('x', True),
+    (None, True),
+    ((1, ('x', b'y'), frozenset({2.5, (None,)})), True),
+    ((1, [2]), False),
+    (frozenset({(1, object())}), False),
+    ([], False),
+    (type('Point', (tuple,), {})(), False),
+])
+def test_is_deeply_immutable(value, expected):
+    assert is_deeply_immutable(value) == expected
+
+
+def test_memo_hits():
+    memo = Memo()
+    value = tuple(range(100))
+
+    assert is_instance(value, Tuple[int, ...], memo=memo)
+    assert is_instance(value, Tuple[int, ...], memo=memo)
+    assert not is_instance(value, Tuple[str, ...], memo=memo)
+    assert not is_instance(value, Tuple[str, ...], memo=memo)
+
+    assert (memo.hits, memo.misses, memo.evictions) == (2, 2, 0)
+    assert len(memo) == 2
+
+
+def test_memo_ignores_mutable_objects():
+    memo = Memo()
+    value = (1, [2])
+
+    assert is_instance(value, Tuple[int, List[int]], memo=memo)
+    value[1].append('x')
+    assert not is_instance(value, Tuple[int, List[int]], memo=memo)
+
+    assert not is_instance([1], List[str], memo=memo)
+    assert len(memo) == 0
+    assert memo.hits == 0
+
+
+def test_memo_evicts_least_recently_used():
+    memo = Memo(maxsize=2)
+    a, b, c = (1,), (2,), (3,)
+
+    for value in [a, b, a, c]:
+        is_instance(value, Tuple[int], memo=memo)
+
+    assert memo.evictions == 1
+    assert memo.lookup(a, Tuple[int]) is True
+    assert memo.lookup(b, Tuple[int]) is None
+
+
+def test_memo_clear():
+    memo = Memo()
+    is_instance((1,), Tuple[int], memo=memo)
+    memo.clear()
+
+    assert len(memo) == 0
+    assert (memo.hits, memo.misses, memo.evictions) == (0, 0, 0)
+
+
+def test_memo_with_sampling():
+    with pytest.raises(ValueError):
+        is_instance((1,), Tuple[int], sampling=Sampling(), memo=Memo())
@@ -0,0 +1,124 @@
+
+import pytest
+
+import concurrent.futures
+import os
+
+from typing import *
+
+from datatypes import is_instance, compile_checker, Parallel, Sampling, TypedList
+
+
+class _CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.fixture
+def parallel():
+    with _CountingExecutor() as executor:
+        yield Parallel(threshold=10, chunk_size=10, executor=executor, max_workers=2)
+
+
+@pytest.mark.parametrize('value, type_, expected', [
+    (list(range(100)), List[int], True),
+    (list(range(100)) + ['x'], List[int], False),
+    (tuple(range(100)), Sequence[int], True),
+    (set(range(100)), Set[int], True),
+    ({str(i): i for i in range(100)}, Dict[str, int], True),
+    (dict({str(i): i for i in range(100)}, x='y'), Dict[str, int], False),
+    ({str(i): [i] for i in range(100)}, Dict[str, List[int]], True),
+    ([[i] for i in range(100)], List[List[int]], True),
+    ([1, 2], List[int], True),
+    ('x', List[int], False),
+])
+def test_parallel(parallel, value, type_, expected):
+    assert is_instance(value, type_, parallel=parallel) == expected
+    assert compile_checker(type_, parallel=parallel)(value) == expected
+
+
+def test_small_collections_are_checked_serially(parallel):
+    assert is_instance(list(range(9)), List[int], parallel=parallel)
+    assert parallel.executor.submitted == 0
+
+
+def test_failure_cancels_remaining_chunks(parallel):
+    values = ['x'] + list(range(999))
+
+    assert not is_instance(values, List[int], parallel=parallel)
+    assert parallel.executor.submitted < 100
+
+
+def test_typed_containers_arent_split(parallel):
+    assert is_instance(TypedList[int](range(100)), List[int], parallel=parallel)
+    assert parallel.executor.submitted == 0
+
+
+def test_process_pool():
+    parallel = Parallel(threshold=10, use_processes=True, max_workers=2)
+
+    assert is_instance(list(range(1000)), List[int], parallel=parallel)
+    assert not is_instance(list(range(1000)) + [None], List[int], parallel=parallel)
+
+
+@pytest.mark.parametrize('values, type_', [
+    ([lambda: 1] * 100, List[Callable]),
+    (list(range(100)) + [lambda: 1], List[int]),
+], ids=['all', 'last'])
+def test_process_pool_with_unpicklable_chunks(values, type_):
+    parallel = Parallel(threshold=10, use_processes=True, max_workers=2)
+
+    assert is_instance(values, type_, parallel=parallel) == is_instance(values, type_)
+    assert is_instance(list(range(1000)), List[int], parallel=parallel)
+
+
+def test_process_pool_with_classes_unknown_to_workers():
+    parallel = Parallel(threshold=10, use_processes=True, max_workers=2)
+
+    # starts the workers, which then don't know the class defined below
+    assert is_instance(list(range(1000)), List[int], parallel=parallel)
+
+    cls = type('_DefinedLater', (), {'__module__': __name__})
+    globals()['_DefinedLater'] = cls
+    try:
+        assert is_instance([cls() for _ in range(100)], List[cls], parallel=parallel)
+    finally:
+        del globals()['_DefinedLater']
+
+    assert is_instance(list(range(1000)), List[int], parallel=parallel)
+
+
+_PARENT_PID = os.getpid()
+
+
+class _ExitInWorkers(type):
+    def __instancecheck__(cls, obj):
+        if os.getpid() != _PARENT_PID:
+            os._exit(1)
+        return True
+
+    def __subclasscheck__(cls, subclass):
+        return cls.__instancecheck__(None)
+
+
+class _KillsWorkers(metaclass=_ExitInWorkers):
+    pass
+
+
+def test_process_pool_is_replaced_when_broken():
+    parallel = Parallel(threshold=10, use_processes=True, max_workers=2)
+
+    assert is_instance(list(range(100)), List[_KillsWorkers], parallel=parallel)
+
+    assert is_instance(list(range(1000)), List[int], parallel=parallel)
+    assert not is_instance(list(range(1000)) + [None], List[int], parallel=parallel)
+
+
+def test_sampling_cant_be_parallelized(parallel):
+    with pytest.raises(ValueError):
+        is_instance([], List[int], sampling=Sampling(), parallel=parallel)
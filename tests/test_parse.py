@@ -2,6 +2,7 @@
 import pytest
 
 import re
+import sys
 import typing
 
 from datatypes import *
@@ -16,7 +17,37 @@ from datatypes import *
     ('1,6,3', typing.Set, {'1', '3', '6'}),
     ('1,6,3', typing.Set[int], {1, 3, 6}),
     (r'(bar)\1foo$', RegexPattern, re.compile(r'(bar)\1foo$')),
+    ('1,2,3', typing.Tuple[int, ...], (1, 2, 3)),
+    ('1,x', typing.Tuple[int, str], (1, 'x')),
 ])
 def test_parse(value_to_parse, cls, expected_result):
     result = parse(value_to_parse, cls)
     assert result == expected_result
+
+
+def test_parse_tuple_wrong_length():
+    with pytest.raises(ValueError):
+        parse('1,2,3', typing.Tuple[int, int])
+
+
+@pytest.mark.parametrize('value_to_parse, cls', [
+    ('1,2,3', typing.List[int]),
+    ('1.5=3 0=5', typing.Dict[float, int]),
+    ('1,x', typing.Tuple[int, str]),
+    ('1,6,3', typing.Set[int]),
+    ('true', bool),
+])
+def test_compile_parser(value_to_parse, cls):
+    parse_value = compile_parser(cls)
+
+    assert compile_parser(cls) is parse_value
+    assert parse_value(value_to_parse) == parse(value_to_parse, cls)
+
+
+def test_parse_unqualified_dict():
+    assert parse('a=1 b=2', Dict) == {'a': '1', 'b': '2'}
+
+
+@pytest.mark.skipif(sys.version_info < (3, 9), reason='builtin generics need python 3.9')
+def test_compiled_parser_of_inline_annotation_is_cached():
+    assert compile_parser(list[int]) is compile_parser(list[int])
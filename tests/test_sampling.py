@@ -0,0 +1,56 @@
+
+import pytest
+
+from typing import *
+
+from datatypes import is_instance, Sampling, Verdict
+
+
+def test_small_collection_is_checked_completely():
+    verdict = is_instance([1, 2, 3], List[int], sampling=Sampling())
+
+    assert verdict == Verdict(True, sampled=False)
+
+
+def test_large_collection_is_sampled():
+    verdict = is_instance(list(range(100000)), List[int], sampling=Sampling())
+
+    assert verdict == Verdict(True, sampled=True)
+
+
+@pytest.mark.parametrize('index', [0, 5, -1, -3])
+def test_head_and_tail_are_always_checked(index):
+    values = list(range(1000))
+    values[index] = 'x'
+
+    verdict = is_instance(values, List[int], sampling=Sampling(head=10, tail=10, samples=0))
+
+    assert verdict == Verdict(False, sampled=False)
+
+
+def test_sampling_is_reproducible():
+    values = list(range(1000))
+    values[500:600] = ['x'] * 100
+    sampling = Sampling(head=0, tail=0, samples=5, seed=3)
+
+    assert bool(is_instance(values, List[int], sampling=sampling)) == bool(is_instance(values, List[int], sampling=sampling))
+
+
+def test_budget_applies_to_nested_collections():
+    values = [[1, 2, 3], [4, 5, 6], [7, 'x']]
+
+    assert not is_instance(values, List[List[int]], sampling=Sampling())
+    assert is_instance(values, List[List[int]], sampling=Sampling(budget=6)) == Verdict(True, sampled=True)
+
+
+def test_sampled_mapping():
+    values = {str(i): i for i in range(1000)}
+
+    assert is_instance(values, Dict[str, int], sampling=Sampling()) == Verdict(True, sampled=True)
+    assert not is_instance(values, Dict[str, str], sampling=Sampling())
+
+
+def test_sampled_iterator():
+    verdict = is_instance(iter(range(1000)), Iterable[int], sampling=Sampling(head=5, tail=0, samples=0))
+
+    assert verdict == Verdict(True, sampled=True)
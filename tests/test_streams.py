@@ -0,0 +1,174 @@
+
+import pytest
+
+import asyncio
+
+from typing import *
+
+from datatypes import is_instance, validate_stream, validate_async_stream, Sampling
+
+
+def test_elements_are_checked_lazily():
+    consumed = []
+
+    def produce():
+        for value in [1, 2, 'x', 4]:
+            consumed.append(value)
+            yield value
+
+    stream = validate_stream(produce(), Iterator[int])
+
+    assert next(stream) == 1
+    assert consumed == [1]
+    assert next(stream) == 2
+    with pytest.raises(TypeError):
+        next(stream)
+    assert consumed == [1, 2, 'x']
+
+
+@pytest.mark.parametrize('values, type_', [
+    ([[1], [2, 3]], Iterable[List[int]]),
+    ([{'a': 1}], Iterable[Dict[str, int]]),
+    ([1, 'x'], Iterable),
+    ([1, None], Iterable[Optional[int]]),
+])
+def test_valid_stream(values, type_):
+    assert list(validate_stream(values, type_)) == values
+
+
+@pytest.mark.parametrize('values, type_', [
+    ([[1], ['x']], Iterable[List[int]]),
+    ([{'a': 'b'}], Iterable[Dict[str, int]]),
+])
+def test_invalid_stream(values, type_):
+    with pytest.raises(TypeError):
+        list(validate_stream(values, type_))
+
+
+def test_wrong_stream_type():
+    with pytest.raises(TypeError):
+        validate_stream([1, 2], Iterator[int])
+
+
+def test_unsupported_annotation():
+    with pytest.raises(NotImplementedError):
+        validate_stream([1, 2], List[int])
+
+
+def test_generator():
+    def produce():
+        total = 0
+        while total < 10:
+            total += yield total
+        return str(total)
+
+    stream = validate_stream(produce(), Generator[int, int, str])
+
+    assert next(stream) == 0
+    assert stream.send(4) == 4
+    with pytest.raises(StopIteration) as exc_info:
+        stream.send(7)
+    assert exc_info.value.value == '11'
+
+
+def test_generator_return_value_is_checked():
+    def produce():
+        yield 1
+        return 2
+
+    with pytest.raises(TypeError):
+        list(validate_stream(produce(), Generator[int, None, str]))
+
+
+async def _produce(queue, values):
+    for value in values:
+        await queue.put(value)
+    await queue.put(None)
+
+
+class _QueueStream:
+    def __init__(self, queue):
+        self.queue = queue
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        value = await self.queue.get()
+        if value is None:
+            raise StopAsyncIteration
+        return value
+
+
+def _consume(values, type_, sampling=None):
+    async def consume():
+        queue = asyncio.Queue(maxsize=1)
+        producer = asyncio.ensure_future(_produce(queue, values))
+
+        received = []
+        try:
+            async for value in validate_async_stream(_QueueStream(queue), type_, sampling):
+                received.append(value)
+        finally:
+            producer.cancel()
+        return received
+
+    return asyncio.get_event_loop().run_until_complete(consume())
+
+
+def test_async_stream():
+    assert _consume([1, 2, 3], AsyncIterable[int]) == [1, 2, 3]
+
+
+def test_async_stream_raises_at_first_bad_element():
+    received = []
+
+    async def consume():
+        queue = asyncio.Queue(maxsize=1)
+        producer = asyncio.ensure_future(_produce(queue, [[1], [2], ['x'], [4]]))
+
+        try:
+            async for value in validate_async_stream(_QueueStream(queue), AsyncIterator[List[int]]):
+                received.append(value)
+        finally:
+            producer.cancel()
+
+    with pytest.raises(TypeError):
+        asyncio.get_event_loop().run_until_complete(consume())
+    assert received == [[1], [2]]
+
+
+def test_async_stream_sampling():
+    values = [list(range(1000)) + ['x']]
+
+    assert _consume(values, AsyncIterable[List[int]], Sampling(head=10, tail=0, samples=0)) == values
+    with pytest.raises(TypeError):
+        _consume(values, AsyncIterable[List[int]])
+
+
+def test_wrong_async_stream_type():
+    with pytest.raises(TypeError):
+        validate_async_stream([1, 2], AsyncIterable[int])
+
+
+def test_is_instance_doesnt_iterate_async_streams():
+    with pytest.raises(NotImplementedError):
+        is_instance(_QueueStream(None), AsyncIterable[int])
+
+
+def test_async_generator():
+    async def produce():
+        value = 0
+        while True:
+            value = yield value
+
+    async def consume():
+        stream = validate_async_stream(produce(), AsyncGenerator[int, int])
+        first = await stream.__anext__()
+        second = await stream.asend(5)
+        with pytest.raises(TypeError):
+            await stream.asend('x')
+        await stream.aclose()
+        return first, second
+
+    assert asyncio.get_event_loop().run_until_complete(consume()) == (0, 5)
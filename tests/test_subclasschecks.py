@@ -1,4 +1,7 @@
 
+import pytest
+
+import typing
 from typing import *
 
 from datatypes import is_subtype
@@ -30,3 +33,113 @@ def test_tuple():
 
 def test_nested_generics():
     assert is_subtype(Tuple[List[float]], Tuple[list])
+
+
+def test_invariant_generic():
+    assert not is_subtype(List[bool], List[int])
+
+
+def test_covariant_generic():
+    assert is_subtype(Sequence[bool], Sequence[int])
+
+
+@pytest.mark.parametrize('sub_type, super_type, expected', [
+    (Union[int, bool], int, True),
+    (Union[int, str], int, False),
+    (int, Optional[int], True),
+    (None, Optional[int], True),
+    (Optional[int], int, False),
+])
+def test_union(sub_type, super_type, expected):
+    assert is_subtype(sub_type, super_type) == expected
+
+
+@pytest.mark.parametrize('values, super_type, expected', [
+    ((1,), int, True),
+    ((True,), int, True),
+    ((1, 'x'), int, False),
+    ((1, 'x'), Union[int, str], True),
+    ((None,), Optional[int], True),
+    ((1,), (1, 2), True),
+    ((True,), (1,), False),
+    ((3,), (1, 2), False),
+])
+def test_literal(values, super_type, expected):
+    Literal = getattr(typing, 'Literal', None) or pytest.importorskip('typing_extensions').Literal
+    if isinstance(super_type, tuple):
+        super_type = Literal[super_type]
+
+    assert is_subtype(Literal[values], super_type) == expected
+
+
+@pytest.mark.parametrize('sub_type, super_type', [
+    (NoReturn, int),
+    (int, NoReturn),
+    (List[int], NoReturn),
+    (Tuple[int], NoReturn),
+])
+def test_special_form(sub_type, super_type):
+    assert not is_subtype(sub_type, super_type)
+
+
+@pytest.mark.parametrize('sub_type, super_type, expected', [
+    (Tuple[bool, str], Tuple[int, str], True),
+    (Tuple[int], Tuple[int, str], False),
+    (Tuple[int, bool], Sequence[int], True),
+    (Tuple[int, str], Iterable[int], False),
+    (Tuple[int, bool], Tuple[int, ...], True),
+    (Tuple[()], Tuple[int, ...], True),
+    (Tuple[bool, ...], Tuple[int, ...], True),
+    (Tuple[int, ...], Tuple[int, int], False),
+    (Tuple[int, ...], Sequence[int], True),
+    (Tuple[str, ...], Sequence[int], False),
+])
+def test_tuple_arity(sub_type, super_type, expected):
+    assert is_subtype(sub_type, super_type) == expected
+
+
+@pytest.mark.parametrize('sub_type, super_type, expected', [
+    (Callable[[int], bool], Callable[[bool], int], True),
+    (Callable[[bool], int], Callable[[int], int], False),
+    (Callable[[int, str], int], Callable[[int], int], False),
+    (Callable[..., int], Callable[[int], int], True),
+])
+def test_callable(sub_type, super_type, expected):
+    assert is_subtype(sub_type, super_type) == expected
+
+
+@pytest.mark.parametrize('sub_type, super_type', [
+    (Any, int),
+    (int, Any),
+    (List[Any], List[int]),
+    (Dict[str, int], Dict[Any, int]),
+])
+def test_any(sub_type, super_type):
+    assert is_subtype(sub_type, super_type)
+
+
+def test_results_are_cached():
+    is_subtype.cache_clear()
+
+    is_subtype(List[bool], Sequence[int])
+    is_subtype(List[bool], Sequence[int])
+
+    assert is_subtype.cache_info().hits >= 1
+
+
+def test_abc_registration_invalidates_cache():
+    import abc
+
+    class Base(abc.ABC):
+        pass
+
+    class Registered:
+        pass
+
+    assert not is_subtype(Registered, Base)
+    assert not is_subtype(List[Registered], Sequence[Base])
+
+    Base.register(Registered)
+
+    assert is_subtype(Registered, Base)
+    assert is_subtype(List[Registered], Sequence[Base])
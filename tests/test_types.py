@@ -1,4 +1,6 @@
 
+import pytest
+
 from datatypes import *
 
 
@@ -16,3 +18,44 @@ def test_instancecheck():
 
 def test_instancecheck_negative():
     assert not isinstance(5, Boolean)
+
+
+def test_ndarray_instancecheck():
+    numpy = pytest.importorskip('numpy')
+
+    assert isinstance(numpy.arange(3), NDArray[int])
+    assert isinstance(numpy.arange(3.0), NDArray[numpy.float64])
+    assert not isinstance(numpy.arange(3), NDArray[float])
+    assert not isinstance([1, 2], NDArray)
+
+
+class _FakeDType:
+    def __init__(self, kind, type_):
+        self.kind = kind
+        self.type = type_
+
+
+class _FakeArray:
+    # looks like a numpy array to duck typing
+    __array_interface__ = {}
+    dtype = None
+    shape = ()
+
+    def __init__(self, kind, type_):
+        self.dtype = _FakeDType(kind, type_)
+
+
+class _Float32(float):
+    pass
+
+
+@pytest.mark.parametrize('array, datatype, expected', [
+    (_FakeArray('i', int), NDArray, True),
+    (_FakeArray('u', int), NDArray[int], True),
+    (_FakeArray('i', int), NDArray[float], False),
+    (_FakeArray('b', bool), NDArray[bool], True),
+    (_FakeArray('f', _Float32), NDArray[_Float32], True),
+    (_FakeArray('f', float), NDArray[_Float32], False),
+])
+def test_duck_typed_ndarray_instancecheck(array, datatype, expected):
+    assert isinstance(array, datatype) == expected
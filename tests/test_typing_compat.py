@@ -1,6 +1,7 @@
 
 import pytest
 
+import sys
 import typing
 
 import datatypes
@@ -16,11 +17,19 @@ from datatypes import is_generic, is_base_generic, is_qualified_generic, class_t
     (typing.List[bytearray], datatypes.List[bytearray]),
     (typing.List[typing.Dict], datatypes.List[datatypes.Dict]),
     (typing.List[typing.Dict[bytearray, memoryview]], datatypes.List[datatypes.Dict[bytearray, memoryview]]),
+    (typing.Tuple[int, str], datatypes.Tuple[datatypes.Integer, datatypes.Text]),
+    (typing.Tuple[int, ...], datatypes.Tuple[datatypes.Integer, ...]),
+    (typing.Tuple[()], datatypes.Tuple[()]),
 ])
 def test_class_to_datatype(cls, dtype):
     assert class_to_datatype(cls) == dtype
 
 
+@pytest.mark.skipif(sys.version_info < (3, 9), reason='builtin generics require python 3.9')
+def test_builtin_generic_to_datatype():
+    assert class_to_datatype(eval('dict[str, list[int]]')) == datatypes.Dict[datatypes.Text, datatypes.List[datatypes.Integer]]
+
+
 @pytest.mark.parametrize(['type_', 'expected'], [
     (int, False),
     (list, False),